@@ -0,0 +1,60 @@
+# Hot-path cost as completed history grows: 200 pending tasks plus N completed ones, timed with
+# the history in tasks and again after `maintenance` has moved it to the archive.
+#
+#   python -m todo_app.benchmarks.bench_archive [--history 10000 100000]
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from todo_app.controllers import auth
+from todo_app.controllers.maintenance import run_maintenance
+from todo_app.controllers.tasks import get_reminders, list_tasks
+from todo_app.database import db
+from todo_app.models.task_model import Task
+from todo_app.models.user_model import User
+
+PENDING = 200
+
+def _time_per_call(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def _hot_paths(user_id):
+    return {
+        'find_by_user_id': lambda: Task.find_by_user_id(user_id, status='pending'),
+        'list (pending)': lambda: list_tasks(),
+        'list --sort-by priority': lambda: list_tasks(sort_by='priority'),
+        'reminders': get_reminders,
+    }
+
+def run(history_sizes, repeat):
+    print(f"{'completed':>10}  {'operation':<26}{'in tasks ms':>12}{'archived ms':>13}")
+    today = date.today()
+    for size in history_sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db.set_db_path(os.path.join(tmp, 'bench.db'))
+            db.initialize_database()
+            user = User.create_user('bench', 'x')
+            auth.current_user = user
+            rows = [(f'done {i}', None, 'medium', str(today - timedelta(days=i % 400)), 'completed') for i in range(size)]
+            rows += [(f'open {i}', None, 'high', str(today + timedelta(days=i % 30 - 2)), 'pending') for i in range(PENDING)]
+            Task.bulk_create(user.id, rows, batch_size=5000)
+            db.optimize()
+            before = {name: _time_per_call(fn, repeat) for name, fn in _hot_paths(user.id).items()}
+            run_maintenance(archive_days=0, batch_size=5000)
+            after = {name: _time_per_call(fn, repeat) for name, fn in _hot_paths(user.id).items()}
+            for name in before:
+                print(f"{size:>10}  {name:<26}{before[name]:>12.3f}{after[name]:>13.3f}")
+            auth.current_user = None
+            db.close_connection()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Hot-path latency with and without an archived history")
+    parser.add_argument('--history', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    run(args.history, args.repeat)
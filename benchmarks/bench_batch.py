@@ -0,0 +1,54 @@
+# Write throughput of `batch` (one process, grouped commits) versus one CLI process per command,
+# at several commit intervals. The script is add/edit/done/reopen lines.
+#
+#   python -m todo_app.benchmarks.bench_batch [--commands 5000] [--process-samples 20] [--commit-every 1 100 1000]
+import argparse
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+
+PACKAGE = 'todo_app'
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _commands(count):
+    cycle = ['add "Task {n}" --priority high --due 2030-01-01', 'edit 1 --desc "note {n}"', 'done 1', 'reopen 1']
+    return [cycle[n % len(cycle)].format(n=n) for n in range(count)]
+
+def _run(argv, env, cwd, stdin=None):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-m', f'{PACKAGE}.main'] + argv, env=env, cwd=cwd, input=stdin, text=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+def run(count, samples, intervals):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env['PYTHONPATH'] = PACKAGE_PARENT + os.pathsep + env.get('PYTHONPATH', '')
+        env['TODO_DB_PATH'] = os.path.join(tmp, 'bench.db')
+        env['TODO_BCRYPT_ROUNDS'] = '4'
+        _run(['shell'], env, tmp, "signup bench\nbench\nlogin bench\nbench\nadd First\n")
+        script = '\n'.join(_commands(count)) + '\n'
+
+        commands = _commands(samples)
+        per_process = [_run(shlex.split(line), env, tmp) for line in commands]
+        process_ms = sum(per_process) / len(per_process) * 1000
+        print(f"{'one process per command':<28}{process_ms:>10.2f} ms/command ({samples} samples)")
+        for interval in intervals:
+            total = _run(['batch', '--commit-every', str(interval)], env, tmp, script)
+            batch_ms = total / count * 1000
+            print(f"{f'batch --commit-every {interval}':<28}{batch_ms:>10.3f} ms/command"
+                  f"  {process_ms / batch_ms:>7.0f}x  ({count} lines, {total:.2f}s incl. startup)")
+        total = _run(['batch', '--atomic'], env, tmp, script)
+        batch_ms = total / count * 1000
+        print(f"{'batch --atomic':<28}{batch_ms:>10.3f} ms/command  {process_ms / batch_ms:>7.0f}x")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Batch mode benchmark")
+    parser.add_argument('--commands', type=int, default=5000)
+    parser.add_argument('--process-samples', type=int, default=20)
+    parser.add_argument('--commit-every', type=int, nargs='+', default=[1, 100, 1000])
+    args = parser.parse_args()
+    run(args.commands, args.process_samples, args.commit_every)
@@ -0,0 +1,77 @@
+# Per-operation latency of the model layer with a connection per call (the old
+# behaviour) versus the pooled thread-local connection, over a 10k task table.
+#
+#   python -m todo_app.benchmarks.bench_connection [--tasks 10000]
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from todo_app.database import db
+from todo_app.models.task_model import Task
+from todo_app.models.user_model import User
+
+def _per_call_find_by_id(task_id):
+    conn = sqlite3.connect(db.current_db_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, user_id, title, description, priority, due_date, status, created_at, updated_at FROM tasks WHERE id = ?", (task_id,))
+        row = cursor.fetchone()
+        return Task(*row) if row else None
+    finally:
+        conn.close()
+
+def _per_call_create_task(user_id, title):
+    conn = sqlite3.connect(db.current_db_path)
+    try:
+        now = datetime.now()
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO tasks (user_id, title, description, priority, due_date, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, 'pending', ?, ?)",
+            (user_id, title, None, 'medium', None, now, now)
+        )
+        conn.commit()
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+def _per_call_update_task(task_id):
+    conn = sqlite3.connect(db.current_db_path)
+    try:
+        conn.execute("UPDATE tasks SET title = ?, updated_at = ? WHERE id = ?", ('renamed', datetime.now(), task_id))
+        conn.commit()
+    finally:
+        conn.close()
+    return _per_call_find_by_id(task_id)
+
+def _time_per_op(fn, args_list):
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1e6
+
+def run(task_count):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.set_db_path(os.path.join(tmp, 'bench.db'))
+        db.initialize_database()
+        user = User.create_user('bench', 'x')
+        ids = [(i,) for i in range(1, task_count + 1)]
+
+        results = []
+        results.append(('create_task', _time_per_op(_per_call_create_task, [(user.id, f'task {i}') for i in range(task_count)]),
+                        _time_per_op(Task.create_task, [(user.id, f'task {i}') for i in range(task_count)])))
+        results.append(('find_by_id', _time_per_op(_per_call_find_by_id, ids),
+                        _time_per_op(Task.find_by_id, ids)))
+        results.append(('update_task', _time_per_op(_per_call_update_task, ids),
+                        _time_per_op(lambda i: Task.update_task(i, title='renamed'), ids)))
+        db.close_connection()
+
+    print(f"{'operation':<14}{'per-call us':>14}{'pooled us':>12}{'speedup':>10}")
+    for name, before, after in results:
+        print(f"{name:<14}{before:>14.1f}{after:>12.1f}{before / after:>9.1f}x")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Connection pooling benchmark")
+    parser.add_argument('--tasks', type=int, default=10000)
+    run(parser.parse_args().tasks)
@@ -0,0 +1,140 @@
+# Write throughput and error rate with many processes writing to one database file at once, as
+# parallel cron jobs and CLI users do. Each writer process creates its user, then runs
+# add / mark done / edit / delete cycles with a read between writes, under three settings:
+#
+#   legacy     rollback journal, deferred transactions, no retries (the old sqlite3.connect defaults)
+#   wal        WAL journal and BEGIN IMMEDIATE, no retries
+#   wal+retry  the current defaults: WAL, BEGIN IMMEDIATE and retry_on_busy
+#
+#   python -m todo_app.benchmarks.bench_contention [--writers 16] [--writes 200] [--busy-timeout 5]
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import Counter
+from todo_app.database import db
+from todo_app.models.task_model import Task, TaskQuery
+from todo_app.models.user_model import User
+
+CONFIGS = {
+    'legacy': dict(JOURNAL_MODE='DELETE', ISOLATION_LEVEL='', WRITE_RETRIES=0),
+    'wal': dict(JOURNAL_MODE='WAL', ISOLATION_LEVEL='IMMEDIATE', WRITE_RETRIES=0),
+    'wal+retry': dict(JOURNAL_MODE='WAL', ISOLATION_LEVEL='IMMEDIATE', WRITE_RETRIES=db.WRITE_RETRIES),
+}
+
+def _configure(path, settings):
+    for name, value in settings.items():
+        setattr(db, name, value)
+    db.set_db_path(path)
+
+def _writer(index, path, settings, writes, ready, start, results):
+    # Runs in its own process; reports (writes, errors by message, write latencies in ms). The
+    # models' "Database error" lines are dropped, the errors are counted instead.
+    sys.stdout = open(os.devnull, 'w')
+    _configure(path, settings)
+    errors = Counter()
+    latencies = []
+    done = 0
+
+    def write(fn, *args, **kwargs):
+        nonlocal done
+        begin = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+            done += 1
+            return result
+        except sqlite3.Error as e:
+            errors[str(e).split(' (')[0]] += 1
+        finally:
+            latencies.append((time.perf_counter() - begin) * 1000)
+
+    db.get_connection()
+    ready.release()
+    start.wait()
+    user = write(User.create_user, f'writer{index}', 'not-a-hash')
+    if user is not None:
+        query = TaskQuery(user.id, show_completed=False)
+        for n in range(writes):
+            step = n % 4
+            if step == 0:
+                task = write(Task.create_task, user.id, f'Task {n}', 'written under contention', 'medium', None)
+            elif task is None:
+                continue
+            elif step == 1:
+                write(Task.update_owned, task.id, user.id, status='completed')
+            elif step == 2:
+                write(Task.update_task, task.id, description=f'edited {n}')
+            else:
+                write(Task.delete_owned, task.id, user.id)
+            try:
+                Task.find_page(query, 20)
+            except sqlite3.Error as e:
+                errors['read: ' + str(e)] += 1
+    db.close_connection()
+    results.put((done, dict(errors), latencies))
+
+def run(writers, writes, settings, busy_timeout=None):
+    # One stress run on a fresh database; returns a dict of throughput, error rate and latency
+    settings = dict(settings)
+    if busy_timeout is not None:
+        settings['BUSY_TIMEOUT'] = busy_timeout
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'contention.db')
+        previous = {name: getattr(db, name) for name in settings}
+        previous_path = db.current_db_path
+        try:
+            _configure(path, settings)
+            db.initialize_database()
+            db.close_connection()
+        finally:
+            _configure(previous_path, previous)
+        ready = context.Semaphore(0)
+        start = context.Event()
+        results = context.Queue()
+        processes = [context.Process(target=_writer, args=(i, path, settings, writes, ready, start, results))
+                     for i in range(writers)]
+        for process in processes:
+            process.start()
+        for _ in processes:
+            ready.acquire()
+        began = time.perf_counter()
+        start.set()
+        outcomes = [results.get() for _ in processes]
+        elapsed = time.perf_counter() - began
+        for process in processes:
+            process.join()
+    done = sum(outcome[0] for outcome in outcomes)
+    errors = Counter()
+    for outcome in outcomes:
+        errors.update(outcome[1])
+    latencies = sorted(ms for outcome in outcomes for ms in outcome[2])
+    attempted = len(latencies)
+    return {
+        'writes': done,
+        'attempted': attempted,
+        'errors': dict(errors),
+        'error_rate': sum(errors.values()) / attempted if attempted else 0.0,
+        'writes_per_s': done / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] if latencies else 0.0,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0,
+        'seconds': elapsed,
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Concurrent writer stress test")
+    parser.add_argument('--writers', type=int, default=16, help='Writer processes')
+    parser.add_argument('--writes', type=int, default=200, help='Task writes per process')
+    parser.add_argument('--busy-timeout', type=float, help='Override the busy timeout (seconds) for every setting')
+    parser.add_argument('--config', choices=list(CONFIGS), nargs='+', default=list(CONFIGS))
+    args = parser.parse_args()
+    print(f"{args.writers} writers x {args.writes} writes\n")
+    print(f"{'setting':<12}{'writes/s':>10}{'error rate':>12}{'p50 ms':>9}{'p99 ms':>9}  errors")
+    for name in args.config:
+        result = run(args.writers, args.writes, CONFIGS[name], args.busy_timeout)
+        errors = ', '.join(f"{count} {message}" for message, count in result['errors'].items()) or '-'
+        print(f"{name:<12}{result['writes_per_s']:>10.0f}{result['error_rate']:>12.2%}"
+              f"{result['p50_ms']:>9.2f}{result['p99_ms']:>9.2f}  {errors}")
@@ -0,0 +1,57 @@
+# Cost of the date handling in the render and reminder loops: strptime on every task (the old
+# format_task and check_reminders) versus utils.dates.classify_due, which parses each distinct
+# date once and judges it against a single "today".
+#
+#   python -m todo_app.benchmarks.bench_dates [--tasks 100000] [--days 365]
+import argparse
+import time
+from datetime import date, datetime, timedelta
+from todo_app.models.task_model import Task
+from todo_app.utils.dates import classify_due, OVERDUE, DUE_TODAY
+
+def _strptime_states(tasks):
+    states = []
+    for task in tasks:
+        today = date.today()
+        state = None
+        try:
+            due = datetime.strptime(task.due_date, '%Y-%m-%d').date()
+            if due < today:
+                state = OVERDUE
+            elif due == today:
+                state = DUE_TODAY
+        except ValueError:
+            pass
+        states.append(state)
+    return states
+
+def _classified_states(tasks):
+    return [classify_due(task.due_date) for task in tasks]
+
+def _time(fn, tasks, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(tasks)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run(task_count, days, repeat):
+    start = date.today() - timedelta(days=days // 2)
+    tasks = [Task(i, 1, f'task {i}', None, 'medium', str(start + timedelta(days=i % days)), 'pending', None, None)
+             for i in range(task_count)]
+    before = _time(_strptime_states, tasks, repeat)
+    after = _time(_classified_states, tasks, repeat)
+    print(f"{task_count} tasks over {days} distinct due dates")
+    print(f"strptime per task   {before * 1000:>9.1f} ms  {before / task_count * 1e9:>7.0f} ns/task")
+    print(f"classify_due        {after * 1000:>9.1f} ms  {after / task_count * 1e9:>7.0f} ns/task")
+    print(f"speedup             {before / after:>9.1f}x")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Date handling micro-benchmark")
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.tasks, args.days, args.repeat)
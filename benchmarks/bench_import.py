@@ -0,0 +1,55 @@
+# Import throughput (rows/sec) for CSV and JSONL files through controllers.transfer.
+#
+#   python -m todo_app.benchmarks.bench_import [--rows 100000] [--batch-size 1000]
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from todo_app.controllers import auth
+from todo_app.controllers.transfer import import_tasks
+from todo_app.database import db
+from todo_app.models.user_model import User
+
+def _write_files(tmp, rows):
+    rng = random.Random(42)
+    records = [
+        {
+            'title': f'Imported task {i}',
+            'description': 'migrated from another tool' if i % 3 else '',
+            'priority': rng.choice(['low', 'medium', 'high']),
+            'due_date': f'2030-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}' if i % 4 else '',
+            'status': 'completed' if i % 5 == 0 else 'pending',
+        }
+        for i in range(rows)
+    ]
+    csv_path = os.path.join(tmp, 'tasks.csv')
+    with open(csv_path, 'w', newline='') as f:
+        f.write('title,description,priority,due_date,status\n')
+        for r in records:
+            f.write(f"{r['title']},{r['description']},{r['priority']},{r['due_date']},{r['status']}\n")
+    jsonl_path = os.path.join(tmp, 'tasks.jsonl')
+    with open(jsonl_path, 'w') as f:
+        for r in records:
+            f.write(json.dumps(r) + '\n')
+    return [('csv', csv_path), ('jsonl', jsonl_path)]
+
+def run(rows, batch_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, path in _write_files(tmp, rows):
+            db.set_db_path(os.path.join(tmp, f'bench_{fmt}.db'))
+            db.initialize_database()
+            auth.current_user = User.create_user('bench', 'x')
+            start = time.perf_counter()
+            imported, errors = import_tasks(path, batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+            print(f"{fmt:<6}{imported:>9} rows {elapsed:>7.2f}s {imported / elapsed:>10.0f} rows/sec ({len(errors)} errors)")
+            db.close_connection()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Bulk import benchmark")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+    run(args.rows, args.batch_size)
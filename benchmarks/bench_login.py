@@ -0,0 +1,120 @@
+# Login throughput and its effect on other requests.
+#
+# 1. In process: controllers.auth.authenticate from 1..N threads at several bcrypt work factors
+#    (bcrypt releases the GIL, so threads scale with cores).
+# 2. Against a server: a storm of concurrent logins while one client keeps listing tasks, with
+#    logins on their own pool (--auth-workers 2) versus sharing the main workers (0).
+#
+#   python -m todo_app.benchmarks.bench_login [--rounds 10 12] [--threads 1 4 16] [--duration 3]
+import argparse
+import os
+import tempfile
+import threading
+import time
+from todo_app.benchmarks.bench_server import Client, _start_server
+from todo_app.controllers import auth
+from todo_app.database import db
+from todo_app.models.user_model import User
+from todo_app.utils import passwords
+
+PASSWORD = 'benchmark'
+
+def _percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+def _authenticate_throughput(threads, duration):
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def worker(i):
+        while not stop.is_set():
+            if auth.authenticate('bench', PASSWORD) is None:
+                raise RuntimeError("Login failed")
+            counts[i] += 1
+        db.close_connection()
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in pool:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+def run_in_process(rounds_list, threads_list, duration):
+    print(f"{'rounds':>6}{'threads':>9}{'logins/s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db.set_db_path(os.path.join(tmp, 'login.db'))
+        db.initialize_database()
+        user = User.create_user('bench', passwords.hash_password(PASSWORD))
+        try:
+            for rounds in rounds_list:
+                User.update_password_hash(user.id, passwords.hash_password(PASSWORD, rounds))
+                saved, passwords.ROUNDS = passwords.ROUNDS, rounds  # no rehash during the run
+                try:
+                    for threads in threads_list:
+                        print(f"{rounds:>6}{threads:>9}{_authenticate_throughput(threads, duration):>10.1f}")
+                finally:
+                    passwords.ROUNDS = saved
+        finally:
+            db.close_connection()
+
+def run_storm(storm_clients, duration, auth_workers, rounds):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['TODO_BCRYPT_ROUNDS'] = str(rounds)
+        try:
+            process, port = _start_server(tmp, 8, ('--auth-workers', str(auth_workers)))
+        finally:
+            del os.environ['TODO_BCRYPT_ROUNDS']
+        try:
+            client = Client('127.0.0.1', port)
+            credentials = {'username': 'storm', 'password': PASSWORD}
+            client.request('POST', '/signup', credentials)
+            client.token = client.request('POST', '/login', credentials)[1]['token']
+            for n in range(50):
+                client.request('POST', '/tasks', {'title': f'task {n}'})
+            stop = threading.Event()
+            logins, rejected, latencies = [0], [0], []
+
+            def storm():
+                conn = Client('127.0.0.1', port)
+                while not stop.is_set():
+                    status, _ = conn.request('POST', '/login', credentials)
+                    if status == 200:
+                        logins[0] += 1
+                    else:
+                        rejected[0] += 1
+
+            threads = [threading.Thread(target=storm) for _ in range(storm_clients)]
+            for thread in threads:
+                thread.start()
+            start = time.perf_counter()
+            while time.perf_counter() - start < duration:
+                began = time.perf_counter()
+                client.request('GET', '/tasks?limit=20')
+                latencies.append(time.perf_counter() - began)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            process.terminate()
+            process.wait()
+    print(f"{auth_workers:>12}{logins[0] / elapsed:>10.1f}{rejected[0]:>10}{len(latencies) / elapsed:>10.1f}"
+          f"{_percentile(latencies, 0.5):>10.1f}{_percentile(latencies, 0.99):>10.1f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Login throughput benchmark")
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 12])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--duration', type=float, default=3)
+    parser.add_argument('--storm', type=int, default=16, help='Concurrent login clients against the server')
+    args = parser.parse_args()
+    run_in_process(args.rounds, args.threads, args.duration)
+    print(f"\nserver, {args.storm} clients logging in at {args.rounds[0]} rounds while one client lists tasks")
+    print(f"{'auth workers':>12}{'logins/s':>10}{'503s':>10}{'lists/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for auth_workers in (0, 2):
+        run_storm(args.storm, args.duration * 2, auth_workers, args.rounds[0])
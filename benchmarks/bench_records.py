@@ -0,0 +1,62 @@
+# Construction time and memory of loaded tasks: the previous dict-backed class built with
+# cls(*row) over fetchall() versus the slotted Task built by its row_factory (Task.find).
+#
+#   python -m todo_app.benchmarks.bench_records [--tasks 1000000]
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+from todo_app.database import db
+from todo_app.models.task_model import Task, TaskQuery
+from todo_app.models.user_model import User
+
+class DictTask:
+    def __init__(self, id, user_id, title, description, priority, due_date, status, created_at, updated_at):
+        self.id = id
+        self.user_id = user_id
+        self.title = title
+        self.description = description
+        self.priority = priority
+        self.due_date = due_date
+        self.status = status
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+def _load_dict_tasks(query):
+    sql, params = query.select()
+    rows = db.get_connection().execute(sql, params).fetchall()
+    return [DictTask(*row) for row in rows]
+
+def _measure(load, query):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    tasks = load(query)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(tasks)
+    del tasks
+    return elapsed, current, peak, count
+
+def run(task_count):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.set_db_path(os.path.join(tmp, 'bench.db'))
+        db.initialize_database()
+        user = User.create_user('bench', 'x')
+        with db.connection():
+            Task.bulk_create(user.id, ((f'task {i}', 'benchmark task', 'medium', '2030-01-01', 'pending') for i in range(task_count)),
+                             batch_size=5000)
+        query = TaskQuery(user.id)
+        print(f"{'records':<10}{'tasks':>9}{'seconds':>9}{'held MiB':>10}{'peak MiB':>10}")
+        for name, load in [('dict', _load_dict_tasks), ('slotted', Task.find)]:
+            elapsed, current, peak, count = _measure(load, query)
+            print(f"{name:<10}{count:>9}{elapsed:>9.2f}{current / 2**20:>10.1f}{peak / 2**20:>10.1f}")
+        db.close_connection()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Task record construction benchmark")
+    parser.add_argument('--tasks', type=int, default=1000000)
+    run(parser.parse_args().tasks)
@@ -0,0 +1,67 @@
+# Storage and per-command cost of repeating tasks: one copy per occurrence added up front
+# (what `add` in a loop gives), against recurrence templates whose occurrences are created only
+# inside the window a listing or the reminder check looks at.
+#
+#   python -m todo_app.benchmarks.bench_recurrence [--rules 50] [--years 1 5]
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+from todo_app.controllers import auth
+from todo_app.controllers.tasks import create_recurring, get_reminders, list_tasks
+from todo_app.database import db
+from todo_app.models.task_model import Task
+from todo_app.models.user_model import User
+from todo_app.utils import dates, recurrence
+
+def _time_per_call(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def _task_rows():
+    return db.get_connection().execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+def _copies(rules, start, end):
+    # Every occurrence of each daily/weekly rule from start to end, added as plain tasks
+    for n in range(rules):
+        frequency = 'daily' if n % 2 else 'weekly'
+        day, index = start, 0
+        while day <= end:
+            yield (f'rule {n}', None, 'medium', day.isoformat(), 'pending' if day >= dates.today() else 'completed')
+            index += 1
+            day = recurrence.occurrence(start, frequency, 1, index)
+
+def run(rules, years_list, repeat):
+    print(f"{'rules':>6}{'years':>7}  {'storage':<10}{'task rows':>11}{'list ms':>10}{'reminders ms':>14}")
+    for years in years_list:
+        start = dates.today() - timedelta(days=365 * years // 2)
+        end = start + timedelta(days=365 * years)
+        for mode in ('copies', 'templates'):
+            with tempfile.TemporaryDirectory() as tmp:
+                db.set_db_path(os.path.join(tmp, 'bench.db'))
+                db.initialize_database()
+                user = User.create_user('bench', 'x')
+                auth.current_user = user
+                if mode == 'copies':
+                    Task.bulk_create(user.id, _copies(rules, start, end), batch_size=5000)
+                else:
+                    for n in range(rules):
+                        create_recurring(f'rule {n}', frequency='daily' if n % 2 else 'weekly', start_date=start.isoformat(),
+                                         end_date=end.isoformat())
+                list_ms = _time_per_call(list_tasks, repeat)
+                reminders_ms = _time_per_call(get_reminders, repeat)
+                print(f"{rules:>6}{years:>7}  {mode:<10}{_task_rows():>11}{list_ms:>10.2f}{reminders_ms:>14.3f}")
+                auth.current_user = None
+                db.close_connection()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Recurring task storage and lookup cost")
+    parser.add_argument('--rules', type=int, default=50)
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 5])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    run(args.rules, args.years, args.repeat)
@@ -0,0 +1,62 @@
+# Per-command reminder check cost as the pending backlog grows: the old full scan
+# (load every pending task, strptime each due date, then parse again in check_reminders)
+# versus the trigger-maintained reminder_summary lookup.
+#
+#   python -m todo_app.benchmarks.bench_reminders [--sizes 1000 10000 100000]
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from todo_app.controllers import auth
+from todo_app.controllers.tasks import get_reminders
+from todo_app.database import db
+from todo_app.models.task_model import Task
+from todo_app.models.user_model import User
+from todo_app.utils.notifications import check_reminders
+
+def _scan_reminders(user_id):
+    tasks = Task.find_by_user_id(user_id, status='pending')
+    today = date.today()
+    reminders = []
+    for task in tasks:
+        if task.due_date:
+            try:
+                if datetime.strptime(task.due_date, '%Y-%m-%d').date() <= today:
+                    reminders.append(task)
+            except ValueError:
+                pass
+    return check_reminders(reminders)
+
+def _indexed_reminders(user_id):
+    reminders = get_reminders()
+    return check_reminders(reminders) if reminders else None
+
+def _time_per_call(fn, user_id, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(user_id)
+    return (time.perf_counter() - start) / repeat * 1000
+
+def run(sizes, repeat):
+    print(f"{'pending':>10}{'scan ms':>12}{'summary ms':>13}")
+    future = str(date.today() + timedelta(days=30))
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db.set_db_path(os.path.join(tmp, 'bench.db'))
+            db.initialize_database()
+            user = User.create_user('bench', 'x')
+            auth.current_user = user
+            Task.bulk_create(user.id, ((f'task {i}', None, 'medium', future, 'pending') for i in range(size)), batch_size=5000)
+            scan = _time_per_call(_scan_reminders, user.id, max(1, repeat // 10))
+            summary = _time_per_call(_indexed_reminders, user.id, repeat)
+            print(f"{size:>10}{scan:>12.2f}{summary:>13.3f}")
+            auth.current_user = None
+            db.close_connection()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Reminder check benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,58 @@
+# Rendering throughput of each --format for in-memory tasks, compared with writing the same
+# pre-rendered text (the I/O floor) to the same file. Also shows what colorama's stripping
+# wrapper used to cost for piped card output.
+#
+#   python -m todo_app.benchmarks.bench_render [--tasks 100000] [--out /dev/null]
+import argparse
+import io
+import os
+import time
+from todo_app.models.task_model import Task
+from todo_app.utils.dates import OVERDUE, DUE_TODAY
+from todo_app.utils.formatter import FORMATS, write_tasks
+
+def _tasks(count):
+    return [Task(i, 1, f'Review quarterly report {i}', 'Collect the numbers\tand send them round' if i % 3 else None,
+                 ('low', 'medium', 'high')[i % 3], f'2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}' if i % 4 else None,
+                 'completed' if i % 5 == 0 else 'pending', '2026-01-01 09:00:00', '2026-01-02 10:30:00')
+            for i in range(count)]
+
+def _time(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+def run(count, path):
+    tasks = _tasks(count)
+    print(f"{count} tasks -> {path}")
+    print(f"{'format':<16}{'render ms':>11}{'write-only ms':>15}{'MB':>8}{'tasks/s':>12}")
+    for fmt in FORMATS:
+        rendered = io.StringIO()
+        write_tasks(tasks, fmt, stream=rendered)
+        text = rendered.getvalue()
+        with open(path, 'w') as out:
+            total = _time(lambda: write_tasks(tasks, fmt, stream=out))
+        with open(path, 'w') as out:
+            floor = _time(lambda: out.write(text))
+        print(f"{fmt:<16}{total:>11.1f}{floor:>15.1f}{len(text) / 1e6:>8.1f}{count / total * 1000:>12.0f}")
+    from colorama import Fore
+    from colorama.ansitowin32 import AnsiToWin32
+    # The old path: colored cards through the stream colorama.init() installs on a pipe
+    with open(path, 'w') as out:
+        wrapped = AnsiToWin32(out, strip=True).stream
+        colors = {'pending': Fore.YELLOW, 'completed': Fore.GREEN, OVERDUE: Fore.RED, DUE_TODAY: Fore.BLUE, 'reset': Fore.RESET}
+        from todo_app.utils import formatter
+        palette = formatter.palette
+        formatter.palette = lambda stream=None: colors
+        try:
+            total = _time(lambda: write_tasks(tasks, 'cards', stream=wrapped))
+        finally:
+            formatter.palette = palette
+    print(f"{'cards+colorama':<16}{total:>11.1f}{'':>15}{'':>8}{count / total * 1000:>12.0f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Output format rendering benchmark")
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--out', default=os.devnull, help='File to write to')
+    args = parser.parse_args()
+    run(args.tasks, args.out)
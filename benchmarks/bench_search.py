@@ -0,0 +1,68 @@
+# Latency of `search` on a large task table: ranked single-word, multi-word, prefix and
+# filtered queries through controllers.tasks.search_tasks.
+#
+#   python -m todo_app.benchmarks.bench_search [--tasks 1000000] [--vocabulary 5000]
+import argparse
+import os
+import random
+import tempfile
+import time
+from todo_app.controllers import auth
+from todo_app.controllers.tasks import search_tasks
+from todo_app.database import db
+from todo_app.models.task_model import Task
+from todo_app.models.user_model import User
+
+def _words(count):
+    rng = random.Random(7)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(letters) for _ in range(rng.randint(4, 9))))
+    return sorted(words)
+
+def _rows(words, count):
+    rng = random.Random(42)
+    priorities = ['low', 'medium', 'high']
+    for i in range(count):
+        title = ' '.join(rng.choices(words, k=3))
+        description = ' '.join(rng.choices(words, k=8))
+        yield (title, description, priorities[i % 3], None, 'completed' if i % 4 == 0 else 'pending')
+
+def _time(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, len(result)
+
+def run(task_count, vocabulary, repeat):
+    words = _words(vocabulary)
+    with tempfile.TemporaryDirectory() as tmp:
+        db.set_db_path(os.path.join(tmp, 'bench.db'))
+        db.initialize_database()
+        user = User.create_user('bench', 'x')
+        auth.current_user = user
+        start = time.perf_counter()
+        with db.connection():
+            Task.bulk_create(user.id, _rows(words, task_count), batch_size=5000)
+        print(f"seeded {task_count} tasks in {time.perf_counter() - start:.1f}s")
+        cases = [
+            ('one word', lambda: search_tasks(words[10])),
+            ('two words', lambda: search_tasks(f'{words[10]} {words[20]}')),
+            ('prefix', lambda: search_tasks(words[30][:4] + '*')),
+            ('pending high', lambda: search_tasks(words[40], priority='high', show_pending=True)),
+        ]
+        print(f"{'query':<14}{'ms':>10}{'results':>9}")
+        for name, fn in cases:
+            ms, found = _time(fn, repeat)
+            print(f"{name:<14}{ms:>10.2f}{found:>9}")
+        auth.current_user = None
+        db.close_connection()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Full-text search benchmark")
+    parser.add_argument('--tasks', type=int, default=1000000)
+    parser.add_argument('--vocabulary', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    run(args.tasks, args.vocabulary, args.repeat)
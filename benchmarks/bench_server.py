@@ -0,0 +1,145 @@
+# Load generator for the HTTP/JSON API: concurrent keep-alive clients issue a mix of list, view,
+# add and done requests for a fixed time and report requests/sec and latency percentiles.
+# Without --url a server is started as a separate process on a temporary database.
+#
+#   python -m todo_app.benchmarks.bench_server [--clients 16] [--duration 10] [--workers 8]
+#   python -m todo_app.benchmarks.bench_server --url http://127.0.0.1:8765
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+
+PACKAGE = 'todo_app'
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+USERS = 4
+SEED_TASKS = 200
+
+class Client:
+    def __init__(self, host, port, token=None):
+        self.conn = HTTPConnection(host, port, timeout=30)
+        self.token = token
+
+    def request(self, method, path, body=None):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        self.conn.request(method, path, json.dumps(body) if body is not None else None, headers)
+        response = self.conn.getresponse()
+        return response.status, json.loads(response.read())
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _start_server(tmp, workers, extra_args=()):
+    port = _free_port()
+    env = dict(os.environ)
+    env['PYTHONPATH'] = PACKAGE_PARENT + os.pathsep + env.get('PYTHONPATH', '')
+    env['TODO_DB_PATH'] = os.path.join(tmp, 'bench.db')
+    process = subprocess.Popen([sys.executable, '-m', f'{PACKAGE}.main', 'serve', '--port', str(port), '--workers', str(workers), *extra_args],
+                               env=env, cwd=tmp, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process, port
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Server did not start")
+
+def _prepare(host, port):
+    # Returns one token per user; each user gets SEED_TASKS tasks to read back
+    tokens = []
+    run_id = random.randrange(1 << 30)
+    for i in range(USERS):
+        client = Client(host, port)
+        credentials = {'username': f'bench{run_id}_{i}', 'password': 'bench'}
+        client.request('POST', '/signup', credentials)
+        client.token = client.request('POST', '/login', credentials)[1]['token']
+        for n in range(SEED_TASKS):
+            client.request('POST', '/tasks', {'title': f'seed {n}', 'due_date': '2030-01-01'})
+        tokens.append(client.token)
+    return tokens
+
+def _worker(host, port, token, stop, latencies, errors, seed):
+    rng = random.Random(seed)
+    client = Client(host, port, token)
+    own = [task['id'] for task in client.request('GET', '/tasks?limit=50')[1]['tasks']]
+    while not stop.is_set():
+        roll = rng.random()
+        if roll < 0.6:
+            method, path, body = 'GET', '/tasks?limit=20', None
+        elif roll < 0.8:
+            method, path, body = 'GET', f'/tasks/{rng.choice(own)}', None
+        elif roll < 0.9:
+            method, path, body = 'POST', '/tasks', {'title': 'load test', 'priority': 'low'}
+        else:
+            method, path, body = 'POST', f'/tasks/{rng.choice(own)}/done', None
+        start = time.perf_counter()
+        try:
+            status, _ = client.request(method, path, body)
+        except Exception:
+            status = None
+            client = Client(host, port, token)
+        latencies.append(time.perf_counter() - start)
+        if status is None or status >= 400:
+            errors.append(status)
+
+def run(url, clients, duration, workers):
+    tmp = process = None
+    if url:
+        parts = urlsplit(url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        process, port = _start_server(tmp.name, workers)
+        host = '127.0.0.1'
+    try:
+        tokens = _prepare(host, port)
+        stop = threading.Event()
+        results = [([], []) for _ in range(clients)]
+        threads = [threading.Thread(target=_worker, args=(host, port, tokens[i % len(tokens)], stop, *results[i], i))
+                   for i in range(clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+            tmp.cleanup()
+    latencies = sorted(latency for samples, _ in results for latency in samples)
+    errors = sum(len(errs) for _, errs in results)
+    if not latencies:
+        print("No requests completed")
+        return
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(f"clients {clients}, server workers {workers if not url else 'n/a'}, {elapsed:.1f}s")
+    print(f"requests {len(latencies)} ({errors} errors)")
+    print(f"throughput {len(latencies) / elapsed:.0f} req/s")
+    print(f"latency p50 {percentile(0.50):.2f} ms, p90 {percentile(0.90):.2f} ms, p99 {percentile(0.99):.2f} ms")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="HTTP API load generator")
+    parser.add_argument('--url', help='Existing server to load (default: start one on a temporary database)')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=8, help='Worker pool size for the started server')
+    args = parser.parse_args()
+    run(args.url, args.clients, args.duration, args.workers)
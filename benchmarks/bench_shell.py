@@ -0,0 +1,46 @@
+# Per-command cost of a scripted `shell` session versus one process per command.
+#
+#   python -m todo_app.benchmarks.bench_shell [--commands 1000] [--process-samples 20]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PACKAGE = 'todo_app'
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _commands(count):
+    cycle = ['add "Task {n}" --priority high', 'list --limit 5', 'view 1', 'done 1', 'reopen 1', 'edit 1 --desc "note {n}"']
+    return [cycle[n % len(cycle)].format(n=n) for n in range(count)]
+
+def _run(argv, env, cwd, stdin=None):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-m', f'{PACKAGE}.main'] + argv, env=env, cwd=cwd, input=stdin, text=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+def run(count, samples):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env['PYTHONPATH'] = PACKAGE_PARENT + os.pathsep + env.get('PYTHONPATH', '')
+        env['TODO_DB_PATH'] = os.path.join(tmp, 'bench.db')
+        _run(['shell'], env, tmp, "signup bench\nbench\nlogin bench\nbench\nadd First\n")
+        commands = _commands(count)
+
+        per_process = [_run(['add', 'Task'] if n % 2 else ['view', '1'], env, tmp) for n in range(samples)]
+        shell_total = _run(['shell'], env, tmp, '\n'.join(commands) + '\n')
+
+    process_ms = sum(per_process) / len(per_process) * 1000
+    shell_ms = shell_total / count * 1000
+    print(f"one process per command  {process_ms:>8.1f} ms/command ({samples} samples)")
+    print(f"shell, {count} commands  {shell_ms:>8.2f} ms/command ({shell_total:.2f}s total, startup included)")
+    print(f"speedup                  {process_ms / shell_ms:>8.1f}x")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Shell mode benchmark")
+    parser.add_argument('--commands', type=int, default=1000)
+    parser.add_argument('--process-samples', type=int, default=20)
+    args = parser.parse_args()
+    run(args.commands, args.process_samples)
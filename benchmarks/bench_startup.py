@@ -0,0 +1,98 @@
+# CLI startup cost: import time of the entry point (python -X importtime) and wall-clock time of
+# whole commands run as fresh processes. Use --json to keep a record to compare across releases.
+#
+#   python -m todo_app.benchmarks.bench_startup [--runs 10] [--json startup.json]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PACKAGE = 'todo_app'
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COMMANDS = [
+    ['--help'],
+    ['whoami'],
+    ['logout'],
+    ['list'],
+    ['add', 'Benchmark task'],
+]
+
+def _env(db_path):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = PACKAGE_PARENT + os.pathsep + env.get('PYTHONPATH', '')
+    env['TODO_DB_PATH'] = db_path
+    return env
+
+def import_times(env, cwd):
+    # Self time in microseconds of every module imported on behalf of the entry point.
+    # importtime lists a module's imports before the module itself, so the entry point's subtree is
+    # everything between the previous top-level line and its own line.
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {PACKAGE}.main'],
+                            env=env, cwd=cwd, capture_output=True, text=True, check=True)
+    subtree = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        subtree[name.strip()] = int(self_us)
+        if not name.startswith('  '):
+            if name.strip() == f'{PACKAGE}.main':
+                return subtree
+            subtree = {}
+    return subtree
+
+def wall_times(env, cwd, runs):
+    results = {}
+    for command in COMMANDS:
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-m', f'{PACKAGE}.main'] + command, env=env, cwd=cwd,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            samples.append((time.perf_counter() - start) * 1000)
+        results[' '.join(command)] = statistics.median(samples)
+    return results
+
+def run(runs, json_path=None):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        env = _env(db_path)
+        # A logged-in session so task commands do real work
+        setup = (f"from {PACKAGE}.database import db; db.initialize_database(); "
+                 f"from {PACKAGE}.models.user_model import User; from {PACKAGE}.controllers import auth; "
+                 f"auth.save_session(auth.issue_token(User.create_user('bench', 'x')))")
+        subprocess.run([sys.executable, '-c', setup], env=env, cwd=tmp, check=True)
+
+        interpreter = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', 'pass'], env=env, cwd=tmp)
+            interpreter.append((time.perf_counter() - start) * 1000)
+        results = {
+            'python': sys.version.split()[0],
+            'interpreter_ms': statistics.median(interpreter),
+            'imports_us': import_times(env, tmp),
+            'commands_ms': wall_times(env, tmp, runs),
+        }
+
+    print(f"interpreter only: {results['interpreter_ms']:.1f} ms")
+    print(f"import {PACKAGE}.main: {sum(results['imports_us'].values()) / 1000:.1f} ms")
+    for name, micros in sorted(results['imports_us'].items(), key=lambda item: -item[1])[:8]:
+        print(f"  {name:<32}{micros / 1000:>8.1f} ms")
+    for command, millis in results['commands_ms'].items():
+        print(f"{command:<24}{millis:>8.1f} ms")
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="CLI startup benchmark")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--json', help='Write results to this file')
+    args = parser.parse_args()
+    run(args.runs, args.json)
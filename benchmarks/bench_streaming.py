@@ -0,0 +1,66 @@
+# Peak memory and time-to-first-output of `list` rendering, materialized (list_tasks +
+# format_task_list) versus streamed (iter_tasks + write_task_list).
+#
+#   python -m todo_app.benchmarks.bench_streaming [--sizes 1000 10000 100000]
+import argparse
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from todo_app.controllers import auth
+from todo_app.controllers.tasks import list_tasks, iter_tasks
+from todo_app.database import db
+from todo_app.models.user_model import User
+from todo_app.utils.formatter import format_task_list, write_task_list
+
+class FirstWriteStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.first_write = None
+
+    def write(self, text):
+        if self.first_write is None and text:
+            self.first_write = time.perf_counter()
+        return len(text)
+
+def _seed(user_id, count):
+    now = datetime.now()
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO tasks (user_id, title, description, priority, due_date, status, created_at, updated_at) VALUES (?, ?, ?, 'medium', NULL, 'pending', ?, ?)",
+            ((user_id, f'task {i}', 'benchmark task', now, now) for i in range(count))
+        )
+
+def _measure(render):
+    stream = FirstWriteStream()
+    tracemalloc.start()
+    start = time.perf_counter()
+    render(stream)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return (stream.first_write - start) * 1000, total * 1000, peak / 1024 / 1024
+
+def run(sizes):
+    print(f"{'tasks':>8} {'mode':<9}{'first ms':>10}{'total ms':>10}{'peak MiB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            db.set_db_path(os.path.join(tmp, f'bench_{size}.db'))
+            db.initialize_database()
+            auth.current_user = User.create_user('bench', 'x')
+            _seed(auth.current_user.id, size)
+            modes = [
+                ('list', lambda out: out.write(format_task_list(list_tasks()))),
+                ('stream', lambda out: write_task_list(iter_tasks(), out)),
+            ]
+            for name, render in modes:
+                first, total, peak = _measure(render)
+                print(f"{size:>8} {name:<9}{first:>10.1f}{total:>10.1f}{peak:>10.2f}")
+            db.close_connection()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Streaming list benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    run(parser.parse_args().sizes)
@@ -0,0 +1,64 @@
+# Reproducible synthetic datasets: N users x M tasks with realistic priority, status and due date
+# distributions. The same seed always gives the same rows; due dates are offsets from today so
+# overdue and due-soon filters always have work to do.
+#
+#   python -m todo_app.benchmarks.dataset bench.db [--users 10] [--tasks 1000] [--seed 1]
+import argparse
+import random
+from datetime import date, timedelta
+from todo_app.database import db
+from todo_app.models.task_model import Task
+from todo_app.models.user_model import User
+from todo_app.utils import passwords
+
+PASSWORD = 'benchmark'
+PRIORITIES = (('low', 30), ('medium', 50), ('high', 20))
+# Share of tasks that are completed, and of pending tasks without a due date
+COMPLETED_SHARE = 0.35
+UNDATED_SHARE = 0.25
+# Due date offsets in days: (first, last, weight); most work is due within the next few weeks
+DUE_WINDOWS = ((-60, -1, 15), (0, 1, 10), (2, 30, 50), (31, 365, 25))
+WORDS = ('report', 'invoice', 'meeting', 'review', 'deploy', 'call', 'email', 'budget', 'draft', 'plan',
+         'update', 'fix', 'design', 'test', 'release', 'order', 'book', 'pay', 'renew', 'clean')
+
+def username(index):
+    return f'user{index:04d}'
+
+def _due_date(rng, today):
+    if rng.random() < UNDATED_SHARE:
+        return None
+    first, last, _ = rng.choices(DUE_WINDOWS, weights=[w[2] for w in DUE_WINDOWS])[0]
+    return (today + timedelta(days=rng.randint(first, last))).isoformat()
+
+def task_rows(rng, count, today):
+    names, weights = zip(*PRIORITIES)
+    for n in range(count):
+        title = f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {n}"
+        description = ' '.join(rng.choices(WORDS, k=rng.randint(0, 8))) or None
+        status = 'completed' if rng.random() < COMPLETED_SHARE else 'pending'
+        yield (title, description, rng.choices(names, weights)[0], _due_date(rng, today), status)
+
+def generate(users, tasks_per_user, seed=1, today=None):
+    # Fills the current database; returns the created User objects. Every user has PASSWORD.
+    rng = random.Random(seed)
+    today = today or date.today()
+    password_hash = passwords.hash_password(PASSWORD)
+    created = []
+    with db.connection():
+        for index in range(users):
+            user = User.create_user(username(index), password_hash)
+            Task.bulk_create(user.id, task_rows(rng, tasks_per_user, today), batch_size=5000)
+            created.append(user)
+    return created
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a synthetic multi-user database")
+    parser.add_argument('path', help='Database file to create or extend')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=1000, help='Tasks per user')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    db.set_db_path(args.path)
+    db.initialize_database()
+    generate(args.users, args.tasks, args.seed)
+    print(f"Created {args.users} users with {args.tasks} tasks each in {args.path} (password: {PASSWORD})")
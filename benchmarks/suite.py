@@ -0,0 +1,177 @@
+# Times every controller entry point against a synthetic multi-user dataset (benchmarks.dataset),
+# writes the results as JSON and compares them with a stored baseline. Any entry point whose
+# median is more than --tolerance slower than the baseline is reported and the exit status is 1.
+#
+#   python -m todo_app.benchmarks.suite                        # compare with benchmarks/baseline.json
+#   python -m todo_app.benchmarks.suite --json results.json    # also keep this run's numbers
+#   python -m todo_app.benchmarks.suite --save-baseline        # record a new baseline
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from todo_app.benchmarks import dataset
+from todo_app.controllers import auth, tasks
+from todo_app.database import db
+from todo_app.models.task_model import Task, TaskQuery
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# Differences smaller than this are timer noise, whatever the ratio
+MIN_DELTA_MS = 0.05
+
+LIST_FILTERS = {
+    'pending': dict(show_pending=True),
+    'completed': dict(show_completed=True, show_pending=False),
+    'overdue': dict(show_pending=False, show_overdue=True),
+    'due_soon': dict(show_pending=False, show_due_soon=True),
+    'priority_high': dict(show_pending=True, priority='high'),
+}
+LIST_SORTS = ['created_at', 'updated_at', 'due_date', 'priority', 'status']
+
+def _cases(users):
+    # (name, samples scale, fn(user, n)); fn runs inside auth.request_scope(user)
+    pending = {}
+    for user in users:
+        query = TaskQuery(user.id, show_completed=False, sort_by='created_at')
+        pending[user.id] = [task.id for task in Task.find(query)[:50]]
+
+    def add(user, n):
+        tasks.add_task(f'Benchmark task {n}', 'added by the suite', 'medium', None)
+
+    def edit(user, n):
+        ids = pending[user.id]
+        tasks.edit_task(ids[n % len(ids)], description=f'edited {n}')
+
+    def done(user, n):
+        ids = pending[user.id]
+        tasks.mark_done(ids[n % len(ids)])
+
+    def reopen(user, n):
+        ids = pending[user.id]
+        tasks.reopen(ids[n % len(ids)])
+
+    cases = [('add_task', 1, add), ('edit_task', 1, edit), ('mark_done', 1, done), ('reopen', 1, reopen)]
+    for name, filters in LIST_FILTERS.items():
+        cases.append((f'list_tasks[{name}]', 1, lambda user, n, filters=filters: tasks.list_tasks(**filters)))
+    for sort_by in LIST_SORTS:
+        cases.append((f'list_tasks[sort={sort_by}]', 1,
+                      lambda user, n, sort_by=sort_by: tasks.list_tasks(sort_by=sort_by, show_pending=True)))
+    cases.append(('list_tasks_page', 1, lambda user, n: tasks.list_tasks_page(limit=20)))
+    cases.append(('search_tasks', 1, lambda user, n: tasks.search_tasks('report')))
+    cases.append(('get_reminders', 1, lambda user, n: tasks.get_reminders()))
+    cases.append(('task_stats', 1, lambda user, n: tasks.task_stats()))
+    # bcrypt dominates login, so it gets a tenth of the samples
+    cases.append(('login', 0.1, lambda user, n: auth.login(user.username, dataset.PASSWORD)))
+    return cases
+
+def _time_case(fn, users, samples):
+    timings = []
+    for n in range(samples + 1):
+        user = users[n % len(users)]
+        with auth.request_scope(user):
+            start = time.perf_counter()
+            fn(user, n)
+            elapsed = (time.perf_counter() - start) * 1000
+        if n:
+            timings.append(elapsed)  # the first call only warms caches
+    timings.sort()
+    return {
+        'median_ms': round(statistics.median(timings), 4),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        'samples': samples,
+    }
+
+def run_suite(users, tasks_per_user, seed, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        session_file = auth.SESSION_FILE
+        auth.SESSION_FILE = os.path.join(tmp, '.todo_session')
+        db.set_db_path(os.path.join(tmp, 'suite.db'))
+        try:
+            db.initialize_database()
+            created = dataset.generate(users, tasks_per_user, seed)
+            db.get_connection().execute("ANALYZE")
+            results = {}
+            for name, scale, fn in _cases(created):
+                results[name] = _time_case(fn, created, max(3, int(repeat * scale)))
+                print(f"{name:<30}{results[name]['median_ms']:>10.3f} ms{results[name]['p95_ms']:>10.3f} ms p95")
+        finally:
+            auth.logout()
+            auth.SESSION_FILE = session_file
+            db.close_connection()
+    return {
+        'meta': {
+            'users': users,
+            'tasks_per_user': tasks_per_user,
+            'seed': seed,
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+        },
+        'results': results,
+    }
+
+def compare(current, baseline, tolerance):
+    # Returns the names of entry points that regressed
+    keys = ('users', 'tasks_per_user', 'seed')
+    if any(current['meta'][key] != baseline['meta'].get(key) for key in keys):
+        raise ValueError("Baseline was recorded with a different dataset: " +
+                         ', '.join(f"{key}={baseline['meta'].get(key)}" for key in keys))
+    regressions = []
+    print(f"\n{'entry point':<30}{'baseline':>10}{'current':>10}{'change':>9}")
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f"{name:<30}{'-':>10}{result['median_ms']:>10.3f}   (new)")
+            continue
+        after = result['median_ms']
+        change = after / before['median_ms'] - 1 if before['median_ms'] else 0
+        regressed = change > tolerance and after - before['median_ms'] > MIN_DELTA_MS
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<30}{before['median_ms']:>10.3f}{after:>10.3f}{change:>+9.0%}" + ("  REGRESSION" if regressed else ""))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Controller benchmark suite")
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=1000, help='Tasks per user')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=50, help='Samples per entry point')
+    parser.add_argument('--json', help='Write this run to a file')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline to compare with')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown before failing (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.users, args.tasks, args.seed, args.repeat)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(current, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    try:
+        regressions = compare(current, baseline, args.tolerance)
+    except ValueError as e:
+        print(f"\n{e}")
+        return 2
+    if regressions:
+        print(f"\nFAILED: {len(regressions)} entry point(s) slower than the baseline by more than {args.tolerance:.0%}: "
+              + ', '.join(regressions))
+        return 1
+    print("\nNo regressions")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,75 @@
 import argparse
 import getpass
-from .controllers.auth import signup, login, logout, is_logged_in
-from .controllers.tasks import add_task, edit_task, delete_task, list_tasks, view_task, mark_done, reopen, get_reminders
-from .utils.formatter import format_task, format_task_list
-from .utils.notifications import check_reminders, display_notifications
+import os
+import sys
 from .utils.logger import setup_logger, get_logger
 
+# Controllers, bcrypt and colorama are imported inside handle_command so that cheap commands
+# don't pay for them. These commands skip initialize_database (the migration check): they only act
+# on an existing session, and a session implies a migrated database. logout still opens it to
+# revoke the session.
+NO_DB_COMMANDS = ('logout', 'whoami')
+
+# Not available from inside `shell`
+SHELL_EXCLUDED_COMMANDS = ('shell', 'serve')
+HISTORY_FILE = os.path.join(os.path.expanduser('~'), '.todo_history')
+# Not available in `batch`: these prompt for a password on stdin, manage the session file, run forever
+# or (VACUUM) cannot run inside a transaction
+BATCH_EXCLUDED_COMMANDS = ('shell', 'serve', 'batch', 'signup', 'login', 'logout', 'maintenance')
+DEFAULT_COMMIT_EVERY = 1000
+# Output that means a command failed, besides the controller failures in utils.messages:
+# handle_command's own messages
+CLI_FAILURE_PREFIXES = ("Please login first", "An error occurred", "Parse error", "usage:")
+
+def read_password(prompt='Password: '):
+    # Scripted input (a pipe, or `shell` reading a script) gives the password on the next line
+    if sys.stdin.isatty():
+        return getpass.getpass(prompt)
+    return sys.stdin.readline().rstrip('\n')
+
+def show_reminders():
+    from .controllers.tasks import get_reminders
+    reminders = get_reminders()
+    if reminders and not isinstance(reminders, str):
+        from .utils.notifications import check_reminders, display_notifications
+        display_notifications(check_reminders(reminders))
+
+def add_selection_arguments(parser):
+    parser.add_argument('ids', nargs='*', help='Task IDs, ranges (10-500) or comma-separated lists')
+    parser.add_argument('--priority', choices=['low', 'medium', 'high'], help='Select tasks with this priority')
+    parser.add_argument('--completed', action='store_true', help='Select completed tasks')
+    parser.add_argument('--pending', action='store_true', help='Select pending tasks')
+    parser.add_argument('--overdue', action='store_true', help='Select overdue tasks')
+    parser.add_argument('--due-soon', action='store_true', help='Select tasks due today or tomorrow')
+
+def run_selection(args, single, bulk):
+    # A lone plain ID keeps the single-task behaviour; anything else is one set-based statement
+    from .utils.validation import parse_id_spec
+    has_filter = args.priority or args.completed or args.pending or args.overdue or args.due_soon
+    if len(args.ids) == 1 and args.ids[0].isdigit() and not has_filter:
+        return single(int(args.ids[0]))
+    try:
+        ids, ranges = parse_id_spec(args.ids)
+    except ValueError as e:
+        return f"Invalid task selection: {e}"
+    return bulk(ids=ids, ranges=ranges, priority=args.priority, show_completed=args.completed,
+                show_pending=args.pending, show_overdue=args.overdue, show_due_soon=args.due_soon)
+
+def add_output_arguments(parser):
+    parser.add_argument('--format', choices=['cards', 'table', 'json', 'jsonl', 'tsv'], default='cards', help='Output format')
+    parser.add_argument('--columns', help='Comma-separated fields for table/json/jsonl/tsv, e.g. id,title,due_date')
+
+def output_options(args):
+    # (format, columns); raises ValueError for unknown columns
+    from .utils.formatter import parse_columns
+    return args.format, parse_columns(args.columns) if args.columns else None
+
 def create_parser():
     parser = argparse.ArgumentParser(description="Todo App CLI")
     parser.add_argument('--verbose', action='store_true', help='Enable verbose logging')
+    parser.add_argument('--profile', nargs='?', const='profile.jsonl', metavar='PATH',
+                        help='Append per-command timings and queries as JSON lines to PATH (default profile.jsonl, - for stderr)')
+    parser.add_argument('--cprofile', metavar='PATH', help='Write cProfile stats for the whole run to PATH')
 
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
 
@@ -28,7 +89,10 @@ def create_parser():
     parser_add.add_argument('title', help='Task title')
     parser_add.add_argument('--desc', help='Task description')
     parser_add.add_argument('--priority', choices=['low', 'medium', 'high'], default='medium', help='Task priority')
-    parser_add.add_argument('--due', help='Due date in YYYY-MM-DD format')
+    parser_add.add_argument('--due', help='Due date in YYYY-MM-DD format (first occurrence with --repeat, default today)')
+    parser_add.add_argument('--repeat', choices=['daily', 'weekly', 'monthly', 'interval'], help='Make the task recurring')
+    parser_add.add_argument('--every', type=int, default=1, help='Repeat every N days/weeks/months (days for interval)')
+    parser_add.add_argument('--until', help='Last possible occurrence date in YYYY-MM-DD format')
 
     # edit
     parser_edit = subparsers.add_parser('edit', help='Edit an existing task')
@@ -39,12 +103,13 @@ def create_parser():
     parser_edit.add_argument('--due', help='New due date in YYYY-MM-DD format')
 
     # delete
-    parser_delete = subparsers.add_parser('delete', help='Delete a task')
-    parser_delete.add_argument('id', type=int, help='Task ID')
+    parser_delete = subparsers.add_parser('delete', help='Delete one or more tasks')
+    add_selection_arguments(parser_delete)
 
     # view
     parser_view = subparsers.add_parser('view', help='View a task')
     parser_view.add_argument('id', type=int, help='Task ID')
+    add_output_arguments(parser_view)
 
     # list
     parser_list = subparsers.add_parser('list', help='List tasks')
@@ -55,98 +120,235 @@ def create_parser():
     parser_list.add_argument('--order', choices=['ASC', 'DESC'], default='ASC', help='Sort order')
     parser_list.add_argument('--overdue', action='store_true', help='Show overdue tasks')
     parser_list.add_argument('--due-soon', action='store_true', help='Show tasks due soon')
+    parser_list.add_argument('--limit', type=int, help='Show at most this many tasks per page')
+    parser_list.add_argument('--after', help='Cursor from a previous page')
+    parser_list.add_argument('--archived', action='store_true', help='Include archived tasks (implies --completed when no status is given)')
+    add_output_arguments(parser_list)
+
+    # search
+    parser_search = subparsers.add_parser('search', help='Search task titles and descriptions')
+    parser_search.add_argument('text', help="Words to find; end a word with * to match it as a prefix")
+    parser_search.add_argument('--completed', action='store_true', help='Only completed tasks')
+    parser_search.add_argument('--pending', action='store_true', help='Only pending tasks')
+    parser_search.add_argument('--priority', choices=['low', 'medium', 'high'], help='Filter by priority')
+    parser_search.add_argument('--limit', type=int, default=20, help='Show at most this many matches')
+    add_output_arguments(parser_search)
 
     # done
-    parser_done = subparsers.add_parser('done', help='Mark a task as done')
-    parser_done.add_argument('id', type=int, help='Task ID')
+    parser_done = subparsers.add_parser('done', help='Mark one or more tasks as done')
+    add_selection_arguments(parser_done)
 
     # reopen
-    parser_reopen = subparsers.add_parser('reopen', help='Reopen a completed task')
-    parser_reopen.add_argument('id', type=int, help='Task ID')
+    parser_reopen = subparsers.add_parser('reopen', help='Reopen one or more completed tasks')
+    add_selection_arguments(parser_reopen)
+
+    # recurring
+    parser_recurring = subparsers.add_parser('recurring', help='List recurring tasks or stop one')
+    parser_recurring.add_argument('--stop', type=int, metavar='ID', help='Stop the recurring task with this ID')
+
+    # archive
+    parser_archive = subparsers.add_parser('archive', help='Move completed tasks to the archive')
+    parser_archive.add_argument('ids', nargs='*', help='Task IDs, ranges (10-500) or comma-separated lists')
+    parser_archive.add_argument('--older-than', type=int, metavar='DAYS', help='Archive tasks completed more than DAYS days ago')
+    parser_archive.add_argument('--priority', choices=['low', 'medium', 'high'], help='Only tasks with this priority')
+
+    # unarchive
+    parser_unarchive = subparsers.add_parser('unarchive', help='Move archived tasks back to the task list')
+    parser_unarchive.add_argument('ids', nargs='+', help='Task IDs, ranges (10-500) or comma-separated lists')
+
+    # import
+    parser_import = subparsers.add_parser('import', help='Import tasks from a CSV or JSONL file')
+    parser_import.add_argument('path', help="File to read, or '-' for stdin")
+    parser_import.add_argument('--format', choices=['csv', 'jsonl'], help='File format (default: from extension)')
+    parser_import.add_argument('--batch-size', type=int, default=1000, help='Rows per insert batch')
+
+    # export
+    parser_export = subparsers.add_parser('export', help='Export tasks to a CSV or JSONL file')
+    parser_export.add_argument('path', help="File to write, or '-' for stdout")
+    parser_export.add_argument('--format', choices=['csv', 'jsonl'], help='File format (default: from extension)')
+
+    # stats
+    parser_stats = subparsers.add_parser('stats', help='Show task counts by status, priority and due date')
+    parser_stats.add_argument('--format', choices=['text', 'json'], default='text', help='Output format')
+    parser_stats.add_argument('--scan', action='store_true', help='Count from the tasks table instead of the stored counters')
+    parser_stats.add_argument('--check', action='store_true', help='Compare the stored counters with the tasks table')
+    parser_stats.add_argument('--rebuild', action='store_true', help='Recompute the stored counters from the tasks table')
+
+    # maintenance
+    parser_maintenance = subparsers.add_parser('maintenance', help='Archive old completed tasks and refresh database statistics')
+    parser_maintenance.add_argument('--archive-days', type=int,
+                                    help='Archive tasks completed more than this many days ago (default TODO_ARCHIVE_AFTER_DAYS or 30)')
+    parser_maintenance.add_argument('--no-archive', action='store_true', help='Skip archiving')
+    parser_maintenance.add_argument('--batch-size', type=int, default=1000, help='Tasks moved per transaction')
+    parser_maintenance.add_argument('--vacuum', action='store_true', help='Also VACUUM to shrink the database file')
 
     # whoami
     subparsers.add_parser('whoami', help='Show current logged-in user')
 
+    # serve
+    parser_serve = subparsers.add_parser('serve', help='Serve the HTTP/JSON API')
+    parser_serve.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser_serve.add_argument('--port', type=int, default=8765, help='Port to listen on (0 picks a free port)')
+    parser_serve.add_argument('--workers', type=int, default=8, help='Requests handled concurrently')
+    parser_serve.add_argument('--auth-workers', type=int, default=2, help='Signups and logins hashed concurrently (0 shares the main workers)')
+
+    # shell
+    subparsers.add_parser('shell', help='Run commands interactively (or from a script on stdin) in one process')
+
+    # batch
+    parser_batch = subparsers.add_parser('batch', help='Run a file of commands in one process, grouped into transactions')
+    parser_batch.add_argument('path', nargs='?', default='-', help="File of commands, one per line, or '-' for stdin")
+    parser_batch.add_argument('--commit-every', type=int, default=DEFAULT_COMMIT_EVERY, help='Lines per transaction')
+    parser_batch.add_argument('--atomic', action='store_true', help='One transaction for the whole batch; the first failure rolls it all back')
+    parser_batch.add_argument('--results', choices=['text', 'jsonl'], default='text', help='Per-line result format')
+
     return parser
 
-def handle_command(args):
+def handle_command(args, reminders=True):
     setup_logger(args.verbose)
-    log = get_logger()
 
     try:
         if args.command == 'signup':
+            from .controllers.auth import signup
             username = args.username
-            password = getpass.getpass('Password: ')
+            password = read_password()
             result = signup(username, password)
             if result:
                 print("Signup successful")
             else:
                 print("Signup failed")
                 if args.verbose:
-                    log.error("Signup failed")
+                    get_logger().error("Signup failed")
 
         elif args.command == 'login':
+            from .controllers.auth import login
             username = args.username
-            password = getpass.getpass('Password: ')
+            password = read_password()
             if login(username, password):
                 print("Login successful")
             else:
                 print("Login failed")
                 if args.verbose:
-                    log.error("Login failed")
+                    get_logger().error("Login failed")
 
         elif args.command == 'logout':
+            from .controllers.auth import logout
             logout()
             print("Logged out")
 
         elif args.command == 'whoami':
-            user = get_current_user()
-            if user:
-                print(f"Logged in as: {user.username}")
+            from .controllers.auth import get_session_username
+            username = get_session_username()
+            if username:
+                print(f"Logged in as: {username}")
             else:
                 print("Not logged in")
 
+        elif args.command == 'shell':
+            run_shell()
+
+        elif args.command == 'batch':
+            if args.commit_every < 1:
+                print("Commit interval must be positive")
+                return
+            if args.path == '-':
+                succeeded, failed, rolled_back = run_batch(sys.stdin, args.commit_every, args.atomic, args.results)
+            else:
+                with open(args.path, 'r', encoding='utf-8') as f:
+                    succeeded, failed, rolled_back = run_batch(f, args.commit_every, args.atomic, args.results)
+            summary = f"{succeeded} succeeded, {failed} failed"
+            if rolled_back:
+                summary += "; rolled back, nothing was saved"
+            print(summary, file=sys.stderr)
+            if failed:
+                sys.exit(1)
+
+        elif args.command == 'maintenance':
+            # Covers every user's tasks, so it runs without a login (e.g. from cron)
+            from .controllers.maintenance import run_maintenance
+            from .models.archive_model import ARCHIVE_AFTER_DAYS
+            archive_days = None if args.no_archive else (ARCHIVE_AFTER_DAYS if args.archive_days is None else args.archive_days)
+            report = run_maintenance(archive_days, args.batch_size, args.vacuum)
+            print(report if isinstance(report, str) else '\n'.join(report))
+
+        elif args.command == 'serve':
+            # API clients log in per request with bearer tokens; the CLI session is not used
+            from .server import serve
+            if args.workers < 1:
+                print("Workers must be positive")
+                return
+            if args.auth_workers < 0:
+                print("Auth workers cannot be negative")
+                return
+            serve(args.host, args.port, args.workers, args.auth_workers)
+
         else:
             # Commands that require login
+            from .controllers.auth import is_logged_in
+            from .utils import dates
+            from .controllers.tasks import (add_task, edit_task, delete_task, iter_tasks, list_tasks_page, view_task,
+                                            mark_done, reopen, mark_done_many, reopen_many, delete_many)
             if not is_logged_in():
                 print("Please login first")
                 return
+            dates.reset_today()
 
-            # Get and display reminders
-            reminders = get_reminders()
-            if reminders:
-                notifs = check_reminders(reminders)
-                display_notifications(notifs)
+            # Get and display reminders (not for bulk transfers or machine-readable output, which may be piped)
+            if reminders and args.command not in ('import', 'export') and getattr(args, 'format', None) not in ('json', 'jsonl', 'tsv'):
+                show_reminders()
 
             if args.command == 'add':
-                result = add_task(args.title, args.desc, args.priority, args.due)
+                if (args.every != 1 or args.until) and not args.repeat:
+                    print("Invalid options: --every and --until need --repeat")
+                    return
+                result = add_task(args.title, args.desc, args.priority, args.due, repeat=args.repeat, every=args.every, until=args.until)
                 print(result)
 
+            elif args.command == 'recurring':
+                from .controllers.tasks import list_recurring, stop_recurring
+                if args.stop is not None:
+                    print(stop_recurring(args.stop))
+                    return
+                templates = list_recurring()
+                if isinstance(templates, str):
+                    print(templates)
+                elif not templates:
+                    print("No recurring tasks.")
+                else:
+                    from .utils.formatter import format_recurrence
+                    print('\n'.join(format_recurrence(template) for template in templates))
+
             elif args.command == 'edit':
                 result = edit_task(args.id, title=args.title, description=args.desc, priority=args.priority, due_date=args.due)
                 print(result)
 
             elif args.command == 'delete':
-                result = delete_task(args.id)
+                result = run_selection(args, delete_task, delete_many)
                 print(result)
 
             elif args.command == 'view':
+                from .utils.formatter import write_task
+                fmt, columns = output_options(args)
                 task = view_task(args.id)
                 if task:
-                    print(format_task(task))
+                    write_task(task, fmt, columns)
                 else:
                     print("Task not found")
 
             elif args.command == 'list':
+                from .utils.formatter import write_tasks, MACHINE_FORMATS
+                fmt, columns = output_options(args)
                 # Determine filters
                 show_completed = args.completed
                 show_pending = args.pending
                 show_overdue = args.overdue
                 show_due_soon = args.due_soon
                 if not (show_completed or show_pending or show_overdue or show_due_soon):
-                    show_pending = True  # Default to show pending tasks
+                    # Default to show pending tasks; archived tasks are all completed
+                    show_completed = args.archived
+                    show_pending = not args.archived
 
-                tasks_list = list_tasks(
+                filters = dict(
                     status=None,  # Get all, filter in function
                     priority=args.priority,
                     sort_by=args.sort_by,
@@ -154,22 +356,258 @@ def handle_command(args):
                     show_completed=show_completed,
                     show_pending=show_pending,
                     show_overdue=show_overdue,
-                    show_due_soon=show_due_soon
+                    show_due_soon=show_due_soon,
+                    include_archived=args.archived
                 )
-                if tasks_list:
-                    print(format_task_list(tasks_list))
+                if args.limit is not None or args.after:
+                    page = list_tasks_page(limit=20 if args.limit is None else args.limit, after=args.after, **filters)
+                    if isinstance(page, str):
+                        print(page)
+                        return
+                    tasks_list = page.tasks
                 else:
+                    page = None
+                    tasks_list = iter_tasks(**filters)
+                    if isinstance(tasks_list, str):
+                        print(tasks_list)
+                        return
+                if not write_tasks(tasks_list, fmt, columns) and fmt not in MACHINE_FORMATS:
                     print("No tasks found.")
+                if page and page.next_cursor:
+                    print(f"Next page: --after {page.next_cursor}", file=sys.stderr if fmt in MACHINE_FORMATS else sys.stdout)
+
+            elif args.command == 'search':
+                from .controllers.tasks import search_tasks
+                from .utils.formatter import write_tasks, MACHINE_FORMATS
+                fmt, columns = output_options(args)
+                tasks_list = search_tasks(args.text, priority=args.priority, show_completed=args.completed,
+                                          show_pending=args.pending, limit=args.limit)
+                if isinstance(tasks_list, str):
+                    print(tasks_list)
+                    return
+                if not write_tasks(tasks_list, fmt, columns) and fmt not in MACHINE_FORMATS:
+                    print("No matching tasks.")
+
+            elif args.command == 'import':
+                from .controllers.transfer import import_tasks
+                result = import_tasks(args.path, args.format, args.batch_size)
+                if isinstance(result, str):
+                    print(result)
+                    return
+                imported, errors = result
+                for line, message in errors:
+                    print(f"Row {line}: {message}")
+                print(f"Imported {imported} tasks" + (f" ({len(errors)} rows skipped)" if errors else ""))
+
+            elif args.command == 'export':
+                from .controllers.transfer import export_tasks
+                result = export_tasks(args.path, args.format)
+                if args.path == '-':
+                    print(result, file=sys.stderr)
+                else:
+                    print(result)
 
             elif args.command == 'done':
-                result = mark_done(args.id)
+                result = run_selection(args, mark_done, mark_done_many)
                 print(result)
 
             elif args.command == 'reopen':
-                result = reopen(args.id)
+                result = run_selection(args, reopen, reopen_many)
                 print(result)
 
+            elif args.command in ('archive', 'unarchive'):
+                from .controllers.tasks import archive_tasks, unarchive_tasks
+                from .utils.validation import parse_id_spec
+                try:
+                    ids, ranges = parse_id_spec(args.ids)
+                except ValueError as e:
+                    print(f"Invalid task selection: {e}")
+                    return
+                if args.command == 'archive':
+                    print(archive_tasks(ids, ranges, priority=args.priority, older_than=args.older_than))
+                else:
+                    print(unarchive_tasks(ids, ranges))
+
+            elif args.command == 'stats':
+                from .controllers.tasks import task_stats, check_stats, rebuild_stats
+                if args.check:
+                    mismatches = check_stats()
+                    if isinstance(mismatches, str):
+                        print(mismatches)
+                        return
+                    for table, key, stored, actual in mismatches:
+                        print(f"{table} {'/'.join(key)}: stored {stored}, actual {actual}")
+                    print(f"{len(mismatches)} mismatched counters" + (" (run stats --rebuild)" if mismatches else ""))
+                    return
+                if args.rebuild:
+                    print(rebuild_stats())
+                stats = task_stats(scan=args.scan)
+                if isinstance(stats, str):
+                    print(stats)
+                elif args.format == 'json':
+                    import json
+                    print(json.dumps(stats.to_dict()))
+                else:
+                    from .utils.formatter import format_stats
+                    print(format_stats(stats))
+
     except Exception as e:
         print(f"An error occurred: {e}")
         if args.verbose:
-            log.error(f"An error occurred: {e}")
+            get_logger().error(f"An error occurred: {e}")
+
+def _enable_history():
+    try:
+        import readline
+    except ImportError:
+        return  # No line editing on this platform
+    import atexit
+    try:
+        readline.read_history_file(HISTORY_FILE)
+    except OSError:
+        pass
+    readline.set_history_length(1000)
+    atexit.register(readline.write_history_file, HISTORY_FILE)
+
+def run_shell(stream=None):
+    # One process for many commands: the database connection, the logged-in user, imported modules
+    # and caches stay warm between lines. Reminders are shown once, at start and after a login.
+    import shlex
+    from .controllers.auth import is_logged_in
+    stream = stream or sys.stdin
+    interactive = stream.isatty()
+    parser = create_parser()
+    if interactive:
+        _enable_history()
+        print("Todo shell: enter commands without the program name; 'help' lists them, 'exit' quits.")
+    if is_logged_in():
+        show_reminders()
+    while True:
+        if interactive:
+            try:
+                line = input('todo> ')
+            except EOFError:
+                print()
+                break
+            except KeyboardInterrupt:
+                print()
+                continue
+        else:
+            line = stream.readline()
+            if not line:
+                break
+        try:
+            argv = shlex.split(line, comments=True)
+        except ValueError as e:
+            print(f"Parse error: {e}")
+            continue
+        if not argv:
+            continue
+        if argv[0] in ('exit', 'quit'):
+            break
+        if argv[0] == 'help':
+            parser.print_help()
+            continue
+        if argv[0] in SHELL_EXCLUDED_COMMANDS:
+            print(f"'{argv[0]}' is not available inside the shell")
+            continue
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit:
+            continue  # argparse has already printed the usage error or help
+        if args.command is None:
+            continue
+        try:
+            handle_command(args, reminders=False)
+        except KeyboardInterrupt:
+            print()
+            continue
+        if args.command == 'login' and is_logged_in():
+            show_reminders()
+
+class _BatchFailed(Exception):
+    pass
+
+def is_failure(output):
+    from .utils import messages
+    return messages.is_failure(output) or output.startswith(CLI_FAILURE_PREFIXES)
+
+def run_batch(stream, commit_every=DEFAULT_COMMIT_EVERY, atomic=False, results='text', out=None):
+    # Runs command lines through handle_command in one process and reports each line's result.
+    # Lines are grouped into transactions of commit_every lines (nested controller transactions
+    # join the open one); each line runs inside a savepoint so a failed line leaves none of its
+    # writes behind. With atomic, the first failed line rolls the whole batch back and ends it.
+    # Returns (succeeded, failed, rolled_back).
+    import io
+    import json
+    import shlex
+    from contextlib import ExitStack, redirect_stdout, redirect_stderr
+    from .database import db
+    parser = create_parser()
+    out = out or sys.stdout
+    succeeded = failed = grouped = 0
+    transaction = ExitStack()
+    conn = transaction.enter_context(db.connection())
+    try:
+        for number, line in enumerate(stream, 1):
+            captured = io.StringIO()
+            command = None
+            ok = False
+            try:
+                argv = shlex.split(line, comments=True)
+            except ValueError as e:
+                argv = None
+                captured.write(f"Parse error: {e}\n")
+            if argv == []:
+                continue
+            if argv:
+                command = argv[0]
+                if command in BATCH_EXCLUDED_COMMANDS:
+                    captured.write(f"'{command}' is not available in a batch\n")
+                else:
+                    # Until the group's first write there is no transaction to nest a savepoint
+                    # in (a SAVEPOINT would open one that RELEASE commits); a failed line's writes
+                    # are then the whole transaction.
+                    savepoint = conn.in_transaction
+                    if savepoint:
+                        conn.execute("SAVEPOINT batch_line")
+                    with redirect_stdout(captured), redirect_stderr(captured):
+                        try:
+                            handle_command(parser.parse_args(argv), reminders=False)
+                            ok = True
+                        except SystemExit as e:
+                            ok = not e.code  # --help exits 0, usage errors 2
+                    ok = ok and not is_failure(captured.getvalue())
+                    if savepoint:
+                        if not ok:
+                            conn.execute("ROLLBACK TO batch_line")
+                        conn.execute("RELEASE batch_line")
+                    elif not ok and conn.in_transaction:
+                        conn.rollback()
+            output = captured.getvalue().rstrip('\n')
+            ok = ok and not is_failure(output)
+            if ok:
+                succeeded += 1
+            else:
+                failed += 1
+            if results == 'jsonl':
+                out.write(json.dumps({'line': number, 'command': command, 'ok': ok, 'output': output}) + '\n')
+            else:
+                separator = '\n' if '\n' in output else ' '  # multi-line output (a listing) starts on its own line
+                out.write(f"{number} {'ok' if ok else 'error'}:{separator}{output}\n")
+            grouped += 1
+            if not ok and atomic:
+                raise _BatchFailed()
+            if grouped >= commit_every and not atomic:
+                transaction.close()
+                grouped = 0
+                transaction = ExitStack()
+                transaction.enter_context(db.connection())
+    except BaseException as e:
+        transaction.__exit__(type(e), e, e.__traceback__)  # rolls back the open group
+        if isinstance(e, _BatchFailed):
+            return succeeded, failed, True
+        raise
+    transaction.close()
+    out.flush()
+    return succeeded, failed, False
@@ -1,26 +1,55 @@
-import bcrypt
 import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from ..database import db
+from ..models.session_model import Session
 from ..models.user_model import User
+from ..utils import passwords, tokens
+from ..utils.logger import get_logger
 
 current_user = None
+current_session_id = None
 SESSION_FILE = '.todo_session'
+# Seconds a signed token is trusted before the sessions table is asked whether it was revoked
+REVOCATION_CHECK_INTERVAL = int(os.environ.get('TODO_REVOCATION_CHECK_INTERVAL', 300))
+_session_loaded = False
+_revocation_checks = {}
+# Inside request_scope() the user comes from here (a 1-tuple, the user or None) instead of the
+# process-wide session, so concurrent requests on different threads never see each other's user
+_request_user = ContextVar('request_user', default=None)
 
 def signup(username, password):
     try:
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-        user = User.create_user(username, hashed_password.decode('utf-8'))
+        user = User.create_user(username, passwords.hash_password(password))
         return user is not None
     except Exception as e:
         print(f"Error during signup: {e}")
         return False
 
+def authenticate(username, password):
+    # The user if the password matches, else None; no session is created. A hash made with a
+    # different work factor than passwords.ROUNDS is replaced while the password is at hand.
+    user = User.find_by_username(username)
+    if not user or not passwords.verify_password(password, user.password_hash):
+        return None
+    if passwords.needs_rehash(user.password_hash):
+        try:
+            user.password_hash = passwords.hash_password(password)
+            User.update_password_hash(user.id, user.password_hash)
+        except Exception as e:
+            get_logger().error(f"Password rehash failed: {e}")  # Retried on the next login
+    return user
+
 def login(username, password):
-    global current_user
+    global current_user, current_session_id, _session_loaded
     try:
-        user = User.find_by_username(username)
-        if user and bcrypt.checkpw(password.encode('utf-8'), user.password_hash.encode('utf-8')):
+        user = authenticate(username, password)
+        if user:
+            current_session_id, token = _create_session(user)
             current_user = user
-            save_session()
+            _session_loaded = True
+            save_session(token, int(time.time()))
             return True
         return False
     except Exception as e:
@@ -28,34 +57,125 @@ def login(username, password):
         return False
 
 def logout():
-    global current_user
+    global current_user, current_session_id, _session_loaded
+    _ensure_session()
+    if current_session_id:
+        try:
+            Session.revoke(current_session_id)
+        except Exception:
+            pass  # The local session is dropped regardless
     current_user = None
+    current_session_id = None
+    _session_loaded = True
     save_session()
 
+def _secret():
+    return tokens.get_secret(os.path.dirname(db.current_db_path))
+
+def _create_session(user):
+    now = int(time.time())
+    session_id = tokens.new_session_id()
+    Session.create_session(session_id, user.id, now + tokens.DEFAULT_TTL)
+    return session_id, tokens.create_token(_secret(), user.id, user.username, session_id, now=now)
+
+def issue_token(user):
+    # Records the session server-side and returns its signed token
+    return _create_session(user)[1]
+
+def authenticate_token(token):
+    # Verifies signature and expiry without a users lookup; revocation is checked at most once
+    # per REVOCATION_CHECK_INTERVAL for each session
+    claims = tokens.verify_token(_secret(), token)
+    if not claims:
+        return None
+    now = time.time()
+    checked_at = _revocation_checks.get(claims['sid'], 0)
+    if now - checked_at >= REVOCATION_CHECK_INTERVAL:
+        if not Session.is_active(claims['sid'], now):
+            _revocation_checks.pop(claims['sid'], None)
+            return None
+        _revocation_checks[claims['sid']] = now
+    return User(claims['uid'], claims['usr'], None, None)
+
+def revoke_token(token):
+    claims = tokens.verify_token(_secret(), token)
+    if not claims:
+        return False
+    _revocation_checks.pop(claims['sid'], None)
+    return Session.revoke(claims['sid'])
+
+@contextmanager
+def request_scope(user):
+    # Controllers called inside this block act as `user` (None for an anonymous request)
+    reset = _request_user.set((user,))
+    try:
+        yield user
+    finally:
+        _request_user.reset(reset)
+
+def _ensure_session():
+    # The session file is read the first time someone asks for the user, not at import
+    if not _session_loaded and current_user is None:
+        load_session()
+
 def get_current_user():
+    scoped = _request_user.get()
+    if scoped is not None:
+        return scoped[0]
+    _ensure_session()
     return current_user
 
 def is_logged_in():
-    return current_user is not None
+    return get_current_user() is not None
+
+def _read_session_file():
+    try:
+        with open(SESSION_FILE, 'r') as f:
+            lines = f.read().split()
+    except OSError:
+        return None, 0
+    if not lines:
+        return None, 0
+    try:
+        checked_at = int(lines[1]) if len(lines) > 1 else 0
+    except ValueError:
+        checked_at = 0
+    return lines[0], checked_at
 
-def save_session():
-    if current_user:
+def get_session_username():
+    # Who the session token says is logged in, without touching the database
+    if current_user is not None:
+        return current_user.username
+    token, _ = _read_session_file()
+    claims = tokens.verify_token(_secret(), token) if token else None
+    return claims['usr'] if claims else None
+
+def save_session(token=None, checked_at=0):
+    # The session file holds the signed token and when its revocation status was last checked
+    if token:
         with open(SESSION_FILE, 'w') as f:
-            f.write(current_user.username)
+            f.write(f"{token}\n{checked_at}\n")
     else:
         if os.path.exists(SESSION_FILE):
             os.remove(SESSION_FILE)
 
 def load_session():
-    global current_user
-    if os.path.exists(SESSION_FILE):
-        try:
-            with open(SESSION_FILE, 'r') as f:
-                username = f.read().strip()
-                user = User.find_by_username(username)
-                if user:
-                    current_user = user
-        except Exception:
-            pass  # Ignore errors
-
-load_session()
+    global current_user, current_session_id, _session_loaded
+    _session_loaded = True
+    token, checked_at = _read_session_file()
+    if not token:
+        return
+    try:
+        claims = tokens.verify_token(_secret(), token)
+        if not claims:
+            return
+        now = time.time()
+        if now - checked_at >= REVOCATION_CHECK_INTERVAL:
+            if not Session.is_active(claims['sid'], now):
+                save_session()
+                return
+            save_session(token, int(now))
+        current_user = User(claims['uid'], claims['usr'], None, None)
+        current_session_id = claims['sid']
+    except Exception:
+        pass  # Ignore errors
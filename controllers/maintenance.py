@@ -0,0 +1,23 @@
+from ..database import db
+from ..models.archive_model import Archive, ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+
+def run_maintenance(archive_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE, vacuum=False):
+    # Database-wide upkeep meant for cron: archives every user's completed tasks older than
+    # archive_days (None skips it) in batches, then runs ANALYZE and optionally VACUUM.
+    # Returns a list of report lines.
+    if archive_days is not None and archive_days < 0:
+        return "Invalid age: days cannot be negative"
+    if batch_size < 1:
+        return "Batch size must be positive"
+    report = []
+    try:
+        if archive_days is not None:
+            moved = Archive.archive_completed(archive_days, batch_size)
+            report.append(f"Archived {moved} task{'' if moved == 1 else 's'} completed more than {archive_days} days ago")
+        before, after = db.optimize(vacuum)
+        report.append("Statistics updated")
+        if vacuum:
+            report.append(f"Vacuumed: {before} -> {after} bytes")
+    except Exception as e:
+        return f"Error: {str(e)}"
+    return report
@@ -1,22 +1,77 @@
+from datetime import datetime, timedelta
 from ..controllers.auth import is_logged_in, get_current_user
-from ..models.task_model import Task
-from datetime import date, datetime, timedelta
+from ..models.task_model import Task, TaskQuery, TaskNotFound, TaskAccessDenied
+from ..models.archive_model import Archive
+from ..models.recurrence_model import Recurrence
+from ..models.reminder_model import Reminder
+from ..models.stats_model import TaskStats
+from ..utils import dates, recurrence
+from ..utils.validation import is_valid_date
 
-def add_task(title, description=None, priority='medium', due_date=None):
+def add_task(title, description=None, priority='medium', due_date=None, repeat=None, every=1, until=None):
+    if repeat:
+        result = create_recurring(title, description, priority, due_date, repeat, every, until)
+        return result if isinstance(result, str) else f"Recurring task added ({result.rule}, from {result.start_date})"
+    result = create_task(title, description, priority, due_date)
+    return result if isinstance(result, str) else "Task added successfully"
+
+def create_recurring(title, description=None, priority='medium', start_date=None, frequency='daily', every=1, end_date=None):
+    # Stores a recurrence template starting on start_date (default today); returns the Recurrence
+    if not is_logged_in():
+        return "User not logged in"
+    if priority not in ['low', 'medium', 'high']:
+        return "Invalid priority"
+    if frequency not in recurrence.FREQUENCIES:
+        return "Invalid frequency"
+    if frequency == 'interval' and every < 2:
+        return "Invalid interval: use --every N (days) with --repeat interval"
+    for value in (start_date, end_date):
+        if value and not is_valid_date(value):
+            return "Invalid date format. Use YYYY-MM-DD"
+    try:
+        return Recurrence.create(get_current_user().id, title, description, priority, frequency, every,
+                                 start_date or dates.today().isoformat(), end_date)
+    except ValueError as e:
+        return str(e)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def list_recurring():
+    if not is_logged_in():
+        return "User not logged in"
+    try:
+        return Recurrence.find_by_user_id(get_current_user().id)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def stop_recurring(template_id):
+    if not is_logged_in():
+        return "User not logged in"
+    try:
+        if Recurrence.stop(template_id, get_current_user().id):
+            return "Recurrence stopped"
+        return "Recurring task not found"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def _materialize_for(query):
+    # Recurring occurrences are created just before a listing that can show their due dates
+    through = Recurrence.window_end(query.show_pending, query.show_overdue, query.show_due_soon, query.today)
+    if through is not None:
+        Recurrence.materialize(query.user_id, through)
+
+def create_task(title, description=None, priority='medium', due_date=None):
+    # Like add_task, but returns the new Task on success
     if not is_logged_in():
         return "User not logged in"
     current_user = get_current_user()
     user_id = current_user.id
     if priority not in ['low', 'medium', 'high']:
         return "Invalid priority"
-    if due_date:
-        try:
-            datetime.strptime(due_date, '%Y-%m-%d')
-        except ValueError:
-            return "Invalid date format. Use YYYY-MM-DD"
+    if due_date and not is_valid_date(due_date):
+        return "Invalid date format. Use YYYY-MM-DD"
     try:
-        task = Task.create_task(user_id, title, description, priority, due_date)
-        return "Task added successfully"
+        return Task.create_task(user_id, title, description, priority, due_date)
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -25,23 +80,20 @@ def edit_task(task_id, title=None, description=None, priority=None, due_date=Non
         return "User not logged in"
     current_user = get_current_user()
     user_id = current_user.id
-    task = Task.find_by_id(task_id)
-    if not task or task.user_id != user_id:
-        return "Task not found or access denied"
     if priority and priority not in ['low', 'medium', 'high']:
         return "Invalid priority"
-    if due_date:
-        try:
-            datetime.strptime(due_date, '%Y-%m-%d')
-        except ValueError:
-            return "Invalid date format. Use YYYY-MM-DD"
+    if due_date and not is_valid_date(due_date):
+        return "Invalid date format. Use YYYY-MM-DD"
     kwargs = {k: v for k, v in [('title', title), ('description', description), ('priority', priority), ('due_date', due_date)] if v is not None}
+    if not kwargs:
+        return "Nothing to update"
     try:
-        updated_task = Task.update_task(task_id, **kwargs)
-        if updated_task:
-            return "Task updated successfully"
-        else:
-            return "Error updating task"
+        Task.update_owned(task_id, user_id, **kwargs)
+        return "Task updated successfully"
+    except TaskNotFound:
+        return "Task not found"
+    except TaskAccessDenied:
+        return "Access denied"
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -50,88 +102,102 @@ def delete_task(task_id):
         return "User not logged in"
     current_user = get_current_user()
     user_id = current_user.id
-    task = Task.find_by_id(task_id)
-    if not task or task.user_id != user_id:
-        return "Task not found or access denied"
     try:
-        if Task.delete_task(task_id):
-            return "Task deleted successfully"
-        else:
-            return "Error deleting task"
+        Task.delete_owned(task_id, user_id)
+        return "Task deleted successfully"
+    except TaskNotFound:
+        return "Task not found"
+    except TaskAccessDenied:
+        return "Access denied"
     except Exception as e:
         return f"Error: {str(e)}"
 
-def list_tasks(status=None, priority=None, sort_by='created_at', order='ASC', show_completed=False, show_pending=True, show_overdue=False, show_due_soon=False):
+def list_tasks(status=None, priority=None, sort_by='created_at', order='ASC', show_completed=False, show_pending=True, show_overdue=False, show_due_soon=False, include_archived=False):
     if not is_logged_in():
         return "User not logged in"
     current_user = get_current_user()
     user_id = current_user.id
-    tasks = Task.find_by_user_id(user_id, status=status, priority=priority, sort_by=sort_by, order=order)
-    today = date.today()
-    tomorrow = today + timedelta(days=1)
-    filtered_tasks = []
-    for task in tasks:
-        include = False
-        if task.status == 'completed' and show_completed:
-            include = True
-        elif task.status == 'pending':
-            if show_pending:
-                include = True
-            if show_overdue and task.due_date:
-                try:
-                    task_date = datetime.strptime(task.due_date, '%Y-%m-%d').date()
-                    if task_date < today:
-                        include = True
-                except ValueError:
-                    pass
-            if show_due_soon and task.due_date:
-                try:
-                    task_date = datetime.strptime(task.due_date, '%Y-%m-%d').date()
-                    if task_date <= tomorrow:
-                        include = True
-                except ValueError:
-                    pass
-        if include:
-            filtered_tasks.append(task)
-    # Sort filtered_tasks by sort_by and order
-    reverse = order.upper() == 'DESC'
-    if sort_by == 'created_at':
-        filtered_tasks.sort(key=lambda t: t.created_at, reverse=reverse)
-    elif sort_by == 'updated_at':
-        filtered_tasks.sort(key=lambda t: t.updated_at, reverse=reverse)
-    elif sort_by == 'due_date':
-        filtered_tasks.sort(key=lambda t: datetime.strptime(t.due_date, '%Y-%m-%d').date() if t.due_date else date.max, reverse=reverse)
-    elif sort_by == 'priority':
-        priority_order = {'low': 0, 'medium': 1, 'high': 2}
-        filtered_tasks.sort(key=lambda t: priority_order.get(t.priority, 1), reverse=reverse)
-    elif sort_by == 'status':
-        status_order = {'pending': 0, 'completed': 1}
-        filtered_tasks.sort(key=lambda t: status_order.get(t.status, 0), reverse=reverse)
-    return filtered_tasks
+    try:
+        query = TaskQuery(user_id, status=status, priority=priority, show_completed=show_completed, show_pending=show_pending,
+                          show_overdue=show_overdue, show_due_soon=show_due_soon, sort_by=sort_by, order=order,
+                          include_archived=include_archived)
+    except ValueError as e:
+        return str(e)
+    _materialize_for(query)
+    return Task.find(query)
+
+def iter_tasks(status=None, priority=None, sort_by='created_at', order='ASC', show_completed=False, show_pending=True, show_overdue=False, show_due_soon=False, include_archived=False):
+    # Streaming variant of list_tasks: returns a generator of tasks
+    if not is_logged_in():
+        return "User not logged in"
+    current_user = get_current_user()
+    user_id = current_user.id
+    try:
+        query = TaskQuery(user_id, status=status, priority=priority, show_completed=show_completed, show_pending=show_pending,
+                          show_overdue=show_overdue, show_due_soon=show_due_soon, sort_by=sort_by, order=order,
+                          include_archived=include_archived)
+    except ValueError as e:
+        return str(e)
+    _materialize_for(query)
+    return Task.iter(query)
+
+def list_tasks_page(status=None, priority=None, sort_by='created_at', order='ASC', show_completed=False, show_pending=True, show_overdue=False, show_due_soon=False, limit=20, after=None, include_archived=False):
+    if not is_logged_in():
+        return "User not logged in"
+    current_user = get_current_user()
+    user_id = current_user.id
+    if limit < 1:
+        return "Limit must be positive"
+    try:
+        query = TaskQuery(user_id, status=status, priority=priority, show_completed=show_completed, show_pending=show_pending,
+                          show_overdue=show_overdue, show_due_soon=show_due_soon, sort_by=sort_by, order=order,
+                          include_archived=include_archived)
+        _materialize_for(query)
+        return Task.find_page(query, limit, after)
+    except ValueError as e:
+        return str(e)
+
+def search_tasks(text, priority=None, show_completed=False, show_pending=False, limit=20):
+    if not is_logged_in():
+        return "User not logged in"
+    current_user = get_current_user()
+    user_id = current_user.id
+    if limit < 1:
+        return "Limit must be positive"
+    if not (show_completed or show_pending):
+        show_completed = show_pending = True  # Search every status by default
+    try:
+        query = TaskQuery(user_id, priority=priority, show_completed=show_completed, show_pending=show_pending)
+        return Task.search(query, text, limit)
+    except ValueError as e:
+        return str(e)
 
 def view_task(task_id):
     if not is_logged_in():
         return None
     current_user = get_current_user()
     user_id = current_user.id
-    task = Task.find_by_id(task_id)
-    if not task or task.user_id != user_id:
+    try:
+        return Task.find_owned(task_id, user_id)
+    except TaskNotFound:
+        return Archive.find_owned(task_id, user_id)
+    except TaskAccessDenied:
         return None
-    return task
 
 def mark_done(task_id):
     if not is_logged_in():
         return "User not logged in"
     current_user = get_current_user()
     user_id = current_user.id
-    task = Task.find_by_id(task_id)
-    if not task or task.user_id != user_id:
-        return "Task not found or access denied"
     try:
-        if Task.mark_done(task_id):
-            return "Task marked as done"
-        else:
-            return "Error marking task as done"
+        task = Task.update_owned(task_id, user_id, status='completed')
+        if task.template_id is not None:
+            Recurrence.advance(user_id, task.template_id)  # completing an occurrence brings in the next one
+        return "Task marked as done"
+    except TaskNotFound:
+        return "Task not found"
+    except TaskAccessDenied:
+        return "Access denied"
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -140,31 +206,137 @@ def reopen(task_id):
         return "User not logged in"
     current_user = get_current_user()
     user_id = current_user.id
-    task = Task.find_by_id(task_id)
-    if not task or task.user_id != user_id:
-        return "Task not found or access denied"
     try:
-        if Task.reopen(task_id):
-            return "Task reopened"
-        else:
-            return "Error reopening task"
+        Task.update_owned(task_id, user_id, status='pending')
+        return "Task reopened"
+    except TaskNotFound:
+        return "Task not found"
+    except TaskAccessDenied:
+        return "Access denied"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def _plural(count):
+    return f"{count} task" if count == 1 else f"{count} tasks"
+
+def _selection_query(ids, ranges, priority, show_completed, show_pending, show_overdue, show_due_soon):
+    # Bulk commands act on explicit ids/ranges and/or a list-style filter; with no status flags the
+    # filter covers every status
+    selected = bool(ids or ranges)
+    if not (selected or priority or show_completed or show_pending or show_overdue or show_due_soon):
+        raise ValueError("No tasks selected")
+    if not (show_completed or show_pending or show_overdue or show_due_soon):
+        show_completed = show_pending = True
+    current_user = get_current_user()
+    return TaskQuery(current_user.id, priority=priority, show_completed=show_completed, show_pending=show_pending,
+                     show_overdue=show_overdue, show_due_soon=show_due_soon,
+                     ids=ids if selected else None, id_ranges=ranges if selected else None)
+
+def mark_done_many(ids=None, ranges=None, priority=None, show_completed=False, show_pending=False, show_overdue=False, show_due_soon=False):
+    if not is_logged_in():
+        return "User not logged in"
+    try:
+        query = _selection_query(ids, ranges, priority, show_completed, show_pending, show_overdue, show_due_soon)
+        count = Task.bulk_set_status(query, 'completed')
+        if count:
+            Recurrence.advance(query.user_id)
+        return f"{_plural(count)} marked as done"
+    except ValueError as e:
+        return str(e)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def reopen_many(ids=None, ranges=None, priority=None, show_completed=False, show_pending=False, show_overdue=False, show_due_soon=False):
+    if not is_logged_in():
+        return "User not logged in"
+    try:
+        query = _selection_query(ids, ranges, priority, show_completed, show_pending, show_overdue, show_due_soon)
+        return f"{_plural(Task.bulk_set_status(query, 'pending'))} reopened"
+    except ValueError as e:
+        return str(e)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def delete_many(ids=None, ranges=None, priority=None, show_completed=False, show_pending=False, show_overdue=False, show_due_soon=False):
+    if not is_logged_in():
+        return "User not logged in"
+    try:
+        query = _selection_query(ids, ranges, priority, show_completed, show_pending, show_overdue, show_due_soon)
+        return f"{_plural(Task.bulk_delete(query))} deleted"
+    except ValueError as e:
+        return str(e)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def archive_tasks(ids=None, ranges=None, priority=None, older_than=None):
+    # Moves completed tasks (by id/range, or completed more than older_than days ago) to the archive
+    if not is_logged_in():
+        return "User not logged in"
+    if not (ids or ranges or older_than is not None):
+        return "No tasks selected"
+    if older_than is not None and older_than < 0:
+        return "Invalid age: days cannot be negative"
+    selected = bool(ids or ranges)
+    try:
+        query = TaskQuery(get_current_user().id, priority=priority, show_pending=False,
+                          ids=ids if selected else None, id_ranges=ranges if selected else None,
+                          updated_before=datetime.now() - timedelta(days=older_than) if older_than is not None else None)
+        return f"{_plural(Archive.archive(query))} archived"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def unarchive_tasks(ids=None, ranges=None):
+    if not is_logged_in():
+        return "User not logged in"
+    if not (ids or ranges):
+        return "No tasks selected"
+    try:
+        query = TaskQuery(get_current_user().id, show_pending=False, ids=ids, id_ranges=ranges)
+        return f"{_plural(Archive.restore(query))} restored"
     except Exception as e:
         return f"Error: {str(e)}"
 
 def get_reminders():
     if not is_logged_in():
         return "User not logged in"
-    current_user = get_current_user()
-    user_id = current_user.id
-    tasks = Task.find_by_user_id(user_id, status='pending')
-    today = date.today()
-    reminders = []
-    for task in tasks:
-        if task.due_date:
-            try:
-                task_date = datetime.strptime(task.due_date, '%Y-%m-%d').date()
-                if task_date <= today:
-                    reminders.append(task)
-            except ValueError:
-                pass
-    return reminders
+    user_id = get_current_user().id
+    today = dates.today().isoformat()
+    # Only fetch task rows when the summary says something is due; recurring occurrences due by
+    # today are created first
+    next_due, next_occurrence = Reminder.summary(user_id)
+    if next_occurrence is not None and next_occurrence <= today:
+        Recurrence.materialize(user_id, dates.today())
+        next_due = Reminder.next_due(user_id)
+    if next_due is None or next_due > today:
+        return []
+    return Reminder.find_due(user_id, today)
+
+def task_stats(scan=False):
+    # Counts by status and priority plus due-date totals; scan=True recomputes them from tasks
+    if not is_logged_in():
+        return "User not logged in"
+    user_id = get_current_user().id
+    try:
+        if scan:
+            return TaskStats.scan(user_id, dates.today())
+        return TaskStats.load(user_id, dates.today())
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def check_stats():
+    # [] when the counters agree with the tasks table, else the mismatching entries
+    if not is_logged_in():
+        return "User not logged in"
+    try:
+        return TaskStats.check(get_current_user().id)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def rebuild_stats():
+    if not is_logged_in():
+        return "User not logged in"
+    try:
+        TaskStats.rebuild(get_current_user().id)
+        return "Counters rebuilt"
+    except Exception as e:
+        return f"Error: {str(e)}"
@@ -0,0 +1,93 @@
+import csv
+import json
+import sys
+from contextlib import nullcontext
+from itertools import islice
+from ..controllers.auth import is_logged_in, get_current_user
+from ..database.db import connection
+from ..models.task_model import Task, TaskQuery
+from ..utils.validation import validate_task_rows
+
+FORMATS = ['csv', 'jsonl']
+EXPORT_FIELDS = ['id', 'title', 'description', 'priority', 'due_date', 'status', 'created_at', 'updated_at']
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+def _open(path, mode):
+    if path == '-':
+        return nullcontext(sys.stdin if mode == 'r' else sys.stdout)
+    return open(path, mode, newline='', encoding='utf-8')
+
+def _read_rows(f, fmt):
+    if fmt == 'csv':
+        reader = csv.reader(f)
+        header = next(reader, None) or []
+        for values in reader:
+            yield dict(zip(header, values))
+        return
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+def import_tasks(path, fmt=None, batch_size=1000):
+    # Returns (imported_count, [(row, error), ...]); invalid rows are skipped, the rest are
+    # inserted in one transaction
+    if not is_logged_in():
+        return "User not logged in"
+    current_user = get_current_user()
+    user_id = current_user.id
+    fmt = detect_format(path, fmt)
+    if fmt not in FORMATS:
+        return "Unsupported format"
+    if batch_size < 1:
+        return "Batch size must be positive"
+    imported = 0
+    errors = []
+    try:
+        with _open(path, 'r') as f, connection():
+            rows = _read_rows(f, fmt)
+            line = 1
+            while True:
+                chunk = list(islice(rows, batch_size))
+                if not chunk:
+                    break
+                valid, chunk_errors = validate_task_rows(chunk, start_line=line)
+                errors.extend(chunk_errors)
+                imported += Task.bulk_create(user_id, valid, batch_size)
+                line += len(chunk)
+    except (OSError, csv.Error) as e:
+        return f"Error: {str(e)}"
+    return imported, errors
+
+def export_tasks(path, fmt=None):
+    if not is_logged_in():
+        return "User not logged in"
+    current_user = get_current_user()
+    user_id = current_user.id
+    fmt = detect_format(path, fmt)
+    if fmt not in FORMATS:
+        return "Unsupported format"
+    count = 0
+    try:
+        with _open(path, 'w') as f:
+            tasks = Task.iter(TaskQuery(user_id, sort_by='created_at', include_archived=True))
+            if fmt == 'csv':
+                writer = csv.writer(f)
+                writer.writerow(EXPORT_FIELDS)
+                for task in tasks:
+                    writer.writerow([getattr(task, field) for field in EXPORT_FIELDS])
+                    count += 1
+            else:
+                for task in tasks:
+                    f.write(json.dumps({field: getattr(task, field) for field in EXPORT_FIELDS}) + '\n')
+                    count += 1
+    except OSError as e:
+        return f"Error: {str(e)}"
+    return f"Exported {count} tasks"
@@ -1,29 +1,207 @@
+import functools
 import sqlite3
 import os
+import random
+import threading
+import time
+from contextlib import contextmanager
 
-DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'todo.db')
+DB_PATH = os.environ.get('TODO_DB_PATH') or os.path.join(os.path.dirname(__file__), '..', 'todo.db')
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
 current_db_path = DB_PATH
 
+# Per-connection LRU cache of compiled statements (sqlite3's prepared statement cache)
+STATEMENT_CACHE_SIZE = 256
+
+PRAGMAS = (
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA mmap_size = 67108864",
+)
+
+# WAL lets readers carry on while one process writes; set TODO_JOURNAL_MODE=DELETE for file
+# systems without shared memory (network mounts), where WAL is not safe
+JOURNAL_MODE = os.environ.get('TODO_JOURNAL_MODE') or 'WAL'
+# Seconds a statement waits on another connection's lock before failing with "database is locked"
+BUSY_TIMEOUT = float(os.environ.get('TODO_BUSY_TIMEOUT') or 5)
+# Write transactions take the write lock at BEGIN, so they queue on the busy timeout instead of
+# failing when a read lock cannot be upgraded
+ISOLATION_LEVEL = 'IMMEDIATE'
+# Further attempts a write gets after a lock error, with exponential backoff between them
+WRITE_RETRIES = int(os.environ.get('TODO_WRITE_RETRIES') or 5)
+RETRY_DELAY = 0.05
+RETRY_MAX_DELAY = 1.0
+
+# Primary result codes of errors that go away once the other connection finishes
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+# Connection class for new connections; utils.profiler swaps in a traced subclass
+connection_factory = sqlite3.Connection
+
+_local = threading.local()
+_generation = 0
+_lock = threading.Lock()
+
 def set_db_path(path):
-    global current_db_path
-    current_db_path = path
+    global current_db_path, _generation
+    with _lock:
+        current_db_path = path
+        _generation += 1
+    close_connection()
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=ISOLATION_LEVEL,
+                           factory=connection_factory, cached_statements=STATEMENT_CACHE_SIZE)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    if JOURNAL_MODE:
+        # Persistent in the file, so after the first connection this is only a check; in-memory
+        # databases answer 'memory'
+        mode = conn.execute(f"PRAGMA journal_mode = {JOURNAL_MODE}").fetchone()[0]
+        if mode == 'wal':
+            # Commits no longer fsync; a power cut can lose the last transactions but not corrupt the file
+            conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
 
 def get_connection():
-    return sqlite3.connect(current_db_path)
+    # Long-lived connection owned by the calling thread; do not close it directly
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.generation != _generation:
+        if conn is not None:
+            conn.close()
+        _local.conn = conn = _connect(current_db_path)
+        _local.generation = _generation
+        _local.depth = 0
+    return conn
 
-def initialize_database():
+def close_connection():
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        _local.conn = None
+        conn.close()
+
+@contextmanager
+def connection():
+    # Commits (or rolls back) only when the outermost block exits, so nested use is one transaction
     conn = get_connection()
+    _local.depth += 1
     try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users';")
-        if not cursor.fetchone():
-            migrations_path = os.path.join(os.path.dirname(__file__), 'migrations.sql')
-            with open(migrations_path, 'r') as f:
-                sql = f.read()
-            conn.executescript(sql)
+        yield conn
+    except BaseException:
+        _local.depth -= 1
+        if _local.depth == 0:
+            conn.rollback()
+        raise
+    else:
+        _local.depth -= 1
+        if _local.depth == 0:
             conn.commit()
+
+class DatabaseBusy(sqlite3.OperationalError):
+    # A write still hit a lock after every retry
+    pass
+
+def is_transient(error):
+    # Lock errors (SQLITE_BUSY, SQLITE_LOCKED and their extended codes) succeed when retried;
+    # anything else, constraint violations included, fails the same way every time
+    code = getattr(error, 'sqlite_errorcode', None)  # Python 3.11+
+    if code is not None:
+        return code & 0xff in (SQLITE_BUSY, SQLITE_LOCKED)
+    return isinstance(error, sqlite3.OperationalError) and ('locked' in str(error) or 'busy' in str(error))
+
+def retry_on_busy(fn):
+    # Re-runs a write that failed on a lock, sleeping a random time up to a doubling delay between
+    # attempts. Inside an outer connection() block the call runs once: the failure aborts the whole
+    # transaction, so only the outermost caller can retry it.
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if getattr(_local, 'depth', 0):
+            return fn(*args, **kwargs)
+        delay = RETRY_DELAY
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                return fn(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not is_transient(e):
+                    raise
+                error = e
+            if attempt < WRITE_RETRIES:
+                time.sleep(random.uniform(0, delay))
+                delay = min(delay * 2, RETRY_MAX_DELAY)
+        print(f"Database error: {error}")
+        raise DatabaseBusy(f"{error} (gave up after {WRITE_RETRIES + 1} attempts)") from error
+    return wrapper
+
+def get_schema_version(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+def load_migrations():
+    # Files are named NNNN_description.sql and applied in numeric order
+    migrations = []
+    for name in os.listdir(MIGRATIONS_DIR):
+        if name.endswith('.sql'):
+            migrations.append((int(name.split('_', 1)[0]), os.path.join(MIGRATIONS_DIR, name)))
+    return sorted(migrations)
+
+def _statements(sql):
+    # Splits a migration file into single statements; complete_statement keeps trigger bodies whole
+    statement = ''
+    for line in sql.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            yield statement
+            statement = ''
+
+def migrate(target=None):
+    # Each migration runs in its own BEGIN IMMEDIATE transaction. The version read up front only
+    # picks the candidates; it is read again once the write lock is held, so when several processes
+    # initialize the same file at once each migration is applied by exactly one of them.
+    # (executescript would commit the open transaction first, hence the statement-by-statement run.)
+    applied = []
+    with connection() as conn:
+        version = get_schema_version(conn)
+        for number, path in load_migrations():
+            if number <= version or (target is not None and number > target):
+                continue
+            with open(path, 'r') as f:
+                sql = f.read()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0] >= number:
+                    conn.rollback()
+                    continue
+                for statement in _statements(sql):
+                    conn.execute(statement)
+                conn.execute("INSERT INTO schema_version (version) VALUES (?)", (number,))
+                conn.commit()
+            except sqlite3.Error:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            applied.append(number)
+    return applied
+
+def initialize_database():
+    try:
+        return migrate()
     except sqlite3.Error as e:
         print(f"Database error: {e}")
         raise
-    finally:
-        conn.close()
+
+def _file_size(conn):
+    return conn.execute("PRAGMA page_count").fetchone()[0] * conn.execute("PRAGMA page_size").fetchone()[0]
+
+def optimize(vacuum=False):
+    # Refreshes the planner statistics (sqlite_stat1) and, with vacuum, rewrites the file to return
+    # the pages freed by deleted and archived rows. VACUUM cannot run inside a transaction, so this
+    # must not be called from within a connection() block. Returns the file size before and after.
+    conn = get_connection()
+    conn.execute("ANALYZE")
+    conn.commit()
+    before = _file_size(conn)
+    if vacuum:
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return before, _file_size(conn)
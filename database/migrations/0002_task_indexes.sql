@@ -0,0 +1,5 @@
+-- Pending/overdue/reminder lookups: user_id = ? AND status = ? AND due_date < ?
+CREATE INDEX IF NOT EXISTS idx_tasks_user_status_due ON tasks (user_id, status, due_date);
+
+-- Recently changed tasks: user_id = ? ORDER BY updated_at
+CREATE INDEX IF NOT EXISTS idx_tasks_user_updated ON tasks (user_id, updated_at);
@@ -0,0 +1,7 @@
+-- Sort keys as virtual columns so keyset pagination can seek on (user_id, key, id)
+ALTER TABLE tasks ADD COLUMN due_sort TEXT GENERATED ALWAYS AS (COALESCE(due_date, '9999-12-31')) VIRTUAL;
+ALTER TABLE tasks ADD COLUMN priority_rank INTEGER GENERATED ALWAYS AS (CASE priority WHEN 'low' THEN 0 WHEN 'medium' THEN 1 WHEN 'high' THEN 2 ELSE 1 END) VIRTUAL;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_user_created ON tasks (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_user_due_sort ON tasks (user_id, due_sort);
+CREATE INDEX IF NOT EXISTS idx_tasks_user_priority_rank ON tasks (user_id, priority_rank);
@@ -0,0 +1,45 @@
+-- Earliest pending due date per user, kept current by triggers so the reminder
+-- check before each command is a single primary-key lookup
+CREATE TABLE IF NOT EXISTS reminder_summary (
+    user_id INTEGER PRIMARY KEY,
+    next_due DATE,
+
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+INSERT OR REPLACE INTO reminder_summary (user_id, next_due)
+SELECT user_id, MIN(due_date) FROM tasks WHERE status = 'pending' AND due_date IS NOT NULL GROUP BY user_id;
+
+-- A new pending due date can only lower the minimum
+CREATE TRIGGER IF NOT EXISTS tasks_reminder_insert AFTER INSERT ON tasks
+WHEN NEW.status = 'pending' AND NEW.due_date IS NOT NULL
+BEGIN
+    INSERT INTO reminder_summary (user_id, next_due) VALUES (NEW.user_id, NEW.due_date)
+    ON CONFLICT (user_id) DO UPDATE SET next_due = excluded.next_due
+    WHERE next_due IS NULL OR excluded.next_due < next_due;
+END;
+
+-- Removing the task that held the minimum re-seeks idx_tasks_user_status_due
+CREATE TRIGGER IF NOT EXISTS tasks_reminder_delete AFTER DELETE ON tasks
+WHEN OLD.status = 'pending' AND OLD.due_date IS NOT NULL
+BEGIN
+    UPDATE reminder_summary
+    SET next_due = (SELECT MIN(due_date) FROM tasks WHERE user_id = OLD.user_id AND status = 'pending' AND due_date IS NOT NULL)
+    WHERE user_id = OLD.user_id AND next_due = OLD.due_date;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_reminder_update_old AFTER UPDATE OF user_id, status, due_date ON tasks
+WHEN OLD.status = 'pending' AND OLD.due_date IS NOT NULL
+BEGIN
+    UPDATE reminder_summary
+    SET next_due = (SELECT MIN(due_date) FROM tasks WHERE user_id = OLD.user_id AND status = 'pending' AND due_date IS NOT NULL)
+    WHERE user_id = OLD.user_id AND next_due = OLD.due_date;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_reminder_update_new AFTER UPDATE OF user_id, status, due_date ON tasks
+WHEN NEW.status = 'pending' AND NEW.due_date IS NOT NULL
+BEGIN
+    INSERT INTO reminder_summary (user_id, next_due) VALUES (NEW.user_id, NEW.due_date)
+    ON CONFLICT (user_id) DO UPDATE SET next_due = excluded.next_due
+    WHERE next_due IS NULL OR excluded.next_due < next_due;
+END;
@@ -0,0 +1,26 @@
+-- Full-text index over task titles and descriptions. External content: the text lives only in
+-- tasks, the index is kept in sync by triggers, and 'rebuild' backfills existing rows.
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+    title, description,
+    content = 'tasks', content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks
+BEGIN
+    INSERT INTO tasks_fts (rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks
+BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, title, description) VALUES ('delete', OLD.id, OLD.title, OLD.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks
+BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, title, description) VALUES ('delete', OLD.id, OLD.title, OLD.description);
+    INSERT INTO tasks_fts (rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description);
+END;
+
+INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild');
@@ -0,0 +1,78 @@
+-- Per-user task counts kept current by triggers, so `stats` reads a handful of rows whatever the
+-- size of the account. NULL status/priority are counted under ''.
+CREATE TABLE IF NOT EXISTS task_counters (
+    user_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    count INTEGER NOT NULL,
+
+    PRIMARY KEY (user_id, status, priority)
+) WITHOUT ROWID;
+
+-- Pending tasks per due date; overdue/today/tomorrow totals sum the dates up to tomorrow.
+-- Dates that drop to zero are removed so that range stays short.
+CREATE TABLE IF NOT EXISTS task_due_counts (
+    user_id INTEGER NOT NULL,
+    due_date DATE NOT NULL,
+    count INTEGER NOT NULL,
+
+    PRIMARY KEY (user_id, due_date)
+) WITHOUT ROWID;
+
+INSERT OR REPLACE INTO task_counters (user_id, status, priority, count)
+SELECT user_id, IFNULL(status, ''), IFNULL(priority, ''), COUNT(*) FROM tasks GROUP BY 1, 2, 3;
+
+INSERT OR REPLACE INTO task_due_counts (user_id, due_date, count)
+SELECT user_id, due_date, COUNT(*) FROM tasks WHERE status = 'pending' AND due_date IS NOT NULL GROUP BY 1, 2;
+
+CREATE TRIGGER IF NOT EXISTS tasks_counters_insert AFTER INSERT ON tasks
+BEGIN
+    INSERT INTO task_counters (user_id, status, priority, count) VALUES (NEW.user_id, IFNULL(NEW.status, ''), IFNULL(NEW.priority, ''), 1)
+    ON CONFLICT (user_id, status, priority) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_counters_delete AFTER DELETE ON tasks
+BEGIN
+    UPDATE task_counters SET count = count - 1
+    WHERE user_id = OLD.user_id AND status = IFNULL(OLD.status, '') AND priority = IFNULL(OLD.priority, '');
+END;
+
+-- UPDATE OF also fires when a column is set to its current value, hence the WHEN
+CREATE TRIGGER IF NOT EXISTS tasks_counters_update AFTER UPDATE OF user_id, status, priority ON tasks
+WHEN OLD.user_id IS NOT NEW.user_id OR OLD.status IS NOT NEW.status OR OLD.priority IS NOT NEW.priority
+BEGIN
+    UPDATE task_counters SET count = count - 1
+    WHERE user_id = OLD.user_id AND status = IFNULL(OLD.status, '') AND priority = IFNULL(OLD.priority, '');
+    INSERT INTO task_counters (user_id, status, priority, count) VALUES (NEW.user_id, IFNULL(NEW.status, ''), IFNULL(NEW.priority, ''), 1)
+    ON CONFLICT (user_id, status, priority) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_due_counts_insert AFTER INSERT ON tasks
+WHEN NEW.status = 'pending' AND NEW.due_date IS NOT NULL
+BEGIN
+    INSERT INTO task_due_counts (user_id, due_date, count) VALUES (NEW.user_id, NEW.due_date, 1)
+    ON CONFLICT (user_id, due_date) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_due_counts_delete AFTER DELETE ON tasks
+WHEN OLD.status = 'pending' AND OLD.due_date IS NOT NULL
+BEGIN
+    UPDATE task_due_counts SET count = count - 1 WHERE user_id = OLD.user_id AND due_date = OLD.due_date;
+    DELETE FROM task_due_counts WHERE user_id = OLD.user_id AND due_date = OLD.due_date AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_due_counts_update_old AFTER UPDATE OF user_id, status, due_date ON tasks
+WHEN OLD.status = 'pending' AND OLD.due_date IS NOT NULL
+    AND (OLD.user_id IS NOT NEW.user_id OR OLD.status IS NOT NEW.status OR OLD.due_date IS NOT NEW.due_date)
+BEGIN
+    UPDATE task_due_counts SET count = count - 1 WHERE user_id = OLD.user_id AND due_date = OLD.due_date;
+    DELETE FROM task_due_counts WHERE user_id = OLD.user_id AND due_date = OLD.due_date AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_due_counts_update_new AFTER UPDATE OF user_id, status, due_date ON tasks
+WHEN NEW.status = 'pending' AND NEW.due_date IS NOT NULL
+    AND (OLD.user_id IS NOT NEW.user_id OR OLD.status IS NOT NEW.status OR OLD.due_date IS NOT NEW.due_date)
+BEGIN
+    INSERT INTO task_due_counts (user_id, due_date, count) VALUES (NEW.user_id, NEW.due_date, 1)
+    ON CONFLICT (user_id, due_date) DO UPDATE SET count = count + 1;
+END;
@@ -0,0 +1,40 @@
+-- Cold tier for completed tasks. Rows keep their task id (tasks uses AUTOINCREMENT, so ids are
+-- never reused) and the same columns as tasks, so list queries can read both tiers alike.
+CREATE TABLE IF NOT EXISTS archive (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    priority TEXT CHECK(priority IN ('low', 'medium', 'high')),
+    due_date DATE,
+    status TEXT CHECK(status = 'completed') DEFAULT 'completed',
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    due_sort TEXT GENERATED ALWAYS AS (COALESCE(due_date, '9999-12-31')) VIRTUAL,
+    priority_rank INTEGER GENERATED ALWAYS AS (CASE priority WHEN 'low' THEN 0 WHEN 'medium' THEN 1 WHEN 'high' THEN 2 ELSE 1 END) VIRTUAL,
+
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_archive_user_created ON archive (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_archive_user_updated ON archive (user_id, updated_at);
+
+-- Age-based archiving across all users: completed tasks by last change. Partial, so it only
+-- holds the completed rows still in the hot table.
+CREATE INDEX IF NOT EXISTS idx_tasks_completed_updated ON tasks (updated_at) WHERE status = 'completed';
+
+-- task_counters cover both tiers: moving a task deletes it from one table (decrement) and
+-- inserts it into the other (increment). Archived tasks are never pending, so task_due_counts
+-- and reminder_summary are unaffected.
+CREATE TRIGGER IF NOT EXISTS archive_counters_insert AFTER INSERT ON archive
+BEGIN
+    INSERT INTO task_counters (user_id, status, priority, count) VALUES (NEW.user_id, IFNULL(NEW.status, ''), IFNULL(NEW.priority, ''), 1)
+    ON CONFLICT (user_id, status, priority) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS archive_counters_delete AFTER DELETE ON archive
+BEGIN
+    UPDATE task_counters SET count = count - 1
+    WHERE user_id = OLD.user_id AND status = IFNULL(OLD.status, '') AND priority = IFNULL(OLD.priority, '');
+END;
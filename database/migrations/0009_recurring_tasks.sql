@@ -0,0 +1,61 @@
+-- Recurring task templates. A template holds the task fields and the rule; its occurrences are
+-- ordinary tasks (template_id set), created only when a listing or the reminder check looks at
+-- their due dates. next_date is the first occurrence not yet created (NULL once the rule ends).
+CREATE TABLE IF NOT EXISTS task_templates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    priority TEXT CHECK(priority IN ('low', 'medium', 'high')),
+    frequency TEXT NOT NULL CHECK(frequency IN ('daily', 'weekly', 'monthly', 'interval')),
+    every INTEGER NOT NULL DEFAULT 1 CHECK(every >= 1),
+    start_date DATE NOT NULL,
+    end_date DATE,
+    next_date DATE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Templates with occurrences due by a date: user_id = ? AND next_date <= ?
+CREATE INDEX IF NOT EXISTS idx_task_templates_user_next ON task_templates (user_id, next_date);
+
+ALTER TABLE tasks ADD COLUMN template_id INTEGER REFERENCES task_templates(id);
+
+-- Does a template still have a pending occurrence: template_id = ? AND status = 'pending'
+CREATE INDEX IF NOT EXISTS idx_tasks_template_status ON tasks (template_id, status) WHERE template_id IS NOT NULL;
+
+-- Earliest next_date per user, next to next_due, so the reminder check still reads one row
+ALTER TABLE reminder_summary ADD COLUMN next_occurrence DATE;
+
+CREATE TRIGGER IF NOT EXISTS task_templates_reminder_insert AFTER INSERT ON task_templates
+WHEN NEW.next_date IS NOT NULL
+BEGIN
+    INSERT INTO reminder_summary (user_id, next_occurrence) VALUES (NEW.user_id, NEW.next_date)
+    ON CONFLICT (user_id) DO UPDATE SET next_occurrence = excluded.next_occurrence
+    WHERE next_occurrence IS NULL OR excluded.next_occurrence < next_occurrence;
+END;
+
+CREATE TRIGGER IF NOT EXISTS task_templates_reminder_delete AFTER DELETE ON task_templates
+WHEN OLD.next_date IS NOT NULL
+BEGIN
+    UPDATE reminder_summary
+    SET next_occurrence = (SELECT MIN(next_date) FROM task_templates WHERE user_id = OLD.user_id AND next_date IS NOT NULL)
+    WHERE user_id = OLD.user_id AND next_occurrence = OLD.next_date;
+END;
+
+CREATE TRIGGER IF NOT EXISTS task_templates_reminder_update_old AFTER UPDATE OF user_id, next_date ON task_templates
+WHEN OLD.next_date IS NOT NULL
+BEGIN
+    UPDATE reminder_summary
+    SET next_occurrence = (SELECT MIN(next_date) FROM task_templates WHERE user_id = OLD.user_id AND next_date IS NOT NULL)
+    WHERE user_id = OLD.user_id AND next_occurrence = OLD.next_date;
+END;
+
+CREATE TRIGGER IF NOT EXISTS task_templates_reminder_update_new AFTER UPDATE OF user_id, next_date ON task_templates
+WHEN NEW.next_date IS NOT NULL
+BEGIN
+    INSERT INTO reminder_summary (user_id, next_occurrence) VALUES (NEW.user_id, NEW.next_date)
+    ON CONFLICT (user_id) DO UPDATE SET next_occurrence = excluded.next_occurrence
+    WHERE next_occurrence IS NULL OR excluded.next_occurrence < next_occurrence;
+END;
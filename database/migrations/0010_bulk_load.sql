@@ -0,0 +1,38 @@
+-- Task.bulk_create maintains tasks_fts, task_counters, task_due_counts and reminder_summary with
+-- one set-based statement per chunk instead of four trigger bodies per row. While its write
+-- transaction holds a row in bulk_load the insert triggers stand aside; the row is deleted before
+-- the transaction ends, so other connections never see it.
+CREATE TABLE IF NOT EXISTS bulk_load (active INTEGER);
+
+DROP TRIGGER IF EXISTS tasks_fts_insert;
+DROP TRIGGER IF EXISTS tasks_counters_insert;
+DROP TRIGGER IF EXISTS tasks_due_counts_insert;
+DROP TRIGGER IF EXISTS tasks_reminder_insert;
+
+CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks
+WHEN NOT EXISTS (SELECT 1 FROM bulk_load)
+BEGIN
+    INSERT INTO tasks_fts (rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description);
+END;
+
+CREATE TRIGGER tasks_counters_insert AFTER INSERT ON tasks
+WHEN NOT EXISTS (SELECT 1 FROM bulk_load)
+BEGIN
+    INSERT INTO task_counters (user_id, status, priority, count) VALUES (NEW.user_id, IFNULL(NEW.status, ''), IFNULL(NEW.priority, ''), 1)
+    ON CONFLICT (user_id, status, priority) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER tasks_due_counts_insert AFTER INSERT ON tasks
+WHEN NEW.status = 'pending' AND NEW.due_date IS NOT NULL AND NOT EXISTS (SELECT 1 FROM bulk_load)
+BEGIN
+    INSERT INTO task_due_counts (user_id, due_date, count) VALUES (NEW.user_id, NEW.due_date, 1)
+    ON CONFLICT (user_id, due_date) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER tasks_reminder_insert AFTER INSERT ON tasks
+WHEN NEW.status = 'pending' AND NEW.due_date IS NOT NULL AND NOT EXISTS (SELECT 1 FROM bulk_load)
+BEGIN
+    INSERT INTO reminder_summary (user_id, next_due) VALUES (NEW.user_id, NEW.due_date)
+    ON CONFLICT (user_id) DO UPDATE SET next_due = excluded.next_due
+    WHERE next_due IS NULL OR excluded.next_due < next_due;
+END;
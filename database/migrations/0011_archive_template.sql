@@ -0,0 +1,2 @@
+-- Archived occurrences keep their recurrence template, so unarchiving restores the link
+ALTER TABLE archive ADD COLUMN template_id INTEGER REFERENCES task_templates(id);
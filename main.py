@@ -1,11 +1,23 @@
+import os
 from . import cli
-from .database import db
 from .utils import logger
 
 def main(args):
-    db.initialize_database()
-    logger.setup_logger(args.verbose)
-    cli.handle_command(args)
+    profiler = None
+    if args.profile or args.cprofile or os.environ.get('TODO_PROFILE') or os.environ.get('TODO_CPROFILE'):
+        from .utils import profiler
+        output, cprofile_path = profiler.settings(args.profile, args.cprofile)
+        if output or cprofile_path:
+            profiler.enable(output, cprofile_path)
+    try:
+        if args.command not in cli.NO_DB_COMMANDS:
+            from .database import db
+            db.initialize_database()
+        logger.setup_logger(args.verbose)
+        cli.handle_command(args)
+    finally:
+        if profiler is not None:
+            profiler.finish()
 
 if __name__ == '__main__':
     parser = cli.create_parser()
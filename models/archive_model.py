@@ -0,0 +1,82 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from ..database.db import connection, is_transient, retry_on_busy
+from .task_model import Task, TASK_COLUMNS
+
+# Completed tasks untouched for this many days are moved by `maintenance`
+ARCHIVE_AFTER_DAYS = int(os.environ.get('TODO_ARCHIVE_AFTER_DAYS') or 30)
+# Rows moved per transaction, so a large backlog never holds the write lock for long
+ARCHIVE_BATCH_SIZE = 1000
+# Every column the two tiers share, recurrence link included
+MOVED_COLUMNS = f"{TASK_COLUMNS}, template_id"
+
+class Archive:
+    @classmethod
+    def archive(cls, query, batch_size=ARCHIVE_BATCH_SIZE):
+        # Moves the completed tasks the query matches from tasks to archive; returns how many moved
+        where, params = query.where()
+        return cls._archive_where(f"{where} AND status = 'completed'", params, batch_size)
+
+    @classmethod
+    def archive_completed(cls, days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE, now=None):
+        # Every user's completed tasks last changed more than days ago (idx_tasks_completed_updated)
+        cutoff = (now or datetime.now()) - timedelta(days=days)
+        return cls._archive_where("status = 'completed' AND updated_at < ?", [cutoff.isoformat(' ')], batch_size)
+
+    @classmethod
+    def _archive_where(cls, where, params, batch_size):
+        if batch_size < 1:
+            raise ValueError("Batch size must be positive")
+        moved = 0
+        while True:
+            count = cls._move_batch(where, params, batch_size)
+            moved += count
+            if count < batch_size:
+                return moved
+
+    @classmethod
+    @retry_on_busy
+    def _move_batch(cls, where, params, batch_size):
+        # The INSERT opens the write transaction, so the DELETE's batch query sees the same rows
+        batch = f"SELECT id FROM tasks WHERE {where} ORDER BY id LIMIT ?"
+        try:
+            with connection() as conn:
+                moved = conn.execute(
+                    f"INSERT INTO archive ({MOVED_COLUMNS}, archived_at) SELECT {MOVED_COLUMNS}, ? FROM tasks WHERE id IN ({batch})",
+                    [datetime.now().isoformat(' ')] + params + [batch_size]
+                ).rowcount
+                if moved:
+                    conn.execute(f"DELETE FROM tasks WHERE id IN ({batch})", params + [batch_size])
+                return moved
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    @retry_on_busy
+    def restore(cls, query):
+        # Moves the archived tasks the query matches back to tasks under their original ids
+        where, params = query.where()
+        try:
+            with connection() as conn:
+                moved = conn.execute(f"INSERT INTO tasks ({MOVED_COLUMNS}) SELECT {MOVED_COLUMNS} FROM archive WHERE {where}", params).rowcount
+                if moved:
+                    conn.execute(f"DELETE FROM archive WHERE {where}", params)
+                return moved
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    def find_owned(cls, task_id, user_id):
+        try:
+            with connection() as conn:
+                return Task.row_cursor(conn).execute(
+                    f"SELECT {TASK_COLUMNS} FROM archive WHERE id = ? AND user_id = ?", (task_id, user_id)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            raise
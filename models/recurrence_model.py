@@ -0,0 +1,166 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from ..database.db import connection, is_transient, retry_on_busy
+from ..utils import dates, recurrence
+
+TEMPLATE_COLUMNS = "id, user_id, title, description, priority, frequency, every, start_date, end_date, next_date, created_at"
+INSERT_OCCURRENCE_SQL = ("INSERT INTO tasks (user_id, title, description, priority, due_date, status, created_at, updated_at, template_id) "
+                         "VALUES (?, ?, ?, ?, ?, 'pending', ?, ?, ?)")
+# How far ahead an unfiltered pending listing shows occurrences
+HORIZON_DAYS = int(os.environ.get('TODO_RECURRENCE_HORIZON_DAYS') or 7)
+
+class Recurrence:
+    # A recurring task template; its occurrences are tasks created on demand by materialize()
+    __slots__ = ('id', 'user_id', 'title', 'description', 'priority', 'frequency', 'every', 'start_date', 'end_date',
+                 'next_date', 'created_at')
+
+    def __init__(self, id, user_id, title, description, priority, frequency, every, start_date, end_date, next_date, created_at):
+        self.id = id
+        self.user_id = user_id
+        self.title = title
+        self.description = description
+        self.priority = priority
+        self.frequency = frequency
+        self.every = every
+        self.start_date = start_date
+        self.end_date = end_date
+        self.next_date = next_date
+        self.created_at = created_at
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        return cls(*row)
+
+    @classmethod
+    def row_cursor(cls, conn):
+        cursor = conn.cursor()
+        cursor.row_factory = cls.from_row
+        return cursor
+
+    @property
+    def rule(self):
+        return recurrence.describe(self.frequency, self.every)
+
+    @classmethod
+    @retry_on_busy
+    def create(cls, user_id, title, description, priority, frequency, every, start_date, end_date=None):
+        # Stores the rule only; the first occurrence appears when a view reaches start_date
+        if priority not in ['low', 'medium', 'high']:
+            raise ValueError("Invalid priority")
+        if frequency not in recurrence.FREQUENCIES:
+            raise ValueError("Invalid frequency")
+        if every < 1:
+            raise ValueError("Invalid interval: must be at least 1")
+        if end_date is not None and end_date < start_date:
+            raise ValueError("Invalid end date: before the start date")
+        try:
+            with connection() as conn:
+                created_at = datetime.now()
+                cursor = conn.execute(
+                    f"INSERT INTO task_templates ({TEMPLATE_COLUMNS}) VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (user_id, title, description, priority, frequency, every, start_date, end_date, start_date, created_at)
+                )
+                return cls(cursor.lastrowid, user_id, title, description, priority, frequency, every, start_date, end_date,
+                           start_date, created_at)
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    def find_by_user_id(cls, user_id):
+        try:
+            with connection() as conn:
+                return cls.row_cursor(conn).execute(
+                    f"SELECT {TEMPLATE_COLUMNS} FROM task_templates WHERE user_id = ? ORDER BY id", (user_id,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    @retry_on_busy
+    def stop(cls, template_id, user_id):
+        # Removes the rule; occurrences already created stay as ordinary tasks. False if not found.
+        try:
+            with connection() as conn:
+                if not conn.execute("DELETE FROM task_templates WHERE id = ? AND user_id = ?", (template_id, user_id)).rowcount:
+                    return False
+                conn.execute("UPDATE tasks SET template_id = NULL WHERE template_id = ?", (template_id,))
+                conn.execute("UPDATE archive SET template_id = NULL WHERE template_id = ?", (template_id,))
+                return True
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    @retry_on_busy
+    def materialize(cls, user_id, through):
+        # Creates the user's occurrences due up to through (a date), as far as they do not exist
+        # yet. Only templates with next_date <= through are read (idx_task_templates_user_next), so
+        # a view whose window is already covered costs one index probe.
+        try:
+            with connection() as conn:
+                templates = cls.row_cursor(conn).execute(
+                    f"SELECT {TEMPLATE_COLUMNS} FROM task_templates WHERE user_id = ? AND next_date <= ?",
+                    (user_id, through.isoformat())
+                ).fetchall()
+                return sum(template._materialize(conn, through) for template in templates)
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    @retry_on_busy
+    def advance(cls, user_id, template_id=None):
+        # After occurrences are completed: every template (or just template_id) left with no
+        # pending occurrence gets its next one, whatever the view window
+        sql = (f"SELECT {TEMPLATE_COLUMNS} FROM task_templates AS t WHERE user_id = ? AND next_date IS NOT NULL"
+               f"{' AND id = ?' if template_id is not None else ''} AND NOT EXISTS "
+               "(SELECT 1 FROM tasks WHERE tasks.template_id = t.id AND tasks.status = 'pending')")
+        params = (user_id,) if template_id is None else (user_id, template_id)
+        try:
+            with connection() as conn:
+                templates = cls.row_cursor(conn).execute(sql, params).fetchall()
+                today = dates.today()
+                return sum(template._materialize(conn, max(dates.parse_date(template.next_date), today))
+                           for template in templates)
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
+
+    def _materialize(self, conn, through):
+        # Moves next_date past through and inserts the occurrences in between. The UPDATE is
+        # conditional on the next_date this process read, so when two processes materialize the
+        # same template at once only one of them inserts.
+        due, following = recurrence.window(
+            dates.parse_date(self.start_date), self.frequency, self.every, dates.parse_date(self.end_date),
+            dates.parse_date(self.next_date), through, dates.today()
+        )
+        next_date = following.isoformat() if following else None
+        if not conn.execute("UPDATE task_templates SET next_date = ? WHERE id = ? AND next_date = ?",
+                            (next_date, self.id, self.next_date)).rowcount:
+            return 0
+        created_at = datetime.now().isoformat(' ')
+        conn.executemany(INSERT_OCCURRENCE_SQL, [
+            (self.user_id, self.title, self.description, self.priority, day.isoformat(), created_at, created_at, self.id)
+            for day in due
+        ])
+        self.next_date = next_date
+        return len(due)
+
+    @classmethod
+    def window_end(cls, show_pending, show_overdue, show_due_soon, today=None):
+        # Last due date a listing with these filters can show, or None when it shows no pending tasks
+        today = today or dates.today()
+        if show_pending:
+            return today + timedelta(days=HORIZON_DAYS)
+        if show_due_soon:
+            return today + timedelta(days=1)
+        if show_overdue:
+            return today
+        return None
@@ -0,0 +1,40 @@
+import sqlite3
+from ..database.db import connection
+from .task_model import Task, TASK_COLUMNS
+
+class Reminder:
+    @classmethod
+    def next_due(cls, user_id):
+        # Earliest pending due date, maintained by the tasks_reminder_* triggers
+        try:
+            with connection() as conn:
+                row = conn.execute("SELECT next_due FROM reminder_summary WHERE user_id = ?", (user_id,)).fetchone()
+                return row[0] if row else None
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    def summary(cls, user_id):
+        # (next_due, next_occurrence): the earliest pending due date and the earliest recurring
+        # occurrence not yet created (task_templates_reminder_* triggers), in one lookup
+        try:
+            with connection() as conn:
+                row = conn.execute("SELECT next_due, next_occurrence FROM reminder_summary WHERE user_id = ?", (user_id,)).fetchone()
+                return tuple(row) if row else (None, None)
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    def find_due(cls, user_id, today):
+        # Pending tasks due on or before today (an ISO date string), earliest first
+        try:
+            with connection() as conn:
+                return Task.row_cursor(conn).execute(
+                    f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = ? AND status = 'pending' AND due_date <= ? ORDER BY due_date, id",
+                    (user_id, today)
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            raise
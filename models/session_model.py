@@ -0,0 +1,64 @@
+import sqlite3
+from datetime import datetime
+from ..database.db import connection, is_transient, retry_on_busy
+
+class Session:
+    def __init__(self, id, user_id, created_at, expires_at, revoked_at):
+        self.id = id
+        self.user_id = user_id
+        self.created_at = created_at
+        self.expires_at = expires_at
+        self.revoked_at = revoked_at
+
+    @classmethod
+    @retry_on_busy
+    def create_session(cls, session_id, user_id, expires_at):
+        try:
+            with connection() as conn:
+                created_at = datetime.now()
+                conn.execute(
+                    "INSERT INTO sessions (id, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                    (session_id, user_id, created_at, expires_at)
+                )
+                return cls(session_id, user_id, created_at, expires_at, None)
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    def is_active(cls, session_id, now):
+        try:
+            with connection() as conn:
+                row = conn.execute(
+                    "SELECT 1 FROM sessions WHERE id = ? AND revoked_at IS NULL AND expires_at > ?",
+                    (session_id, now)
+                ).fetchone()
+                return row is not None
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    @retry_on_busy
+    def revoke(cls, session_id):
+        try:
+            with connection() as conn:
+                cursor = conn.execute("UPDATE sessions SET revoked_at = ? WHERE id = ? AND revoked_at IS NULL", (datetime.now(), session_id))
+                return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    @retry_on_busy
+    def revoke_all_for_user(cls, user_id):
+        try:
+            with connection() as conn:
+                cursor = conn.execute("UPDATE sessions SET revoked_at = ? WHERE user_id = ? AND revoked_at IS NULL", (datetime.now(), user_id))
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
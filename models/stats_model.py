@@ -0,0 +1,133 @@
+import sqlite3
+from datetime import timedelta
+from ..database.db import connection
+
+STATUSES = ('pending', 'completed')
+PRIORITIES = ('high', 'medium', 'low')
+
+# Counts straight from tasks; same shapes as the task_counters / task_due_counts queries.
+# task_counters include archived tasks, so the scan reads both tiers (user_id twice).
+SCAN_COUNTS_SQL = ("SELECT IFNULL(status, ''), IFNULL(priority, ''), COUNT(*) FROM "
+                   "(SELECT status, priority FROM tasks WHERE user_id = ? UNION ALL SELECT status, priority FROM archive WHERE user_id = ?) "
+                   "GROUP BY 1, 2")
+SCAN_DUE_COUNTS_SQL = "SELECT due_date, COUNT(*) FROM tasks WHERE user_id = ? AND status = 'pending' AND due_date IS NOT NULL GROUP BY 1"
+
+class TaskStats:
+    def __init__(self, counts, overdue, due_today, due_tomorrow, source):
+        self.counts = counts  # {(status, priority): count}
+        self.overdue = overdue
+        self.due_today = due_today
+        self.due_tomorrow = due_tomorrow
+        self.source = source  # 'counters' or 'scan'
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def count(self, status=None, priority=None):
+        return sum(n for (s, p), n in self.counts.items()
+                   if (status is None or s == status) and (priority is None or p == priority))
+
+    @property
+    def completion_rate(self):
+        total = self.total
+        return self.count(status='completed') / total if total else 0.0
+
+    def to_dict(self):
+        return {
+            'total': self.total,
+            'pending': self.count(status='pending'),
+            'completed': self.count(status='completed'),
+            'completion_rate': round(self.completion_rate, 4),
+            'by_priority': {status: {priority: self.count(status, priority) for priority in PRIORITIES} for status in STATUSES},
+            'overdue': self.overdue,
+            'due_today': self.due_today,
+            'due_tomorrow': self.due_tomorrow,
+            'source': self.source,
+        }
+
+    @classmethod
+    def _due_totals(cls, due_rows, today):
+        # (overdue, due today, due tomorrow) from (due_date, count) rows
+        today_iso = today.isoformat()
+        tomorrow_iso = (today + timedelta(days=1)).isoformat()
+        overdue = due_today = due_tomorrow = 0
+        for due_date, count in due_rows:
+            if due_date < today_iso:
+                overdue += count
+            elif due_date == today_iso:
+                due_today += count
+            elif due_date == tomorrow_iso:
+                due_tomorrow += count
+        return overdue, due_today, due_tomorrow
+
+    @classmethod
+    def load(cls, user_id, today):
+        # Reads the trigger-maintained counters: a few rows per user plus one per distinct
+        # pending due date up to tomorrow
+        tomorrow = (today + timedelta(days=1)).isoformat()
+        try:
+            with connection() as conn:
+                counts = {(status, priority): count for status, priority, count in conn.execute(
+                    "SELECT status, priority, count FROM task_counters WHERE user_id = ? AND count != 0", (user_id,))}
+                due_rows = conn.execute(
+                    "SELECT due_date, count FROM task_due_counts WHERE user_id = ? AND due_date <= ?", (user_id, tomorrow)).fetchall()
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            raise
+        return cls(counts, *cls._due_totals(due_rows, today), 'counters')
+
+    @classmethod
+    def scan(cls, user_id, today):
+        # The same figures by GROUP BY over the user's tasks, archived ones included; cost grows with the account
+        tomorrow = (today + timedelta(days=1)).isoformat()
+        try:
+            with connection() as conn:
+                counts = {(status, priority): count for status, priority, count in conn.execute(SCAN_COUNTS_SQL, (user_id, user_id))}
+                due_rows = conn.execute(
+                    "SELECT due_date, COUNT(*) FROM tasks WHERE user_id = ? AND status = 'pending' AND due_date <= ? GROUP BY 1",
+                    (user_id, tomorrow)).fetchall()
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            raise
+        return cls(counts, *cls._due_totals(due_rows, today), 'scan')
+
+    @classmethod
+    def check(cls, user_id):
+        # Differences between the counters and the tasks table, as (table, key, stored, actual)
+        try:
+            with connection() as conn:
+                pairs = [
+                    ('task_counters',
+                     conn.execute("SELECT status, priority, count FROM task_counters WHERE user_id = ? AND count != 0", (user_id,)),
+                     conn.execute(SCAN_COUNTS_SQL, (user_id, user_id))),
+                    ('task_due_counts',
+                     conn.execute("SELECT due_date, count FROM task_due_counts WHERE user_id = ? AND count != 0", (user_id,)),
+                     conn.execute(SCAN_DUE_COUNTS_SQL, (user_id,))),
+                ]
+                mismatches = []
+                for table, stored_rows, actual_rows in pairs:
+                    stored = {tuple(row[:-1]): row[-1] for row in stored_rows}
+                    actual = {tuple(row[:-1]): row[-1] for row in actual_rows}
+                    for key in sorted(stored.keys() | actual.keys()):
+                        if stored.get(key, 0) != actual.get(key, 0):
+                            mismatches.append((table, key, stored.get(key, 0), actual.get(key, 0)))
+                return mismatches
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    def rebuild(cls, user_id):
+        # Recomputes the user's counters from tasks and archive in one transaction
+        try:
+            with connection() as conn:
+                conn.execute("DELETE FROM task_counters WHERE user_id = ?", (user_id,))
+                conn.execute("DELETE FROM task_due_counts WHERE user_id = ?", (user_id,))
+                conn.execute(f"INSERT INTO task_counters (user_id, status, priority, count) SELECT ?, * FROM ({SCAN_COUNTS_SQL})",
+                             (user_id, user_id, user_id))
+                conn.execute(f"INSERT INTO task_due_counts (user_id, due_date, count) SELECT ?, * FROM ({SCAN_DUE_COUNTS_SQL})",
+                             (user_id, user_id))
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            raise
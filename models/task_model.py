@@ -1,9 +1,195 @@
+import base64
+import json
+import re
 import sqlite3
-from datetime import datetime
-from ..database.db import get_connection
+from datetime import datetime, timedelta
+from ..database.db import connection, get_connection, is_transient, retry_on_busy
+from ..utils import dates
+
+TASK_COLUMNS = "id, user_id, title, description, priority, due_date, status, created_at, updated_at"
+INSERT_TASK_SQL = "INSERT INTO tasks (user_id, title, description, priority, due_date, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+# What the insert triggers would have done for the rows with id > ?, as one statement each (migration 0010)
+BULK_LOAD_SQL = (
+    "INSERT INTO tasks_fts (rowid, title, description) SELECT id, title, description FROM tasks WHERE id > ?",
+    "INSERT INTO task_counters (user_id, status, priority, count) "
+    "SELECT user_id, IFNULL(status, ''), IFNULL(priority, ''), COUNT(*) FROM tasks WHERE id > ? GROUP BY 1, 2, 3 "
+    "ON CONFLICT (user_id, status, priority) DO UPDATE SET count = count + excluded.count",
+    "INSERT INTO task_due_counts (user_id, due_date, count) "
+    "SELECT user_id, due_date, COUNT(*) FROM tasks WHERE id > ? AND status = 'pending' AND due_date IS NOT NULL GROUP BY 1, 2 "
+    "ON CONFLICT (user_id, due_date) DO UPDATE SET count = count + excluded.count",
+    "INSERT INTO reminder_summary (user_id, next_due) "
+    "SELECT user_id, MIN(due_date) FROM tasks WHERE id > ? AND status = 'pending' AND due_date IS NOT NULL GROUP BY 1 "
+    "ON CONFLICT (user_id) DO UPDATE SET next_due = excluded.next_due WHERE next_due IS NULL OR excluded.next_due < next_due",
+)
+
+# Sort expressions; due_sort and priority_rank are generated columns (migration 0003) so
+# priority is not ordered alphabetically and missing due dates sort after every real date
+SORT_EXPRESSIONS = {
+    'created_at': "created_at",
+    'updated_at': "updated_at",
+    'due_date': "due_sort",
+    'priority': "priority_rank",
+    'status': "CASE status WHEN 'pending' THEN 0 WHEN 'completed' THEN 1 ELSE 0 END",
+}
+# UPDATE/DELETE ... RETURNING needs SQLite 3.35+; older libraries read the row back instead
+SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+PAGE_SORT_KEYS = ['created_at', 'updated_at', 'due_date', 'priority']
+# bm25 column weights for tasks_fts (migration 0006): a hit in the title outranks one in the description
+SEARCH_WEIGHTS = (10.0, 1.0)
+SEARCH_TERM = re.compile(r'(\w+)(\*?)')
+# Both tiers as one row source (migration 0008); SQLite pushes the WHERE clause into each arm, so
+# each side is still an index seek
+ALL_TIERS_SOURCE = (f"(SELECT {TASK_COLUMNS}, due_sort, priority_rank FROM tasks "
+                    f"UNION ALL SELECT {TASK_COLUMNS}, due_sort, priority_rank FROM archive)")
+
+def search_expression(text):
+    # User text becomes an FTS5 query of quoted terms, so operators and punctuation are never
+    # interpreted; a trailing * keeps its meaning as a prefix match
+    terms = [f'"{word}"{star}' for word, star in SEARCH_TERM.findall(text or '')]
+    if not terms:
+        raise ValueError("Search query must contain a word")
+    return ' '.join(terms)
+
+class TaskNotFound(Exception):
+    pass
+
+class TaskAccessDenied(Exception):
+    pass
+
+class TaskQuery:
+    def __init__(self, user_id, status=None, priority=None, show_completed=True, show_pending=True,
+                 show_overdue=False, show_due_soon=False, sort_by='created_at', order='ASC', today=None,
+                 ids=None, id_ranges=None, updated_before=None, include_archived=False):
+        if sort_by not in SORT_EXPRESSIONS:
+            raise ValueError("Invalid sort field")
+        if order.upper() not in ['ASC', 'DESC']:
+            raise ValueError("Invalid sort order")
+        self.user_id = user_id
+        self.status = status
+        self.priority = priority
+        self.show_completed = show_completed
+        self.show_pending = show_pending
+        self.show_overdue = show_overdue
+        self.show_due_soon = show_due_soon
+        self.sort_by = sort_by
+        self.order = order.upper()
+        self.today = today or dates.today()
+        self.ids = ids
+        self.id_ranges = id_ranges
+        self.updated_before = updated_before
+        self.include_archived = include_archived
+
+    def source(self):
+        return ALL_TIERS_SOURCE if self.include_archived else "tasks"
+
+    def where(self):
+        conditions = ["user_id = ?"]
+        params = [self.user_id]
+        if self.ids is not None or self.id_ranges is not None:
+            # Explicit selection: a JSON array of ids (one parameter however many) and/or inclusive ranges
+            id_terms = []
+            if self.ids:
+                id_terms.append("id IN (SELECT value FROM json_each(?))")
+                params.append(json.dumps(list(self.ids)))
+            for low, high in self.id_ranges or []:
+                id_terms.append("id BETWEEN ? AND ?")
+                params.extend([low, high])
+            if not id_terms:
+                conditions.append("0")
+            else:
+                conditions.append(id_terms[0] if len(id_terms) == 1 else f"({' OR '.join(id_terms)})")
+        if self.status:
+            conditions.append("status = ?")
+            params.append(self.status)
+        if self.priority:
+            conditions.append("priority = ?")
+            params.append(self.priority)
+        if self.updated_before is not None:
+            conditions.append("updated_at < ?")
+            params.append(self.updated_before.isoformat(' '))
+
+        # A task is listed if it matches any of the requested views
+        branches = []
+        branch_params = []
+        if self.show_completed:
+            branches.append("status = 'completed'")
+        if self.show_pending:
+            branches.append("status = 'pending'")
+        elif self.show_due_soon:
+            branches.append("(status = 'pending' AND due_date <= ?)")
+            branch_params.append((self.today + timedelta(days=1)).isoformat())
+        elif self.show_overdue:
+            branches.append("(status = 'pending' AND due_date < ?)")
+            branch_params.append(self.today.isoformat())
+        if not branches:
+            conditions.append("0")
+        elif not (self.show_completed and self.show_pending):
+            conditions.append(branches[0] if len(branches) == 1 else f"({' OR '.join(branches)})")
+            params.extend(branch_params)
+        return ' AND '.join(conditions), params
+
+    def order_by(self):
+        return f"{SORT_EXPRESSIONS[self.sort_by]} {self.order}, id {self.order}"
+
+    def select(self):
+        where, params = self.where()
+        return f"SELECT {TASK_COLUMNS} FROM {self.source()} WHERE {where} ORDER BY {self.order_by()}", params
+
+    def select_search(self, match):
+        # Ranked full-text matches restricted by the usual filters; the caller appends the limit
+        where, params = self.where()
+        weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS)
+        return (
+            f"SELECT {TASK_COLUMNS} FROM tasks JOIN "
+            f"(SELECT rowid, bm25(tasks_fts, {weights}) AS score FROM tasks_fts WHERE tasks_fts MATCH ?) AS hits "
+            f"ON hits.rowid = tasks.id WHERE {where} ORDER BY hits.score, id LIMIT ?",
+            [search_expression(match)] + params
+        )
+
+    def select_page(self, after=None):
+        # Keyset pagination: rows sharing the cursor's sort key with a later id, then rows with a
+        # later key. Each half is a seek on (user_id, key, id), so page N costs the same as page 1.
+        if self.sort_by not in PAGE_SORT_KEYS:
+            raise ValueError("Pagination is not supported for this sort field")
+        key = SORT_EXPRESSIONS[self.sort_by]
+        op = '>' if self.order == 'ASC' else '<'
+        where, params = self.where()
+        base = f"SELECT {TASK_COLUMNS}, {key} FROM {self.source()} WHERE {where}"
+        order_limit = f" ORDER BY {self.order_by()} LIMIT ?"
+        if after is None:
+            return [(base + order_limit, params)]
+        after_key, after_id = after
+        return [
+            (base + f" AND {key} = ? AND id {op} ?" + order_limit, params + [after_key, after_id]),
+            (base + f" AND {key} {op} ?" + order_limit, params + [after_key]),
+        ]
+
+    def encode_cursor(self, key, task_id):
+        payload = json.dumps([self.sort_by, self.order, key, task_id], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            sort_by, order, key, task_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        if sort_by != self.sort_by or order != self.order or not isinstance(task_id, int):
+            raise ValueError("Cursor does not match the requested sort")
+        return key, task_id
+
+class TaskPage:
+    def __init__(self, tasks, next_cursor=None):
+        self.tasks = tasks
+        self.next_cursor = next_cursor
 
 class Task:
-    def __init__(self, id, user_id, title, description, priority, due_date, status, created_at, updated_at):
+    # Slots keep a million loaded tasks compact; _due and _created are filled on first access.
+    # template_id is only loaded where recurrence needs it (see update_owned); elsewhere it is None.
+    __slots__ = ('id', 'user_id', 'title', 'description', 'priority', 'due_date', 'status', 'created_at', 'updated_at',
+                 'template_id', '_due', '_created')
+
+    def __init__(self, id, user_id, title, description, priority, due_date, status, created_at, updated_at, template_id=None):
         self.id = id
         self.user_id = user_id
         self.title = title
@@ -13,70 +199,168 @@ class Task:
         self.status = status
         self.created_at = created_at
         self.updated_at = updated_at
+        self.template_id = template_id
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        # sqlite3 row_factory for SELECT {TASK_COLUMNS}: rows become tasks as they are fetched
+        return cls(*row)
+
+    @classmethod
+    def row_cursor(cls, conn):
+        cursor = conn.cursor()
+        cursor.row_factory = cls.from_row
+        return cursor
+
+    @property
+    def due(self):
+        # due_date as a date, or None when unset or malformed
+        try:
+            return self._due
+        except AttributeError:
+            self._due = dates.parse_date(self.due_date)
+            return self._due
+
+    @property
+    def created(self):
+        try:
+            return self._created
+        except AttributeError:
+            self._created = dates.parse_timestamp(self.created_at)
+            return self._created
 
     @classmethod
+    @retry_on_busy
     def create_task(cls, user_id, title, description=None, priority='medium', due_date=None):
         if priority not in ['low', 'medium', 'high']:
             raise ValueError("Invalid priority")
-        conn = get_connection()
-        try:
-            cursor = conn.cursor()
-            created_at = datetime.now()
-            updated_at = created_at
-            cursor.execute(
-                "INSERT INTO tasks (user_id, title, description, priority, due_date, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, 'pending', ?, ?)",
-                (user_id, title, description, priority, due_date, created_at, updated_at)
-            )
-            conn.commit()
-            task_id = cursor.lastrowid
-            return cls(task_id, user_id, title, description, priority, due_date, 'pending', created_at, updated_at)
+        try:
+            with connection() as conn:
+                cursor = conn.cursor()
+                created_at = datetime.now()
+                updated_at = created_at
+                cursor.execute(
+                    "INSERT INTO tasks (user_id, title, description, priority, due_date, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, 'pending', ?, ?)",
+                    (user_id, title, description, priority, due_date, created_at, updated_at)
+                )
+                task_id = cursor.lastrowid
+                return cls(task_id, user_id, title, description, priority, due_date, 'pending', created_at, updated_at)
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    def bulk_create(cls, user_id, rows, batch_size=1000):
+        # rows are (title, description, priority, due_date, status) tuples; the caller decides the
+        # transaction scope, each batch is one executemany. The timestamp is formatted once the way
+        # sqlite3's datetime adapter would, rather than once per row.
+        # The insert triggers stand aside while bulk_load has a row (migration 0010); each batch
+        # is then applied to the FTS index and the summary tables by BULK_LOAD_SQL. The bulk_load
+        # insert opens the write transaction before MAX(id) is read, so no other writer's rows
+        # fall into the id range.
+        created_at = datetime.now().isoformat(' ')
+        batch = []
+        count = 0
+        try:
+            with connection() as conn:
+                conn.execute("INSERT INTO bulk_load (active) VALUES (1)")
+                try:
+                    last_id = conn.execute("SELECT IFNULL(MAX(id), 0) FROM tasks").fetchone()[0]
+                    for title, description, priority, due_date, status in rows:
+                        batch.append((user_id, title, description, priority, due_date, status, created_at, created_at))
+                        if len(batch) >= batch_size:
+                            last_id = cls._load_batch(conn, batch, last_id)
+                            count += len(batch)
+                            batch = []
+                    if batch:
+                        cls._load_batch(conn, batch, last_id)
+                        count += len(batch)
+                finally:
+                    if conn.in_transaction:
+                        conn.execute("DELETE FROM bulk_load")
+            return count
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             raise
-        finally:
-            conn.close()
+
+    @classmethod
+    def _load_batch(cls, conn, batch, last_id):
+        # Inserts batch and applies it with BULK_LOAD_SQL; returns the new last id
+        conn.executemany(INSERT_TASK_SQL, batch)
+        for sql in BULK_LOAD_SQL:
+            conn.execute(sql, (last_id,))
+        return conn.execute("SELECT MAX(id) FROM tasks").fetchone()[0]
 
     @classmethod
     def find_by_id(cls, task_id):
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, user_id, title, description, priority, due_date, status, created_at, updated_at FROM tasks WHERE id = ?", (task_id,))
-            row = cursor.fetchone()
-            if row:
-                return cls(*row)
-            return None
+            with connection() as conn:
+                return cls.row_cursor(conn).execute(f"SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?", (task_id,)).fetchone()
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             raise
-        finally:
-            conn.close()
 
     @classmethod
     def find_by_user_id(cls, user_id, status=None, priority=None, sort_by='created_at', order='ASC'):
-        conn = get_connection()
-        try:
-            cursor = conn.cursor()
-            query = "SELECT id, user_id, title, description, priority, due_date, status, created_at, updated_at FROM tasks WHERE user_id = ?"
-            params = [user_id]
-            if status:
-                query += " AND status = ?"
-                params.append(status)
-            if priority:
-                query += " AND priority = ?"
-                params.append(priority)
-            if sort_by in ['created_at', 'updated_at', 'due_date', 'priority', 'status']:
-                query += f" ORDER BY {sort_by} {order.upper()}"
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            return [cls(*row) for row in rows]
+        return cls.find(TaskQuery(user_id, status=status, priority=priority, sort_by=sort_by, order=order))
+
+    @classmethod
+    def find(cls, query):
+        sql, params = query.select()
+        try:
+            with connection() as conn:
+                return cls.row_cursor(conn).execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    def iter(cls, query, batch_size=500):
+        # Streams rows off the cursor in batches instead of materializing the whole result
+        sql, params = query.select()
+        try:
+            cursor = cls.row_cursor(get_connection()).execute(sql, params)
+            while True:
+                tasks = cursor.fetchmany(batch_size)
+                if not tasks:
+                    break
+                yield from tasks
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    def find_page(cls, query, limit, cursor=None):
+        after = query.decode_cursor(cursor) if cursor else None
+        rows = []
+        try:
+            with connection() as conn:
+                for sql, params in query.select_page(after):
+                    rows.extend(conn.execute(sql, params + [limit + 1 - len(rows)]).fetchall())
+                    if len(rows) > limit:
+                        break
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             raise
-        finally:
-            conn.close()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = query.encode_cursor(rows[-1][-1], rows[-1][0])
+        return TaskPage([cls(*row[:-1]) for row in rows], next_cursor)
 
     @classmethod
+    def search(cls, query, match, limit=20):
+        sql, params = query.select_search(match)
+        try:
+            with connection() as conn:
+                return cls.row_cursor(conn).execute(sql, params + [limit]).fetchall()
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    @retry_on_busy
     def update_task(cls, task_id, **kwargs):
         allowed_fields = ['title', 'description', 'priority', 'due_date', 'status']
         updates = {}
@@ -92,33 +376,131 @@ class Task:
         updates['updated_at'] = datetime.now()
         set_clause = ', '.join(f"{k} = ?" for k in updates.keys())
         values = list(updates.values()) + [task_id]
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(f"UPDATE tasks SET {set_clause} WHERE id = ?", values)
-            conn.commit()
-            if cursor.rowcount > 0:
-                return cls.find_by_id(task_id)
-            return None
+            with connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"UPDATE tasks SET {set_clause} WHERE id = ?", values)
+                if cursor.rowcount > 0:
+                    return cls.find_by_id(task_id)
+                return None
         except sqlite3.Error as e:
-            print(f"Database error: {e}")
+            if not is_transient(e):
+                print(f"Database error: {e}")
             raise
-        finally:
-            conn.close()
 
     @classmethod
+    @retry_on_busy
     def delete_task(cls, task_id):
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            with connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+                return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    def _raise_missing(cls, conn, task_id):
+        # Only reached when an ownership-scoped statement matched nothing
+        if conn.execute("SELECT 1 FROM tasks WHERE id = ?", (task_id,)).fetchone():
+            raise TaskAccessDenied(task_id)
+        raise TaskNotFound(task_id)
+
+    @classmethod
+    def find_owned(cls, task_id, user_id):
+        try:
+            with connection() as conn:
+                task = cls.row_cursor(conn).execute(f"SELECT {TASK_COLUMNS} FROM tasks WHERE id = ? AND user_id = ?", (task_id, user_id)).fetchone()
+                if not task:
+                    cls._raise_missing(conn, task_id)
+                return task
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             raise
-        finally:
-            conn.close()
+
+    @classmethod
+    @retry_on_busy
+    def update_owned(cls, task_id, user_id, **kwargs):
+        # Single round trip: the ownership check is part of the WHERE clause and the new row comes
+        # back through RETURNING, with template_id so completing an occurrence can schedule the next
+        allowed_fields = ['title', 'description', 'priority', 'due_date', 'status']
+        updates = {}
+        for key, value in kwargs.items():
+            if key in allowed_fields:
+                if key == 'priority' and value not in ['low', 'medium', 'high']:
+                    raise ValueError("Invalid priority")
+                if key == 'status' and value not in ['pending', 'completed']:
+                    raise ValueError("Invalid status")
+                updates[key] = value
+        if not updates:
+            raise ValueError("Nothing to update")
+        updates['updated_at'] = datetime.now()
+        set_clause = ', '.join(f"{k} = ?" for k in updates.keys())
+        values = list(updates.values()) + [task_id, user_id]
+        sql = f"UPDATE tasks SET {set_clause} WHERE id = ? AND user_id = ?"
+        try:
+            with connection() as conn:
+                if SUPPORTS_RETURNING:
+                    tasks = cls.row_cursor(conn).execute(f"{sql} RETURNING {TASK_COLUMNS}, template_id", values).fetchall()
+                    task = tasks[0] if tasks else None
+                elif conn.execute(sql, values).rowcount:
+                    task = cls.row_cursor(conn).execute(f"SELECT {TASK_COLUMNS}, template_id FROM tasks WHERE id = ?", (task_id,)).fetchone()
+                else:
+                    task = None
+                if not task:
+                    cls._raise_missing(conn, task_id)
+                return task
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    @retry_on_busy
+    def delete_owned(cls, task_id, user_id):
+        try:
+            with connection() as conn:
+                if not conn.execute("DELETE FROM tasks WHERE id = ? AND user_id = ?", (task_id, user_id)).rowcount:
+                    cls._raise_missing(conn, task_id)
+                return True
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    @retry_on_busy
+    def bulk_set_status(cls, query, status):
+        # One ownership-scoped UPDATE over everything the query matches; only rows that actually
+        # change are counted
+        if status not in ['pending', 'completed']:
+            raise ValueError("Invalid status")
+        where, params = query.where()
+        try:
+            with connection() as conn:
+                cursor = conn.execute(
+                    f"UPDATE tasks SET status = ?, updated_at = ? WHERE {where} AND status != ?",
+                    [status, datetime.now()] + params + [status]
+                )
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    @retry_on_busy
+    def bulk_delete(cls, query):
+        where, params = query.where()
+        try:
+            with connection() as conn:
+                return conn.execute(f"DELETE FROM tasks WHERE {where}", params).rowcount
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
 
     @classmethod
     def mark_done(cls, task_id):
@@ -1,8 +1,13 @@
 import sqlite3
 from datetime import datetime
-from ..database.db import get_connection
+from ..database.db import connection, is_transient, retry_on_busy
+from ..utils.dates import parse_timestamp
+
+USER_COLUMNS = "id, username, password_hash, created_at"
 
 class User:
+    __slots__ = ('id', 'username', 'password_hash', 'created_at', '_created')
+
     def __init__(self, id, username, password_hash, created_at):
         self.id = id
         self.username = username
@@ -10,55 +15,69 @@ class User:
         self.created_at = created_at
 
     @classmethod
+    def from_row(cls, cursor, row):
+        return cls(*row)
+
+    @classmethod
+    def row_cursor(cls, conn):
+        cursor = conn.cursor()
+        cursor.row_factory = cls.from_row
+        return cursor
+
+    @property
+    def created(self):
+        try:
+            return self._created
+        except AttributeError:
+            self._created = parse_timestamp(self.created_at)
+            return self._created
+
+    @classmethod
+    @retry_on_busy
     def create_user(cls, username, password_hash):
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            created_at = datetime.now()
-            cursor.execute(
-                "INSERT INTO users (username, password_hash, created_at) VALUES (?, ?, ?)",
-                (username, password_hash, created_at)
-            )
-            conn.commit()
-            user_id = cursor.lastrowid
-            return cls(user_id, username, password_hash, created_at)
+            with connection() as conn:
+                cursor = conn.cursor()
+                created_at = datetime.now()
+                cursor.execute(
+                    "INSERT INTO users (username, password_hash, created_at) VALUES (?, ?, ?)",
+                    (username, password_hash, created_at)
+                )
+                user_id = cursor.lastrowid
+                return cls(user_id, username, password_hash, created_at)
         except sqlite3.IntegrityError:
             # Duplicate username
             return None
         except sqlite3.Error as e:
-            print(f"Database error: {e}")
+            if not is_transient(e):
+                print(f"Database error: {e}")
+            raise
+
+    @classmethod
+    @retry_on_busy
+    def update_password_hash(cls, user_id, password_hash):
+        try:
+            with connection() as conn:
+                conn.execute("UPDATE users SET password_hash = ? WHERE id = ?", (password_hash, user_id))
+        except sqlite3.Error as e:
+            if not is_transient(e):
+                print(f"Database error: {e}")
             raise
-        finally:
-            conn.close()
 
     @classmethod
     def find_by_username(cls, username):
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, username, password_hash, created_at FROM users WHERE username = ?", (username,))
-            row = cursor.fetchone()
-            if row:
-                return cls(*row)
-            return None
+            with connection() as conn:
+                return cls.row_cursor(conn).execute(f"SELECT {USER_COLUMNS} FROM users WHERE username = ?", (username,)).fetchone()
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             raise
-        finally:
-            conn.close()
 
     @classmethod
     def find_by_id(cls, user_id):
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, username, password_hash, created_at FROM users WHERE id = ?", (user_id,))
-            row = cursor.fetchone()
-            if row:
-                return cls(*row)
-            return None
+            with connection() as conn:
+                return cls.row_cursor(conn).execute(f"SELECT {USER_COLUMNS} FROM users WHERE id = ?", (user_id,)).fetchone()
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             raise
-        finally:
-            conn.close()
@@ -0,0 +1,333 @@
+import asyncio
+import json
+import re
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+from .controllers import auth
+from .controllers import tasks
+from .database import db
+from .utils import dates
+from .utils.logger import get_logger
+from .utils.messages import message_status
+from .utils.notifications import check_reminders
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 8
+# signup and login (bcrypt) run on their own smaller pool so a burst of them cannot occupy every
+# worker; 0 runs them on the main pool. Beyond AUTH_BACKLOG waiting requests they get a 503.
+DEFAULT_AUTH_WORKERS = 2
+AUTH_BACKLOG = 32
+PASSWORD_PATHS = ('/signup', '/login')
+# Seconds an idle keep-alive connection stays open
+IDLE_TIMEOUT = 30
+MAX_BODY_SIZE = 1024 * 1024
+
+def task_to_dict(task):
+    return {
+        'id': task.id,
+        'title': task.title,
+        'description': task.description,
+        'priority': task.priority,
+        'due_date': task.due_date,
+        'status': task.status,
+        'created_at': str(task.created_at) if task.created_at is not None else None,
+        'updated_at': str(task.updated_at) if task.updated_at is not None else None,
+    }
+
+class ApiRequest:
+    # One parsed request; run() executes on a pool thread and returns (status, JSON bytes)
+
+    # (method, path pattern, handler name, needs login)
+    routes = [
+        ('POST', r'/signup', 'signup', False),
+        ('POST', r'/login', 'login', False),
+        ('POST', r'/logout', 'logout', True),
+        ('GET', r'/whoami', 'whoami', True),
+        ('GET', r'/tasks', 'list_tasks', True),
+        ('POST', r'/tasks', 'add_task', True),
+        ('GET', r'/tasks/(\d+)', 'view_task', True),
+        ('PATCH', r'/tasks/(\d+)', 'edit_task', True),
+        ('DELETE', r'/tasks/(\d+)', 'delete_task', True),
+        ('POST', r'/tasks/(\d+)/done', 'mark_done', True),
+        ('POST', r'/tasks/(\d+)/reopen', 'reopen', True),
+        ('GET', r'/search', 'search', True),
+        ('GET', r'/reminders', 'reminders', True),
+        ('GET', r'/stats', 'stats', True),
+    ]
+
+    def __init__(self, method, target, headers, body):
+        self.method = method
+        self.target = target
+        self.headers = headers
+        self.raw_body = body
+
+    def hashes_password(self):
+        return self.method == 'POST' and urlsplit(self.target).path in PASSWORD_PATHS
+
+    def run(self):
+        status, payload = self.dispatch()
+        return status, json.dumps(payload).encode('utf-8')
+
+    def dispatch(self):
+        parts = urlsplit(self.target)
+        self.query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        try:
+            self.body = json.loads(self.raw_body) if self.raw_body else {}
+        except ValueError:
+            self.body = None
+        if not isinstance(self.body, dict):
+            return 400, {'error': "Request body must be a JSON object"}
+        route = None
+        allowed = []
+        for route_method, pattern, name, needs_login in self.routes:
+            match = re.fullmatch(pattern, parts.path)
+            if match:
+                allowed.append(route_method)
+                if route_method == self.method:
+                    route = (name, needs_login, match.groups())
+                    break
+        if route is None:
+            return (405, {'error': "Method not allowed"}) if allowed else (404, {'error': "Not found"})
+        name, needs_login, args = route
+        dates.reset_today()
+        self.token = self.bearer_token()
+        user = auth.authenticate_token(self.token) if self.token else None
+        if needs_login and user is None:
+            return 401, {'error': "User not logged in"}
+        try:
+            with auth.request_scope(user):
+                return getattr(self, 'handle_' + name)(*args)
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            get_logger().error(f"An error occurred: {e}")
+            return 500, {'error': "Internal error"}
+
+    def bearer_token(self):
+        header = self.headers.get('authorization', '')
+        if header.startswith('Bearer '):
+            return header[len('Bearer '):].strip()
+        return None
+
+    def result(self, message):
+        status = message_status(message)
+        return status, {'message': message} if status < 400 else {'error': message}
+
+    def flag(self, name):
+        return self.query.get(name, '').lower() in ('1', 'true', 'yes')
+
+    def text_field(self, name, required=False, allow_blank=True):
+        # A string field of the JSON body, or None when it is absent or null; anything else is a 400
+        value = self.body.get(name)
+        if value is None:
+            if required:
+                raise ValueError(f"{name} is required")
+            return None
+        if not isinstance(value, str):
+            raise ValueError(f"{name} must be a string")
+        if not allow_blank and not value.strip():
+            raise ValueError(f"{name} must not be blank")
+        return value
+
+    def handle_signup(self):
+        username, password = self.body.get('username'), self.body.get('password')
+        if not username or not password:
+            raise ValueError("username and password are required")
+        if not auth.signup(username, password):
+            return 409, {'error': "Signup failed"}
+        return 201, {'message': "Signup successful"}
+
+    def handle_login(self):
+        user = auth.authenticate(self.body.get('username') or '', self.body.get('password') or '')
+        if user is None:
+            return 401, {'error': "Login failed"}
+        return 200, {'token': auth.issue_token(user), 'username': user.username}
+
+    def handle_logout(self):
+        auth.revoke_token(self.token)
+        return 200, {'message': "Logged out"}
+
+    def handle_whoami(self):
+        user = auth.get_current_user()
+        return 200, {'id': user.id, 'username': user.username}
+
+    def handle_list_tasks(self):
+        show_completed = self.flag('completed')
+        show_pending = self.flag('pending')
+        show_overdue = self.flag('overdue')
+        show_due_soon = self.flag('due_soon')
+        include_archived = self.flag('archived')
+        if not (show_completed or show_pending or show_overdue or show_due_soon):
+            show_completed = include_archived
+            show_pending = not include_archived
+        filters = dict(priority=self.query.get('priority'), sort_by=self.query.get('sort_by', 'created_at'),
+                       order=self.query.get('order', 'ASC'), show_completed=show_completed, show_pending=show_pending,
+                       show_overdue=show_overdue, show_due_soon=show_due_soon, include_archived=include_archived)
+        page = tasks.list_tasks_page(limit=int(self.query.get('limit', 20)), after=self.query.get('after'), **filters)
+        if isinstance(page, str):
+            return self.result(page)
+        return 200, {'tasks': [task_to_dict(task) for task in page.tasks], 'next': page.next_cursor}
+
+    def handle_add_task(self):
+        task = tasks.create_task(self.text_field('title', required=True, allow_blank=False), self.text_field('description'),
+                                 self.text_field('priority') or 'medium', self.text_field('due_date'))
+        if isinstance(task, str):
+            return self.result(task)
+        return 201, task_to_dict(task)
+
+    def handle_view_task(self, task_id):
+        task = tasks.view_task(int(task_id))
+        if task is None:
+            return 404, {'error': "Task not found"}
+        return 200, task_to_dict(task)
+
+    def handle_edit_task(self, task_id):
+        return self.result(tasks.edit_task(int(task_id), title=self.text_field('title', allow_blank=False),
+                                           description=self.text_field('description'), priority=self.text_field('priority'),
+                                           due_date=self.text_field('due_date')))
+
+    def handle_delete_task(self, task_id):
+        return self.result(tasks.delete_task(int(task_id)))
+
+    def handle_mark_done(self, task_id):
+        return self.result(tasks.mark_done(int(task_id)))
+
+    def handle_reopen(self, task_id):
+        return self.result(tasks.reopen(int(task_id)))
+
+    def handle_search(self):
+        found = tasks.search_tasks(self.query.get('q', ''), priority=self.query.get('priority'),
+                                   show_completed=self.flag('completed'), show_pending=self.flag('pending'),
+                                   limit=int(self.query.get('limit', 20)))
+        if isinstance(found, str):
+            return self.result(found)
+        return 200, {'tasks': [task_to_dict(task) for task in found]}
+
+    def handle_reminders(self):
+        notifs = check_reminders(tasks.get_reminders())
+        return 200, {'overdue': [task_to_dict(task) for task in notifs['overdue']],
+                     'due_today': [task_to_dict(task) for task in notifs['due_today']]}
+
+    def handle_stats(self):
+        stats = tasks.task_stats(scan=self.flag('scan'))
+        if isinstance(stats, str):
+            return self.result(stats)
+        return 200, stats.to_dict()
+
+class ApiServer:
+    # asyncio owns the sockets, so idle keep-alive connections cost nothing; request handling runs on
+    # a bounded thread pool, and each pool thread keeps its own database connection (database.db is
+    # thread-local). bcrypt releases the GIL, so password hashing gets a separate thread pool rather
+    # than processes. serve_forever/shutdown/server_close mirror socketserver.
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS, auth_workers=DEFAULT_AUTH_WORKERS):
+        self.socket = socket.create_server((host, port))
+        self.server_address = self.socket.getsockname()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='todo-worker')
+        self.auth_pool = ThreadPoolExecutor(max_workers=auth_workers, thread_name_prefix='todo-auth') if auth_workers else None
+        self.auth_limit = auth_workers + AUTH_BACKLOG
+        self.auth_pending = 0
+        self._loop = None
+        self._stop = None
+        self._stopped = threading.Event()
+
+    def serve_forever(self):
+        self._stopped.clear()
+        try:
+            asyncio.run(self._serve())
+        finally:
+            self._stopped.set()
+
+    async def _serve(self):
+        self._stop = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        server = await asyncio.start_server(self._connection, sock=self.socket)
+        async with server:
+            await self._stop.wait()
+
+    def shutdown(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+            self._stopped.wait()
+
+    def server_close(self):
+        self.pool.shutdown(wait=True)
+        if self.auth_pool is not None:
+            self.auth_pool.shutdown(wait=True)
+        self.socket.close()
+
+    async def _connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        key, value = line.split(':', 1)
+                        headers[key.strip().lower()] = value.strip()
+                try:
+                    method, target, version = lines[0].split()
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    await self._write(writer, 400, json.dumps({'error': "Bad request"}).encode('utf-8'), False)
+                    break
+                if length > MAX_BODY_SIZE:
+                    await self._write(writer, 413, json.dumps({'error': "Request body too large"}).encode('utf-8'), False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                request = ApiRequest(method, target, headers, body)
+                if self.auth_pool is not None and request.hashes_password():
+                    status, data = await self._run_auth(loop, request)
+                else:
+                    status, data = await loop.run_in_executor(self.pool, request.run)
+                await self._write(writer, status, data, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _run_auth(self, loop, request):
+        # auth_pending is only touched on the event loop thread
+        if self.auth_pending >= self.auth_limit:
+            return 503, json.dumps({'error': "Too many login attempts, try again shortly"}).encode('utf-8')
+        self.auth_pending += 1
+        try:
+            return await loop.run_in_executor(self.auth_pool, request.run)
+        finally:
+            self.auth_pending -= 1
+
+    async def _write(self, writer, status, data, keep_alive):
+        # Status line, headers and body go out in one write
+        writer.write(
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+        )
+        await writer.drain()
+
+def create_server(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS, auth_workers=DEFAULT_AUTH_WORKERS):
+    return ApiServer(host, port, workers, auth_workers)
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS, auth_workers=DEFAULT_AUTH_WORKERS):
+    server = create_server(host, port, workers, auth_workers)
+    print(f"Serving on http://{host}:{server.server_address[1]} with {workers} workers and {auth_workers} login workers (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        db.close_connection()
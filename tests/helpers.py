@@ -0,0 +1,24 @@
+from todo_app.database.db import get_connection
+
+STATEMENT_KINDS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')
+
+def capture_queries(fn, *args, **kwargs):
+    # SQL issued on this thread's connection while fn runs, excluding transaction control and
+    # statements SQLite runs inside triggers (sqlite3 reports each of those as a repeat of the
+    # statement that fired the trigger)
+    queries = []
+    conn = get_connection()
+    conn.set_trace_callback(queries.append)
+    try:
+        fn(*args, **kwargs)
+    finally:
+        conn.set_trace_callback(None)
+    statements = []
+    for sql in queries:
+        if sql.lstrip().upper().startswith(STATEMENT_KINDS) and (not statements or statements[-1] != sql):
+            statements.append(sql)
+    return statements
+
+def query_plan(sql):
+    rows = get_connection().execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    return ' | '.join(row[3] for row in rows)
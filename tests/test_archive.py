@@ -0,0 +1,108 @@
+import unittest
+import os
+from datetime import datetime, timedelta
+from todo_app.controllers import auth
+from todo_app.controllers.maintenance import run_maintenance
+from todo_app.controllers.tasks import (add_task, mark_done, list_tasks, list_tasks_page, view_task, archive_tasks,
+                                        unarchive_tasks, search_tasks, task_stats, check_stats)
+from todo_app.database.db import set_db_path, initialize_database, close_connection, get_connection, connection
+from todo_app.models.archive_model import Archive
+from todo_app.models.user_model import User
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.test_db = 'test_todo.db'
+        set_db_path(self.test_db)
+        initialize_database()
+        self.user = User.create_user('owner', 'x')
+        self.other = User.create_user('other', 'x')
+        auth.current_user = self.user
+
+    def tearDown(self):
+        auth.current_user = None
+        close_connection()
+        if os.path.exists(self.test_db):
+            os.remove(self.test_db)
+
+    def add(self, title, done=False, days_ago=0):
+        add_task(title, priority='high')
+        task_id = next(task.id for task in list_tasks(show_completed=True) if task.title == title)
+        if done:
+            mark_done(task_id)
+            updated = datetime.now() - timedelta(days=days_ago)
+            with connection() as conn:
+                conn.execute("UPDATE tasks SET updated_at = ? WHERE id = ?", (updated.isoformat(' '), task_id))
+        return task_id
+
+    def archived_ids(self):
+        return [row[0] for row in get_connection().execute("SELECT id FROM archive ORDER BY id")]
+
+    def test_archive_moves_only_completed_tasks(self):
+        done = self.add('Done', done=True)
+        pending = self.add('Pending')
+        self.assertEqual(archive_tasks([done, pending]), "1 task archived")
+        self.assertEqual(self.archived_ids(), [done])
+        self.assertEqual([task.id for task in list_tasks(show_completed=True)], [pending])
+
+    def test_archive_by_age(self):
+        old = self.add('Old', done=True, days_ago=40)
+        self.add('Recent', done=True, days_ago=2)
+        self.assertEqual(archive_tasks(older_than=30), "1 task archived")
+        self.assertEqual(self.archived_ids(), [old])
+        self.assertEqual(archive_tasks(), "No tasks selected")
+
+    def test_archive_is_scoped_to_owner(self):
+        auth.current_user = self.other
+        theirs = self.add('Theirs', done=True)
+        auth.current_user = self.user
+        self.assertEqual(archive_tasks([theirs]), "0 tasks archived")
+        self.assertEqual(unarchive_tasks([theirs]), "0 tasks restored")
+
+    def test_list_reads_both_tiers(self):
+        first = self.add('First', done=True)
+        second = self.add('Second', done=True)
+        third = self.add('Third', done=True)
+        archive_tasks([second])
+        self.assertEqual([task.id for task in list_tasks(show_completed=True, show_pending=False)], [first, third])
+        both = list_tasks(show_completed=True, show_pending=False, include_archived=True)
+        self.assertEqual([task.id for task in both], [first, second, third])
+        page = list_tasks_page(show_completed=True, show_pending=False, include_archived=True, limit=2)
+        rest = list_tasks_page(show_completed=True, show_pending=False, include_archived=True, limit=2, after=page.next_cursor)
+        self.assertEqual([task.id for task in page.tasks + rest.tasks], [first, second, third])
+
+    def test_view_and_unarchive(self):
+        task_id = self.add('Report', done=True)
+        archive_tasks([task_id])
+        self.assertEqual(view_task(task_id).title, 'Report')
+        self.assertEqual(search_tasks('report'), [])
+        self.assertEqual(unarchive_tasks([task_id]), "1 task restored")
+        self.assertEqual(self.archived_ids(), [])
+        task = list_tasks(show_completed=True)[0]
+        self.assertEqual((task.id, task.status), (task_id, 'completed'))
+        self.assertEqual([task.id for task in search_tasks('report')], [task_id])
+
+    def test_stats_count_archived_tasks(self):
+        self.add('Open')
+        done = self.add('Done', done=True)
+        before = task_stats().to_dict()
+        archive_tasks([done])
+        self.assertEqual(task_stats().to_dict(), before)
+        self.assertEqual(task_stats(scan=True).to_dict()['completed'], 1)
+        self.assertEqual(check_stats(), [])
+
+    def test_maintenance_archives_every_user_in_batches(self):
+        old = [self.add(f'Old {n}', done=True, days_ago=60) for n in range(5)]
+        self.add('Recent', done=True, days_ago=1)
+        self.add('Open')
+        auth.current_user = self.other
+        theirs = self.add('Theirs', done=True, days_ago=60)
+        report = run_maintenance(archive_days=30, batch_size=2)
+        self.assertEqual(report[0], "Archived 6 tasks completed more than 30 days ago")
+        self.assertEqual(self.archived_ids(), old + [theirs])
+        report = run_maintenance(archive_days=None, vacuum=True)
+        self.assertEqual(report[0], "Statistics updated")
+        self.assertTrue(report[1].startswith("Vacuumed: "))
+        self.assertEqual(Archive.archive_completed(30), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,14 @@
 import unittest
 import os
-from todo_app.controllers.auth import signup, login, logout, get_current_user
-from todo_app.database.db import set_db_path, initialize_database
+import tempfile
+from unittest import mock
+from todo_app.controllers import auth
+from todo_app.controllers.auth import signup, login, logout, get_current_user, get_session_username, authenticate_token, issue_token
+from todo_app.database.db import set_db_path, initialize_database, close_connection
+from todo_app.models.session_model import Session
+from todo_app.tests.helpers import capture_queries
+from todo_app.models.user_model import User
+from todo_app.utils import passwords, tokens
 
 class TestAuth(unittest.TestCase):
     def setUp(self):
@@ -10,6 +17,8 @@ class TestAuth(unittest.TestCase):
         initialize_database()
 
     def tearDown(self):
+        logout()
+        close_connection()
         if os.path.exists(self.test_db):
             os.remove(self.test_db)
 
@@ -46,5 +55,108 @@ class TestAuth(unittest.TestCase):
         logout()
         self.assertIsNone(get_current_user())
 
+    def test_login_rehashes_when_rounds_change(self):
+        rounds = passwords.ROUNDS
+        try:
+            passwords.ROUNDS = 4
+            signup('testuser', 'password')
+            old_hash = User.find_by_username('testuser').password_hash
+            self.assertEqual(passwords.hash_rounds(old_hash), 4)
+            passwords.ROUNDS = 5
+            self.assertFalse(login('testuser', 'wrong'))
+            self.assertEqual(User.find_by_username('testuser').password_hash, old_hash)
+            self.assertTrue(login('testuser', 'password'))
+            new_hash = User.find_by_username('testuser').password_hash
+            self.assertEqual(passwords.hash_rounds(new_hash), 5)
+            self.assertTrue(passwords.verify_password('password', new_hash))
+            queries = capture_queries(auth.authenticate, 'testuser', 'password')
+            self.assertEqual(len(queries), 1, queries)  # Already at the configured cost
+        finally:
+            passwords.ROUNDS = rounds
+
+    def test_password_helpers(self):
+        password_hash = passwords.hash_password('secret', rounds=4)
+        self.assertTrue(password_hash.startswith('$2b$04$'))
+        self.assertTrue(passwords.verify_password('secret', password_hash))
+        self.assertFalse(passwords.verify_password('secret', 'not a hash'))
+        self.assertIsNone(passwords.hash_rounds('not a hash'))
+        self.assertTrue(passwords.needs_rehash(password_hash, rounds=5))
+        self.assertFalse(passwords.needs_rehash(password_hash, rounds=4))
+        with self.assertRaises(ValueError):
+            passwords.hash_password('secret', rounds=3)
+
+    def forget_process_state(self):
+        # What a fresh process sees: nothing in memory, only the session file
+        auth.current_user = None
+        auth.current_session_id = None
+        auth._session_loaded = False
+
+    def test_session_loads_without_users_query(self):
+        signup('testuser', 'password')
+        login('testuser', 'password')
+        self.forget_process_state()
+        queries = capture_queries(get_current_user)
+        self.assertEqual(get_current_user().username, 'testuser')
+        self.assertFalse([sql for sql in queries if 'users' in sql], queries)
+
+    def test_tampered_session_is_rejected(self):
+        signup('testuser', 'password')
+        login('testuser', 'password')
+        token, _ = auth._read_session_file()
+        signature = token.split('.')[1]
+        forged = tokens.create_token(b'wrong key', 1, 'testuser', 'sid')
+        auth.save_session(forged.split('.')[0] + '.' + signature, 0)
+        self.forget_process_state()
+        self.assertIsNone(get_current_user())
+        self.assertIsNone(get_session_username())
+
+    def test_expired_token_is_rejected(self):
+        secret = auth._secret()
+        token = tokens.create_token(secret, 1, 'testuser', 'sid', ttl=60, now=1000)
+        self.assertIsNotNone(tokens.verify_token(secret, token, now=1059))
+        self.assertIsNone(tokens.verify_token(secret, token, now=1060))
+
+    def test_secret_created_by_another_process_first_is_used(self):
+        with tempfile.TemporaryDirectory() as directory, mock.patch.dict(os.environ, {'TODO_SECRET_KEY': ''}):
+            path = os.path.join(directory, tokens.SECRET_FILE)
+            link = os.link
+            def lose_the_race(source, target):
+                with open(target, 'wb') as f:
+                    f.write(b'theirs')
+                link(source, target)
+            with mock.patch.object(tokens.os, 'link', lose_the_race):
+                self.assertEqual(tokens.get_secret(directory), b'theirs')
+            self.assertEqual(os.listdir(directory), [tokens.SECRET_FILE])
+            tokens._secrets.pop(path)
+            self.assertEqual(tokens.get_secret(directory), b'theirs')
+
+    def test_revoked_session_is_rejected_on_next_check(self):
+        signup('testuser', 'password')
+        login('testuser', 'password')
+        Session.revoke(auth.current_session_id)
+        self.forget_process_state()
+        auth.save_session(auth._read_session_file()[0], 0)
+        self.assertIsNone(get_current_user())
+
+    def test_authenticate_token_after_logout(self):
+        signup('testuser', 'password')
+        login('testuser', 'password')
+        token = issue_token(get_current_user())
+        self.assertEqual(authenticate_token(token).username, 'testuser')
+        Session.revoke_all_for_user(get_current_user().id)
+        auth._revocation_checks.clear()
+        self.assertIsNone(authenticate_token(token))
+
+    def test_request_scope_overrides_the_cli_session(self):
+        signup('testuser', 'password')
+        signup('other', 'password')
+        login('testuser', 'password')
+        other = auth.authenticate('other', 'password')
+        with auth.request_scope(other):
+            self.assertEqual(get_current_user().username, 'other')
+        with auth.request_scope(None):
+            self.assertFalse(auth.is_logged_in())
+        self.assertEqual(get_current_user().username, 'testuser')
+
 if __name__ == '__main__':
     unittest.main()
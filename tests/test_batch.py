@@ -0,0 +1,103 @@
+import unittest
+import base64
+import io
+import json
+import os
+from todo_app.cli import run_batch
+from todo_app.controllers import auth
+from todo_app.database import db
+from todo_app.database.db import set_db_path, initialize_database, close_connection
+from todo_app.models.user_model import User
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.test_db = 'test_todo.db'
+        set_db_path(self.test_db)
+        initialize_database()
+        auth.current_user = User.create_user('owner', 'x')
+
+    def tearDown(self):
+        auth.current_user = None
+        close_connection()
+        if os.path.exists(self.test_db):
+            os.remove(self.test_db)
+
+    def batch(self, script, **kwargs):
+        out = io.StringIO()
+        counts = run_batch(io.StringIO(script), out=out, **kwargs)
+        return counts, out.getvalue()
+
+    def saved_titles(self):
+        # Read through a fresh connection so only committed rows count
+        close_connection()
+        return [row[0] for row in db.get_connection().execute("SELECT title FROM tasks ORDER BY id")]
+
+    def test_each_line_gets_a_result(self):
+        counts, output = self.batch("add First\n# comment\n\nadd 'Second task' --priority high\nview 9\nlogin owner\nadd\ndone 1\n")
+        self.assertEqual(counts, (3, 3, False))
+        lines = output.splitlines()
+        self.assertEqual(lines[0], "1 ok: Task added successfully")
+        self.assertEqual(lines[1], "4 ok: Task added successfully")
+        self.assertEqual(lines[2], "5 error: Task not found")
+        self.assertEqual(lines[3], "6 error: 'login' is not available in a batch")
+        self.assertTrue(lines[4].startswith("7 error:"))
+        self.assertEqual(lines[-1], "8 ok: Task marked as done")
+        self.assertEqual(self.saved_titles(), ['First', 'Second task'])
+
+    def test_jsonl_results(self):
+        _, output = self.batch("add First\nlist --format jsonl --columns id,title\n", results='jsonl')
+        results = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual([(r['line'], r['command'], r['ok']) for r in results], [(1, 'add', True), (2, 'list', True)])
+        self.assertEqual(json.loads(results[1]['output']), {'id': 1, 'title': 'First'})
+
+    def test_zero_limit_is_rejected_not_defaulted(self):
+        counts, output = self.batch("add First\nlist --limit 0\n")
+        self.assertEqual(counts, (1, 1, False))
+        self.assertEqual(output.splitlines()[1], "2 error: Limit must be positive")
+
+    def test_query_errors_are_failures(self):
+        cursor = base64.urlsafe_b64encode(json.dumps(['due_date', 'ASC', None, 1]).encode()).decode().rstrip('=')
+        counts, output = self.batch(f"add First\nsearch '!!'\nlist --sort-by status --limit 5\nlist --after {cursor}\n")
+        self.assertEqual(counts, (1, 3, False))
+        self.assertEqual(output.splitlines()[1:], ["2 error: Search query must contain a word",
+                                                   "3 error: Pagination is not supported for this sort field",
+                                                   "4 error: Cursor does not match the requested sort"])
+        counts, _ = self.batch("add Second\nsearch '!!'\n", atomic=True)
+        self.assertEqual(counts, (1, 1, True))
+        self.assertEqual(self.saved_titles(), ['First'])
+
+    def test_atomic_failure_rolls_everything_back(self):
+        counts, output = self.batch("add First\nadd Second\nedit 99 --title Missing\nadd Never\n", atomic=True)
+        self.assertEqual(counts, (2, 1, True))
+        self.assertNotIn("Never", output)
+        self.assertEqual(self.saved_titles(), [])
+        counts, _ = self.batch("add First\nadd Second\n", atomic=True)
+        self.assertEqual(counts, (2, 0, False))
+        self.assertEqual(self.saved_titles(), ['First', 'Second'])
+
+    def test_commit_interval_keeps_finished_groups(self):
+        def lines():
+            yield "add One\n"
+            yield "add Two\n"
+            yield "add Three\n"
+            raise KeyboardInterrupt
+        with self.assertRaises(KeyboardInterrupt):
+            run_batch(lines(), commit_every=2, out=io.StringIO())
+        self.assertEqual(self.saved_titles(), ['One', 'Two'])
+
+    def test_failed_line_leaves_no_partial_writes(self):
+        # The third chunk of the import hits a field over the csv module's size limit after two
+        # chunks were inserted
+        path = 'test_batch_import.csv'
+        with open(path, 'w') as f:
+            f.write('title,description\n' + ''.join(f'Imported {n},\n' for n in range(4)) + 'Huge,' + 'x' * 200000 + '\n')
+        try:
+            counts, output = self.batch(f"import {path} --batch-size 2\nadd Kept\nimport {path} --batch-size 2\n")
+        finally:
+            os.remove(path)
+        self.assertEqual(counts, (1, 2, False))
+        self.assertIn("3 error: Error:", output)
+        self.assertEqual(self.saved_titles(), ['Kept'])
+
+if __name__ == '__main__':
+    unittest.main()
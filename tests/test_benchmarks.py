@@ -0,0 +1,49 @@
+import unittest
+import os
+import random
+from datetime import date
+from todo_app.benchmarks import bench_contention, dataset
+from todo_app.benchmarks.suite import compare
+from todo_app.database.db import set_db_path, initialize_database, close_connection, get_connection
+
+def run(results, users=10):
+    return {'meta': {'users': users, 'tasks_per_user': 100, 'seed': 1},
+            'results': {name: {'median_ms': ms} for name, ms in results.items()}}
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_dataset_rows_are_reproducible(self):
+        today = date(2024, 6, 1)
+        first = list(dataset.task_rows(random.Random(5), 200, today))
+        self.assertEqual(first, list(dataset.task_rows(random.Random(5), 200, today)))
+        self.assertEqual({row[4] for row in first}, {'pending', 'completed'})
+        self.assertEqual({row[2] for row in first}, {'low', 'medium', 'high'})
+        self.assertTrue(any(row[3] and row[3] < '2024-06-01' for row in first))
+
+    def test_generate_fills_every_user(self):
+        set_db_path('test_todo.db')
+        try:
+            initialize_database()
+            users = dataset.generate(3, 20, seed=2)
+            counts = get_connection().execute("SELECT user_id, COUNT(*) FROM tasks GROUP BY user_id").fetchall()
+            self.assertEqual(counts, [(user.id, 20) for user in users])
+        finally:
+            close_connection()
+            os.remove('test_todo.db')
+
+    def test_compare_flags_only_real_slowdowns(self):
+        baseline = run({'list': 1.0, 'tiny': 0.01, 'login': 200.0})
+        current = run({'list': 1.5, 'tiny': 0.03, 'login': 210.0, 'new': 1.0})
+        self.assertEqual(compare(current, baseline, 0.25), ['list'])
+
+    def test_compare_refuses_a_different_dataset(self):
+        with self.assertRaises(ValueError):
+            compare(run({}, users=5), run({}), 0.25)
+
+    def test_concurrent_writers_do_not_fail(self):
+        result = bench_contention.run(16, 20, bench_contention.CONFIGS['wal+retry'])
+        self.assertEqual(result['errors'], {})
+        self.assertEqual(result['writes'], result['attempted'])
+        self.assertGreater(result['writes_per_s'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
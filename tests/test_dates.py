@@ -0,0 +1,29 @@
+import unittest
+from datetime import date
+from todo_app.utils import dates
+
+class TestDates(unittest.TestCase):
+    def tearDown(self):
+        dates.reset_today()
+
+    def test_parse_date_is_strict(self):
+        self.assertEqual(dates.parse_date('2024-02-29'), date(2024, 2, 29))
+        for value in ['2023-02-29', '2024-1-01', '20240101', '2024-W01-1', 'tomorrow', '', None]:
+            self.assertIsNone(dates.parse_date(value), value)
+
+    def test_classify_due_against_pinned_today(self):
+        dates.reset_today(date(2024, 3, 10))
+        self.assertEqual(dates.classify_due('2024-03-09'), dates.OVERDUE)
+        self.assertEqual(dates.classify_due('2024-03-10'), dates.DUE_TODAY)
+        self.assertEqual(dates.classify_due('2024-03-11'), dates.DUE_SOON)
+        self.assertIsNone(dates.classify_due('2024-03-12'))
+        self.assertIsNone(dates.classify_due('not a date'))
+
+    def test_today_is_a_snapshot_until_reset(self):
+        dates.reset_today(date(2000, 1, 1))
+        self.assertEqual(dates.today(), date(2000, 1, 1))
+        dates.reset_today()
+        self.assertEqual(dates.today(), date.today())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import os
+import sqlite3
+import threading
+from unittest import mock
+from todo_app.database import db
+from todo_app.database.db import set_db_path, initialize_database, close_connection, get_connection, connection
+from todo_app.models.task_model import Task
+from todo_app.models.user_model import User
+
+class TestConnectionManager(unittest.TestCase):
+    def setUp(self):
+        self.test_db = 'test_todo.db'
+        set_db_path(self.test_db)
+        initialize_database()
+
+    def tearDown(self):
+        close_connection()
+        if os.path.exists(self.test_db):
+            os.remove(self.test_db)
+
+    def test_connection_is_reused(self):
+        with connection() as first:
+            pass
+        with connection() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertIs(get_connection(), first)
+
+    def test_connection_is_per_thread(self):
+        other = []
+        thread = threading.Thread(target=lambda: (other.append(get_connection()), close_connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], get_connection())
+
+    def test_nested_blocks_share_one_transaction(self):
+        with self.assertRaises(RuntimeError):
+            with connection() as conn:
+                conn.execute("INSERT INTO users (username, password_hash) VALUES ('outer', 'x')")
+                with connection() as inner:
+                    inner.execute("INSERT INTO users (username, password_hash) VALUES ('inner', 'x')")
+                raise RuntimeError("abort")
+        with connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_set_db_path_reopens_connection(self):
+        before = get_connection()
+        set_db_path(self.test_db)
+        self.assertIsNot(get_connection(), before)
+
+class TestWriteContention(unittest.TestCase):
+    def setUp(self):
+        self.test_db = 'test_todo.db'
+        set_db_path(self.test_db)
+        initialize_database()
+        self.user = User.create_user('writer', 'x')
+
+    def tearDown(self):
+        close_connection()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.test_db + suffix):
+                os.remove(self.test_db + suffix)
+
+    def test_database_uses_wal(self):
+        self.assertEqual(get_connection().execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+
+    def test_lock_errors_are_transient(self):
+        self.assertTrue(db.is_transient(sqlite3.OperationalError("database is locked")))
+        self.assertFalse(db.is_transient(sqlite3.OperationalError("no such table: tasks")))
+        self.assertFalse(db.is_transient(sqlite3.IntegrityError("UNIQUE constraint failed: users.username")))
+
+    def test_write_waits_for_another_process_lock(self):
+        # A second connection holds the write lock for longer than the busy timeout; the retries
+        # outlast it
+        other = sqlite3.connect(self.test_db, isolation_level=None, check_same_thread=False)
+        other.execute("BEGIN IMMEDIATE")
+        release = threading.Timer(0.3, other.rollback)
+        with mock.patch.object(db, 'BUSY_TIMEOUT', 0.01), mock.patch.object(db, 'WRITE_RETRIES', 20):
+            set_db_path(self.test_db)
+            release.start()
+            task = Task.create_task(self.user.id, 'Queued')
+        release.join()
+        other.close()
+        self.assertEqual(Task.find_by_id(task.id).title, 'Queued')
+
+    def test_gives_up_after_the_retries(self):
+        calls = []
+        def locked():
+            calls.append(1)
+            raise sqlite3.OperationalError("database is locked")
+        with mock.patch.object(db, 'WRITE_RETRIES', 2), mock.patch.object(db, 'RETRY_DELAY', 0):
+            with self.assertRaises(db.DatabaseBusy):
+                db.retry_on_busy(locked)()
+        self.assertEqual(len(calls), 3)
+
+    def test_other_errors_are_not_retried(self):
+        calls = []
+        def broken():
+            calls.append(1)
+            raise sqlite3.OperationalError("no such table: tasks")
+        with self.assertRaises(sqlite3.OperationalError):
+            db.retry_on_busy(broken)()
+        self.assertEqual(len(calls), 1)
+
+    def test_no_retry_inside_an_outer_transaction(self):
+        calls = []
+        def locked():
+            calls.append(1)
+            raise sqlite3.OperationalError("database is locked")
+        with self.assertRaises(sqlite3.OperationalError):
+            with connection():
+                db.retry_on_busy(locked)()
+        self.assertEqual(len(calls), 1)
+
+if __name__ == '__main__':
+    unittest.main()
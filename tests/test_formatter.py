@@ -0,0 +1,76 @@
+import unittest
+import io
+import json
+from todo_app.models.task_model import Task
+from todo_app.utils.formatter import (format_task_list, write_task_list, write_tasks, write_task, parse_columns,
+                                      palette, PLAIN, MAX_CELL_WIDTH)
+
+class TestFormatter(unittest.TestCase):
+    def make_tasks(self, count):
+        return [Task(i, 1, f'Task {i}', None, 'medium', None, 'pending', '2024-01-01', '2024-01-01') for i in range(count)]
+
+    def render(self, tasks, fmt, columns=None):
+        out = io.StringIO()
+        count = write_tasks(iter(tasks), fmt, columns, out)
+        return count, out.getvalue()
+
+    def test_write_task_list_matches_format_task_list(self):
+        tasks = self.make_tasks(3)
+        out = io.StringIO()
+        self.assertEqual(write_task_list(iter(tasks), out), 3)
+        self.assertEqual(out.getvalue(), format_task_list(tasks) + '\n')
+
+    def test_write_task_list_empty(self):
+        out = io.StringIO()
+        self.assertEqual(write_task_list(iter([]), out), 0)
+        self.assertEqual(out.getvalue(), '')
+
+    def test_no_color_codes_when_not_a_tty(self):
+        self.assertIs(palette(io.StringIO()), PLAIN)
+        self.assertNotIn('\x1b', self.render(self.make_tasks(2), 'cards')[1])
+
+    def test_json_and_jsonl(self):
+        tasks = self.make_tasks(3)
+        count, text = self.render(tasks, 'json', ['id', 'title'])
+        self.assertEqual(count, 3)
+        self.assertEqual(json.loads(text), [{'id': i, 'title': f'Task {i}'} for i in range(3)])
+        self.assertEqual(self.render([], 'json'), (0, '[]\n'))
+        count, text = self.render(tasks, 'jsonl')
+        rows = [json.loads(line) for line in text.splitlines()]
+        self.assertEqual([row['id'] for row in rows], [0, 1, 2])
+        self.assertIsNone(rows[0]['due_date'])
+
+    def test_single_task_json_is_an_object(self):
+        out = io.StringIO()
+        write_task(self.make_tasks(1)[0], 'json', ['id', 'status'], out)
+        self.assertEqual(json.loads(out.getvalue()), {'id': 0, 'status': 'pending'})
+
+    def test_tsv_escapes_separators(self):
+        task = Task(7, 1, 'Tab\there', 'line one\nline two\\', 'high', None, 'pending', '2024-01-01', '2024-01-01')
+        _, text = self.render([task], 'tsv', ['id', 'title', 'description', 'due_date'])
+        self.assertEqual(text, "id\ttitle\tdescription\tdue_date\n7\tTab\\there\tline one\\nline two\\\\\t\n")
+
+    def test_table_widths_fit_the_widest_cell(self):
+        tasks = self.make_tasks(2)
+        tasks[1].title = 'A much longer title'
+        tasks.append(Task(99, 1, 'x' * 100, None, 'low', '2024-02-01', 'pending', '2024-01-01', '2024-01-01'))
+        count, text = self.render(tasks, 'table')
+        lines = text.splitlines()
+        self.assertEqual(count, 3)
+        self.assertEqual(lines[0].split(), ['ID', 'TITLE', 'PRIORITY', 'DUE_DATE', 'STATUS'])
+        self.assertEqual(len(lines), 5)
+        title_start = lines[0].index('TITLE')
+        self.assertEqual(lines[2][title_start:].split('  ')[0], 'Task 0')
+        self.assertEqual(lines[1].split()[1], '-' * MAX_CELL_WIDTH)
+        self.assertIn('x' * (MAX_CELL_WIDTH - 1) + '…', lines[4])
+        self.assertEqual(self.render([], 'table'), (0, ''))
+
+    def test_parse_columns(self):
+        self.assertEqual(parse_columns('id, title,due_date'), ['id', 'title', 'due_date'])
+        with self.assertRaises(ValueError):
+            parse_columns('id,owner')
+        with self.assertRaises(ValueError):
+            parse_columns(',')
+
+if __name__ == '__main__':
+    unittest.main()
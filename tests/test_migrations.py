@@ -0,0 +1,149 @@
+import unittest
+import os
+import sqlite3
+import threading
+from datetime import date
+from unittest import mock
+from todo_app.database import db
+from todo_app.database.db import set_db_path, initialize_database, close_connection, get_connection, load_migrations, migrate
+from todo_app.models.stats_model import TaskStats
+from todo_app.models.task_model import Task, TaskQuery
+from todo_app.models.user_model import User
+from todo_app.tests.helpers import capture_queries, query_plan
+
+LEGACY_SCHEMA = """
+CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL, password_hash TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL, title TEXT NOT NULL, description TEXT,
+    priority TEXT CHECK(priority IN ('low', 'medium', 'high')), due_date DATE,
+    status TEXT CHECK(status IN ('pending', 'completed')) DEFAULT 'pending',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id));
+INSERT INTO users (username, password_hash) VALUES ('legacy', 'x');
+INSERT INTO tasks (user_id, title, priority, due_date) VALUES (1, 'Old task', 'high', '2024-01-01');
+"""
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        self.test_db = 'test_todo.db'
+        set_db_path(self.test_db)
+
+    def tearDown(self):
+        close_connection()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.test_db + suffix):
+                os.remove(self.test_db + suffix)
+
+    def latest_version(self):
+        return load_migrations()[-1][0]
+
+    def schema_version(self):
+        return get_connection().execute("SELECT MAX(version) FROM schema_version").fetchone()[0]
+
+    def test_fresh_database_reaches_latest_version(self):
+        applied = initialize_database()
+        self.assertEqual(applied, [number for number, _ in load_migrations()])
+        self.assertEqual(self.schema_version(), self.latest_version())
+
+    def test_initialize_is_idempotent(self):
+        initialize_database()
+        self.assertEqual(initialize_database(), [])
+
+    def test_legacy_database_is_upgraded_in_place(self):
+        conn = sqlite3.connect(self.test_db)
+        conn.executescript(LEGACY_SCHEMA)
+        conn.close()
+        initialize_database()
+        self.assertEqual(self.schema_version(), self.latest_version())
+        tasks = Task.find_by_user_id(1)
+        self.assertEqual([task.title for task in tasks], ['Old task'])
+        indexes = {row[0] for row in get_connection().execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn('idx_tasks_user_status_due', indexes)
+        self.assertIn('idx_tasks_user_updated', indexes)
+        self.assertEqual([task.title for task in Task.search(TaskQuery(1), 'old')], ['Old task'])
+        self.assertEqual(TaskStats.check(1), [])
+        self.assertEqual(TaskStats.load(1, date(2024, 1, 2)).overdue, 1)
+
+    def test_migrate_to_target(self):
+        self.assertEqual(migrate(target=1), [1])
+        self.assertEqual(self.schema_version(), 1)
+
+    def test_database_at_version_9_gets_the_archive_template_link(self):
+        migrate(target=9)
+        initialize_database()
+        columns = [row[1] for row in get_connection().execute("PRAGMA table_info(archive)")]
+        self.assertIn('template_id', columns)
+
+    def test_version_is_read_again_under_the_lock(self):
+        # Another process finished the migrations after this one read the version
+        initialize_database()
+        with mock.patch.object(db, 'get_schema_version', return_value=0):
+            self.assertEqual(migrate(), [])
+        self.assertEqual(get_connection().execute("SELECT COUNT(*) FROM schema_version").fetchone()[0], len(load_migrations()))
+
+    def test_concurrent_initialize_applies_each_migration_once(self):
+        applied, errors = [], []
+        def initialize():
+            try:
+                applied.extend(initialize_database())
+            except sqlite3.Error as e:
+                errors.append(e)
+            finally:
+                close_connection()
+        threads = [threading.Thread(target=initialize) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(applied), [number for number, _ in load_migrations()])
+        self.assertEqual(self.schema_version(), self.latest_version())
+
+class TestQueryPlans(unittest.TestCase):
+    def setUp(self):
+        self.test_db = 'test_todo.db'
+        set_db_path(self.test_db)
+        initialize_database()
+        self.user = User.create_user('planner', 'x')
+        get_connection().execute("ANALYZE")
+
+    def tearDown(self):
+        close_connection()
+        if os.path.exists(self.test_db):
+            os.remove(self.test_db)
+
+    def assertIndexed(self, fn, *args, **kwargs):
+        selects = [sql for sql in capture_queries(fn, *args, **kwargs) if sql.lstrip().upper().startswith('SELECT')]
+        self.assertTrue(selects)
+        for sql in selects:
+            plan = query_plan(sql)
+            self.assertNotIn('SCAN tasks', plan, sql)
+            self.assertIn('USING', plan, sql)
+
+    def test_pending_tasks_use_status_index(self):
+        self.assertIndexed(Task.find_by_user_id, self.user.id, status='pending')
+
+    def test_updated_at_order_uses_index(self):
+        self.assertIndexed(Task.find_by_user_id, self.user.id, sort_by='updated_at')
+
+    def test_overdue_filter_is_an_index_range(self):
+        query = TaskQuery(self.user.id, show_completed=False, show_pending=False, show_overdue=True, sort_by='due_date')
+        plan = '\n'.join(query_plan(sql) for sql in capture_queries(Task.find, query))
+        self.assertIn('idx_tasks_user_status_due (user_id=? AND status=? AND due_date<?)', plan)
+
+    def test_keyset_pages_seek_the_sort_index(self):
+        for sort_by in ['created_at', 'updated_at', 'due_date', 'priority']:
+            query = TaskQuery(self.user.id, show_completed=False, sort_by=sort_by)
+            for sql, params in query.select_page(after=('2030-01-01', 10)):
+                plan = get_connection().execute(f"EXPLAIN QUERY PLAN {sql}", params + [20]).fetchall()
+                plan = ' | '.join(row[3] for row in plan)
+                self.assertNotIn('TEMP B-TREE', plan, sql)
+                self.assertIn('USING INDEX', plan, sql)
+
+    def test_search_starts_from_the_full_text_index(self):
+        sql, params = TaskQuery(self.user.id, priority='high').select_search('report')
+        plan = get_connection().execute(f"EXPLAIN QUERY PLAN {sql}", params + [20]).fetchall()
+        self.assertIn('VIRTUAL TABLE INDEX', plan[0][3])
+        self.assertIn('INTEGER PRIMARY KEY', ' | '.join(row[3] for row in plan))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import io
+import json
+import os
+import pstats
+import sys
+import tempfile
+from contextlib import redirect_stdout, redirect_stderr
+from todo_app import cli
+from todo_app.controllers.auth import logout
+from todo_app.database import db
+from todo_app.database.db import set_db_path, initialize_database, close_connection
+from todo_app.utils import profiler
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.test_db = 'test_todo.db'
+        set_db_path(self.test_db)
+        initialize_database()
+        logout()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp.name, 'profile.jsonl')
+
+    def tearDown(self):
+        profiler.disable()
+        logout()
+        close_connection()
+        self.tmp.cleanup()
+        if os.path.exists(self.test_db):
+            os.remove(self.test_db)
+
+    def run_script(self, script):
+        stdin = sys.stdin
+        sys.stdin = io.StringIO(script)
+        try:
+            with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+                cli.run_shell()
+        finally:
+            sys.stdin = stdin
+
+    def read_records(self):
+        with open(self.output) as f:
+            return [json.loads(line) for line in f]
+
+    def test_records_commands_queries_and_controllers(self):
+        profiler.enable(self.output)
+        self.run_script("signup alice\npw\nlogin alice\npw\nadd First\nadd Second\nlist\n")
+        records = self.read_records()
+        commands = [r for r in records if r['type'] == 'command']
+        self.assertEqual([r['command'] for r in commands], ['signup', 'login', 'add', 'add', 'list'])
+        listed = commands[-1]
+        self.assertGreater(listed['ms'], 0)
+        self.assertGreaterEqual(listed['queries'], 1)
+        self.assertGreaterEqual(listed['statements'], listed['queries'])
+        self.assertEqual(listed['rows'], 2)
+        self.assertNotIn('profile', listed['options'])
+        list_queries = [r for r in records if r['type'] == 'query' and r['command'] == 'list']
+        self.assertTrue(any(r['rows'] == 2 and r['sql'].startswith('SELECT') for r in list_queries))
+        controllers = [r for r in records if r['type'] == 'controller' and r['command'] == 'list']
+        self.assertIn('tasks.iter_tasks', [r['name'] for r in controllers if r['depth'] == 0])
+        self.assertAlmostEqual(listed['controller_ms'], sum(r['ms'] for r in controllers if r['depth'] == 0), places=2)
+
+    def test_disable_restores_uninstrumented_code(self):
+        from todo_app.controllers import tasks
+        list_tasks = tasks.list_tasks
+        handle_command = cli.handle_command
+        profiler.enable(self.output)
+        self.assertIsInstance(db.get_connection(), profiler.TracedConnection)
+        self.assertIsNot(tasks.list_tasks, list_tasks)
+        profiler.disable()
+        self.assertIs(tasks.list_tasks, list_tasks)
+        self.assertIs(cli.handle_command, handle_command)
+        self.assertNotIsInstance(db.get_connection(), profiler.TracedConnection)
+
+    def test_cprofile_dump(self):
+        path = os.path.join(self.tmp.name, 'run.prof')
+        profiler.enable(None, path)
+        self.run_script("signup bob\npw\n")
+        profiler.finish()
+        self.assertGreater(pstats.Stats(path).total_calls, 0)
+        self.assertFalse(os.path.exists(self.output))
+
+    def test_settings_from_environment(self):
+        environ = dict(os.environ)
+        try:
+            os.environ['TODO_PROFILE'] = '1'
+            os.environ['TODO_CPROFILE'] = 'run.prof'
+            self.assertEqual(profiler.settings(), ('profile.jsonl', 'run.prof'))
+            self.assertEqual(profiler.settings('out.jsonl'), ('out.jsonl', 'run.prof'))
+            os.environ['TODO_PROFILE'] = '0'
+            del os.environ['TODO_CPROFILE']
+            self.assertEqual(profiler.settings(), (None, None))
+        finally:
+            os.environ.clear()
+            os.environ.update(environ)
+
+if __name__ == '__main__':
+    unittest.main()
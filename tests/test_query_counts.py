@@ -0,0 +1,54 @@
+import unittest
+import os
+from todo_app.controllers import auth
+from todo_app.controllers.tasks import add_task, edit_task, delete_task, view_task, mark_done, reopen, list_tasks
+from todo_app.database.db import set_db_path, initialize_database, close_connection
+from todo_app.models.user_model import User
+from todo_app.tests.helpers import capture_queries
+
+class TestWriteQueryCounts(unittest.TestCase):
+    def setUp(self):
+        self.test_db = 'test_todo.db'
+        set_db_path(self.test_db)
+        initialize_database()
+        self.owner = User.create_user('owner', 'x')
+        self.other = User.create_user('other', 'x')
+        auth.current_user = self.other
+        add_task('Not yours')
+        self.foreign_id = list_tasks()[0].id
+        auth.current_user = self.owner
+        add_task('Task')
+        self.task_id = list_tasks()[0].id
+
+    def tearDown(self):
+        auth.current_user = None
+        close_connection()
+        if os.path.exists(self.test_db):
+            os.remove(self.test_db)
+
+    def assertQueries(self, expected, fn, *args, **kwargs):
+        queries = capture_queries(fn, *args, **kwargs)
+        self.assertEqual(len(queries), expected, queries)
+
+    def test_each_write_is_one_statement(self):
+        self.assertQueries(1, edit_task, self.task_id, title='Renamed')
+        self.assertQueries(1, mark_done, self.task_id)
+        self.assertQueries(1, reopen, self.task_id)
+        self.assertQueries(1, view_task, self.task_id)
+        self.assertQueries(1, delete_task, self.task_id)
+
+    def test_failed_writes_tell_missing_from_denied(self):
+        self.assertEqual(edit_task(self.foreign_id, title='Mine now'), "Access denied")
+        self.assertEqual(mark_done(999), "Task not found")
+        self.assertEqual(delete_task(self.foreign_id), "Access denied")
+        self.assertIsNone(view_task(self.foreign_id))
+        auth.current_user = self.other
+        self.assertEqual(list_tasks()[0].title, 'Not yours')
+
+    def test_edit_returns_updated_row(self):
+        self.assertEqual(edit_task(self.task_id, priority='high'), "Task updated successfully")
+        self.assertEqual(view_task(self.task_id).priority, 'high')
+        self.assertEqual(edit_task(self.task_id), "Nothing to update")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import unittest
+import os
+from datetime import date, timedelta
+from todo_app.controllers import auth
+from todo_app.controllers.tasks import (add_task, list_tasks, mark_done, mark_done_many, get_reminders, list_recurring,
+                                        stop_recurring, archive_tasks, unarchive_tasks)
+from todo_app.database.db import set_db_path, initialize_database, close_connection, get_connection
+from todo_app.models.recurrence_model import Recurrence, HORIZON_DAYS
+from todo_app.models.reminder_model import Reminder
+from todo_app.models.user_model import User
+from todo_app.tests.helpers import capture_queries
+from todo_app.utils import dates, recurrence
+
+class TestRecurrenceRules(unittest.TestCase):
+    def test_monthly_keeps_the_start_day(self):
+        start = date(2024, 1, 31)
+        days = [recurrence.occurrence(start, 'monthly', 1, n) for n in range(4)]
+        self.assertEqual(days, [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)])
+        self.assertEqual(recurrence.index_on_or_after(start, 'monthly', 1, date(2024, 3, 1)), 2)
+
+    def test_window_collapses_missed_occurrences(self):
+        start = date(2020, 1, 1)
+        today = date(2024, 6, 12)
+        due, following = recurrence.window(start, 'daily', 1, None, start, today + timedelta(days=2), today)
+        self.assertEqual(due, [date(2024, 6, 11), date(2024, 6, 12), date(2024, 6, 13), date(2024, 6, 14)])
+        self.assertEqual(following, date(2024, 6, 15))
+
+    def test_window_stops_at_the_end_date(self):
+        start = date(2024, 6, 3)
+        due, following = recurrence.window(start, 'weekly', 2, date(2024, 7, 1), start, date(2024, 12, 31), start)
+        self.assertEqual(due, [date(2024, 6, 3), date(2024, 6, 17), date(2024, 7, 1)])
+        self.assertIsNone(following)
+
+    def test_window_keeps_the_last_occurrence_of_an_ended_rule(self):
+        start = date(2030, 6, 3)
+        due, following = recurrence.window(start, 'weekly', 1, date(2030, 6, 12), start, date(2030, 6, 27), date(2030, 6, 20))
+        self.assertEqual(due, [date(2030, 6, 10)])
+        self.assertIsNone(following)
+
+class TestRecurringTasks(unittest.TestCase):
+    def setUp(self):
+        self.test_db = 'test_todo.db'
+        set_db_path(self.test_db)
+        initialize_database()
+        self.user = User.create_user('owner', 'x')
+        auth.current_user = self.user
+        self.today = date(2030, 6, 15)
+        dates.reset_today(self.today)
+
+    def tearDown(self):
+        dates.reset_today()
+        auth.current_user = None
+        close_connection()
+        if os.path.exists(self.test_db):
+            os.remove(self.test_db)
+
+    def day(self, offset):
+        return str(self.today + timedelta(days=offset))
+
+    def occurrences(self):
+        return [row[0] for row in get_connection().execute(
+            "SELECT due_date FROM tasks WHERE template_id IS NOT NULL ORDER BY due_date")]
+
+    def test_adding_a_rule_creates_no_tasks(self):
+        self.assertEqual(add_task('Report', repeat='weekly', due_date=self.day(0)), f"Recurring task added (weekly, from {self.day(0)})")
+        self.assertEqual(self.occurrences(), [])
+        self.assertEqual([template.title for template in list_recurring()], ['Report'])
+
+    def test_reminders_materialize_only_through_today(self):
+        add_task('Standup', repeat='daily', due_date=self.day(-400))
+        reminders = get_reminders()
+        self.assertEqual([task.due_date for task in reminders], [self.day(-1), self.day(0)])
+        self.assertEqual(self.occurrences(), [self.day(-1), self.day(0)])
+        # Covered now: the next check reads the summary, then the tasks due by today
+        queries = capture_queries(get_reminders)
+        self.assertEqual(len(queries), 2, queries)
+        self.assertIn('reminder_summary', queries[0])
+
+    def test_list_window_follows_the_filters(self):
+        add_task('Water plants', repeat='interval', every=3, due_date=self.day(0))
+        list_tasks(show_pending=False, show_due_soon=True)
+        self.assertEqual(self.occurrences(), [self.day(0)])
+        tasks = list_tasks()
+        self.assertEqual([task.due_date for task in tasks], [self.day(n) for n in range(0, HORIZON_DAYS + 1, 3)])
+        list_tasks()
+        self.assertEqual(len(self.occurrences()), len(tasks))
+
+    def test_completing_an_occurrence_creates_the_next(self):
+        add_task('Rent', repeat='monthly', due_date=self.day(0))
+        first = get_reminders()[0]
+        mark_done(first.id)
+        self.assertEqual(self.occurrences(), [self.day(0), '2030-07-15'])
+        self.assertEqual(Reminder.summary(self.user.id), ('2030-07-15', '2030-08-15'))
+
+    def test_bulk_done_advances_every_template(self):
+        add_task('A', repeat='weekly', due_date=self.day(0))
+        add_task('B', repeat='daily', due_date=self.day(0), until=self.day(1))
+        get_reminders()
+        self.assertEqual(mark_done_many(show_pending=True), "2 tasks marked as done")
+        self.assertEqual(self.occurrences(), [self.day(0), self.day(0), self.day(1), self.day(7)])
+
+    def test_rule_end_stops_occurrences(self):
+        add_task('Trial', repeat='daily', due_date=self.day(0), until=self.day(1))
+        list_tasks()
+        self.assertEqual(self.occurrences(), [self.day(0), self.day(1)])
+        self.assertIsNone(list_recurring()[0].next_date)
+
+    def test_rule_that_ended_unseen_still_shows_its_last_occurrence(self):
+        # Weekly from day -17 until day -8: the occurrence before today (day -3) is past the end
+        add_task('Trial', repeat='weekly', due_date=self.day(-17), until=self.day(-8))
+        self.assertEqual([task.due_date for task in get_reminders()], [self.day(-10)])
+        self.assertEqual([task.due_date for task in list_tasks()], [self.day(-10)])
+        self.assertIsNone(list_recurring()[0].next_date)
+
+    def test_materializing_twice_does_not_duplicate(self):
+        add_task('Report', repeat='weekly', due_date=self.day(0))
+        stale = list_recurring()[0]
+        Recurrence.materialize(self.user.id, self.today)
+        self.assertEqual(stale._materialize(get_connection(), self.today), 0)
+        self.assertEqual(self.occurrences(), [self.day(0)])
+
+    def test_stop_keeps_existing_occurrences(self):
+        add_task('Report', repeat='weekly', due_date=self.day(0))
+        template_id = list_recurring()[0].id
+        get_reminders()
+        self.assertEqual(stop_recurring(template_id), "Recurrence stopped")
+        self.assertEqual(stop_recurring(template_id), "Recurring task not found")
+        self.assertEqual([task.title for task in list_tasks()], ['Report'])
+        self.assertEqual(Reminder.summary(self.user.id), (self.day(0), None))
+
+    def test_archived_occurrences_keep_their_template(self):
+        add_task('Rent', repeat='monthly', due_date=self.day(0))
+        template_id = list_recurring()[0].id
+        first = get_reminders()[0]
+        mark_done(first.id)
+        archive_tasks([first.id])
+        conn = get_connection()
+        self.assertEqual(conn.execute("SELECT template_id FROM archive WHERE id = ?", (first.id,)).fetchone()[0], template_id)
+        self.assertEqual(unarchive_tasks([first.id]), "1 task restored")
+        self.assertEqual(conn.execute("SELECT template_id FROM tasks WHERE id = ?", (first.id,)).fetchone()[0], template_id)
+
+    def test_invalid_rules_are_rejected(self):
+        self.assertEqual(add_task('X', repeat='yearly'), "Invalid frequency")
+        self.assertEqual(add_task('X', repeat='interval'), "Invalid interval: use --every N (days) with --repeat interval")
+        self.assertEqual(add_task('X', repeat='daily', due_date=self.day(0), until=self.day(-1)), "Invalid end date: before the start date")
+
+if __name__ == '__main__':
+    unittest.main()
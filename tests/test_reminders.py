@@ -1,6 +1,13 @@
 import unittest
-from datetime import date
+import os
+from datetime import date, timedelta
+from todo_app.controllers import auth
+from todo_app.controllers.tasks import add_task, edit_task, delete_task, mark_done, reopen, get_reminders, list_tasks
+from todo_app.database.db import set_db_path, initialize_database, close_connection
+from todo_app.models.reminder_model import Reminder
 from todo_app.models.task_model import Task
+from todo_app.models.user_model import User
+from todo_app.tests.helpers import capture_queries
 from todo_app.utils.notifications import check_reminders
 
 class TestReminders(unittest.TestCase):
@@ -8,7 +15,7 @@ class TestReminders(unittest.TestCase):
         # Create mock tasks
         task_overdue = Task(1, 1, 'Overdue Task', None, 'medium', '2023-01-01', 'pending', None, None)
         task_today = Task(2, 1, 'Today Task', None, 'medium', str(date.today()), 'pending', None, None)
-        task_future = Task(3, 1, 'Future Task', None, 'medium', '2025-12-31', 'pending', None, None)
+        task_future = Task(3, 1, 'Future Task', None, 'medium', str(date.today() + timedelta(days=30)), 'pending', None, None)
         task_completed = Task(4, 1, 'Completed Task', None, 'medium', '2023-01-01', 'completed', None, None)
 
         tasks = [task_overdue, task_today, task_future, task_completed]
@@ -19,5 +26,68 @@ class TestReminders(unittest.TestCase):
         self.assertEqual(len(result['due_today']), 1)
         self.assertEqual(result['due_today'][0].title, 'Today Task')
 
+class TestReminderSummary(unittest.TestCase):
+    def setUp(self):
+        self.test_db = 'test_todo.db'
+        set_db_path(self.test_db)
+        initialize_database()
+        self.user = User.create_user('owner', 'x')
+        auth.current_user = self.user
+        self.today = date.today()
+
+    def tearDown(self):
+        auth.current_user = None
+        close_connection()
+        if os.path.exists(self.test_db):
+            os.remove(self.test_db)
+
+    def day(self, offset):
+        return str(self.today + timedelta(days=offset))
+
+    def add(self, title, offset):
+        add_task(title, due_date=self.day(offset))
+        return next(task.id for task in list_tasks() if task.title == title)
+
+    def test_summary_tracks_earliest_pending_due_date(self):
+        self.assertIsNone(Reminder.next_due(self.user.id))
+        later = self.add('Later', 5)
+        soon = self.add('Soon', 2)
+        self.assertEqual(Reminder.next_due(self.user.id), self.day(2))
+        mark_done(soon)
+        self.assertEqual(Reminder.next_due(self.user.id), self.day(5))
+        reopen(soon)
+        self.assertEqual(Reminder.next_due(self.user.id), self.day(2))
+        edit_task(later, due_date=self.day(1))
+        self.assertEqual(Reminder.next_due(self.user.id), self.day(1))
+        delete_task(later)
+        self.assertEqual(Reminder.next_due(self.user.id), self.day(2))
+        delete_task(soon)
+        self.assertIsNone(Reminder.next_due(self.user.id))
+
+    def test_nothing_due_is_one_lookup(self):
+        Task.bulk_create(self.user.id, [(f'Task {i}', None, 'medium', self.day(3), 'pending') for i in range(200)])
+        self.assertEqual(get_reminders(), [])
+        queries = capture_queries(get_reminders)
+        self.assertEqual(len(queries), 1, queries)
+        self.assertIn('reminder_summary', queries[0])
+
+    def test_due_tasks_are_fetched_when_summary_says_so(self):
+        self.add('Future', 3)
+        self.add('Today', 0)
+        self.add('Overdue', -2)
+        done = self.add('Done', -1)
+        mark_done(done)
+        reminders = get_reminders()
+        self.assertEqual([task.title for task in reminders], ['Overdue', 'Today'])
+        notifs = check_reminders(reminders)
+        self.assertEqual([task.title for task in notifs['overdue']], ['Overdue'])
+        self.assertEqual([task.title for task in notifs['due_today']], ['Today'])
+
+    def test_summaries_are_per_user(self):
+        other = User.create_user('other', 'x')
+        Task.create_task(other.id, 'Theirs', due_date=self.day(-1))
+        self.assertEqual(get_reminders(), [])
+        self.assertEqual(Reminder.next_due(other.id), self.day(-1))
+
 if __name__ == '__main__':
     unittest.main()
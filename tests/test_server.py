@@ -0,0 +1,116 @@
+import unittest
+import os
+import json
+import threading
+from http.client import HTTPConnection
+from todo_app.controllers import auth
+from todo_app.database.db import set_db_path, initialize_database, close_connection
+from todo_app.server import create_server
+
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        self.test_db = 'test_todo.db'
+        set_db_path(self.test_db)
+        initialize_database()
+        self.server = create_server(port=0, workers=4)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        close_connection()
+        if os.path.exists(self.test_db):
+            os.remove(self.test_db)
+
+    def request(self, method, path, body=None, token=None):
+        conn = HTTPConnection('127.0.0.1', self.server.server_address[1], timeout=10)
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        conn.request(method, path, json.dumps(body) if body is not None else None, headers)
+        response = conn.getresponse()
+        payload = json.loads(response.read())
+        conn.close()
+        return response.status, payload
+
+    def login(self, username):
+        self.assertEqual(self.request('POST', '/signup', {'username': username, 'password': 'pw'})[0], 201)
+        status, payload = self.request('POST', '/login', {'username': username, 'password': 'pw'})
+        self.assertEqual(status, 200)
+        return payload['token']
+
+    def test_task_lifecycle(self):
+        token = self.login('alice')
+        status, task = self.request('POST', '/tasks', {'title': 'Write report', 'priority': 'high'}, token)
+        self.assertEqual(status, 201)
+        self.assertEqual(self.request('PATCH', f"/tasks/{task['id']}", {'due_date': '2030-01-01'}, token),
+                         (200, {'message': "Task updated successfully"}))
+        self.assertEqual(self.request('POST', f"/tasks/{task['id']}/done", token=token)[0], 200)
+        status, page = self.request('GET', '/tasks?completed=1', token=token)
+        self.assertEqual([t['title'] for t in page['tasks']], ['Write report'])
+        self.assertEqual(self.request('GET', '/search?q=rep*&completed=1', token=token)[1]['tasks'][0]['id'], task['id'])
+        self.assertEqual(self.request('DELETE', f"/tasks/{task['id']}", token=token)[0], 200)
+        self.assertEqual(self.request('GET', f"/tasks/{task['id']}", token=token)[0], 404)
+
+    def test_users_are_isolated_per_request(self):
+        alice = self.login('alice')
+        bob = self.login('bob')
+        task_id = self.request('POST', '/tasks', {'title': 'Private'}, alice)[1]['id']
+        self.assertEqual(self.request('GET', '/whoami', token=bob)[1]['username'], 'bob')
+        self.assertEqual(self.request('GET', '/tasks', token=bob)[1]['tasks'], [])
+        self.assertEqual(self.request('POST', f'/tasks/{task_id}/done', token=bob), (403, {'error': "Access denied"}))
+        self.assertIsNone(auth.current_user)
+
+    def test_requests_need_a_valid_token(self):
+        self.assertEqual(self.request('GET', '/tasks')[0], 401)
+        self.assertEqual(self.request('GET', '/tasks', token='forged.token')[0], 401)
+        self.assertEqual(self.request('POST', '/login', {'username': 'nobody', 'password': 'x'})[0], 401)
+
+    def test_logout_revokes_the_token(self):
+        token = self.login('alice')
+        self.assertEqual(self.request('POST', '/logout', token=token)[0], 200)
+        self.assertEqual(self.request('GET', '/whoami', token=token)[0], 401)
+
+    def test_idle_keep_alive_connections_do_not_hold_workers(self):
+        # More open connections than pool threads, used in turns
+        conns = [HTTPConnection('127.0.0.1', self.server.server_address[1], timeout=5) for _ in range(6)]
+        for _ in range(2):
+            for conn in conns:
+                conn.request('GET', '/whoami')
+                response = conn.getresponse()
+                response.read()
+                self.assertEqual(response.status, 401)
+                self.assertEqual(response.getheader('Connection'), 'keep-alive')
+        for conn in conns:
+            conn.close()
+
+    def test_login_backlog_limit_leaves_task_requests_alone(self):
+        token = self.login('alice')
+        self.server.auth_limit = 0  # As if the login pool and its backlog were full
+        self.assertEqual(self.request('POST', '/login', {'username': 'alice', 'password': 'pw'})[0], 503)
+        self.assertEqual(self.request('GET', '/tasks', token=token)[0], 200)
+
+    def test_bad_requests(self):
+        token = self.login('alice')
+        self.assertEqual(self.request('POST', '/tasks', {'title': 'X', 'due_date': 'soon'}, token)[0], 400)
+        self.assertEqual(self.request('GET', '/tasks?limit=abc', token=token)[0], 400)
+        self.assertEqual(self.request('PUT', '/tasks/1', token=token)[0], 405)
+        self.assertEqual(self.request('DELETE', '/tasks', token=token)[0], 405)
+        self.assertEqual(self.request('GET', '/nowhere', token=token)[0], 404)
+
+    def test_task_fields_must_be_strings(self):
+        token = self.login('alice')
+        self.assertEqual(self.request('POST', '/tasks', {}, token), (400, {'error': "title is required"}))
+        self.assertEqual(self.request('POST', '/tasks', {'title': '  '}, token), (400, {'error': "title must not be blank"}))
+        self.assertEqual(self.request('POST', '/tasks', {'title': 5}, token), (400, {'error': "title must be a string"}))
+        self.assertEqual(self.request('POST', '/tasks', {'title': 'X', 'description': ['a']}, token)[0], 400)
+        self.assertEqual(self.request('GET', '/tasks', token=token)[1]['tasks'], [])
+        task_id = self.request('POST', '/tasks', {'title': 'Kept', 'description': None}, token)[1]['id']
+        self.assertEqual(self.request('PATCH', f'/tasks/{task_id}', {'title': ''}, token), (400, {'error': "title must not be blank"}))
+        self.assertEqual(self.request('PATCH', f'/tasks/{task_id}', {'priority': 3}, token), (400, {'error': "priority must be a string"}))
+        self.assertEqual(self.request('PATCH', f'/tasks/{task_id}', {'due_date': 20300101}, token)[0], 400)
+        self.assertEqual([t['title'] for t in self.request('GET', '/tasks', token=token)[1]['tasks']], ['Kept'])
+
+if __name__ == '__main__':
+    unittest.main()
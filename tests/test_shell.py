@@ -0,0 +1,87 @@
+import unittest
+import io
+import os
+import sys
+from contextlib import redirect_stdout, redirect_stderr
+from datetime import date, timedelta
+import json
+from todo_app.cli import run_shell, create_parser, handle_command
+from todo_app.controllers.auth import logout
+from todo_app.database.db import set_db_path, initialize_database, close_connection
+from todo_app.tests.helpers import capture_queries
+
+class TestShell(unittest.TestCase):
+    def setUp(self):
+        self.test_db = 'test_todo.db'
+        set_db_path(self.test_db)
+        initialize_database()
+        logout()  # A session file left in the working directory would log the shell in
+
+    def tearDown(self):
+        logout()
+        close_connection()
+        if os.path.exists(self.test_db):
+            os.remove(self.test_db)
+
+    def run_script(self, script):
+        out = io.StringIO()
+        stdin = sys.stdin
+        sys.stdin = io.StringIO(script)
+        try:
+            with redirect_stdout(out), redirect_stderr(io.StringIO()):
+                run_shell()
+        finally:
+            sys.stdin = stdin
+        return out.getvalue()
+
+    def test_scripted_session(self):
+        yesterday = date.today() - timedelta(days=1)
+        output = self.run_script(
+            "signup alice\npw\n"
+            "login alice\npw\n"
+            f"add 'Pay rent' --due {yesterday}\n"
+            "# comments and blank lines are skipped\n\n"
+            "list --limit 5\n"
+            "whoami\n"
+            "exit\n"
+            "add 'Never runs'\n"
+        )
+        self.assertIn("Signup successful", output)
+        self.assertIn("Login successful", output)
+        self.assertIn("Task added successfully", output)
+        self.assertIn("Title: Pay rent", output)
+        self.assertIn("Logged in as: alice", output)
+        self.assertNotIn("Never runs", output)
+
+    def test_reminders_are_shown_once(self):
+        self.run_script(f"signup alice\npw\nlogin alice\npw\nadd Overdue --due {date.today() - timedelta(days=2)}\n")
+        output = self.run_script("list\nlist --completed\nview 1\n")
+        self.assertEqual(output.count("Task Overdue: Overdue"), 1)
+
+    def test_bad_lines_do_not_end_the_shell(self):
+        output = self.run_script("frobnicate\nadd\nlist 'unterminated\nserve\nwhoami\n")
+        self.assertIn("Parse error", output)
+        self.assertIn("'serve' is not available inside the shell", output)
+        self.assertIn("Not logged in", output)
+
+    def test_commands_reuse_the_session(self):
+        self.run_script("signup alice\npw\nlogin alice\npw\nadd First\nadd Second\n")
+        # The session is already in memory: the startup reminder check, then one query per command
+        queries = capture_queries(self.run_script, "view 1\nview 2\n")
+        self.assertEqual(len(queries), 3, queries)
+        self.assertIn('reminder_summary', queries[0])
+
+    def test_machine_formats_print_only_data(self):
+        self.run_script(f"signup alice\npw\nlogin alice\npw\nadd Overdue --due {date.today() - timedelta(days=2)}\nadd Second\n")
+        out = io.StringIO()
+        with redirect_stdout(out), redirect_stderr(io.StringIO()) as err:
+            handle_command(create_parser().parse_args(['list', '--format', 'json', '--columns', 'id,title', '--limit', '1']))
+        self.assertEqual(json.loads(out.getvalue()), [{'id': 1, 'title': 'Overdue'}])
+        self.assertIn("Next page", err.getvalue())
+        out = io.StringIO()
+        with redirect_stdout(out):
+            handle_command(create_parser().parse_args(['search', 'nothing', '--format', 'tsv', '--columns', 'id']))
+        self.assertEqual(out.getvalue(), "id\n")
+
+if __name__ == '__main__':
+    unittest.main()
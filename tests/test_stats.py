@@ -0,0 +1,127 @@
+import unittest
+import os
+from datetime import date, timedelta
+from todo_app.controllers import auth
+from todo_app.controllers.tasks import (add_task, edit_task, delete_task, mark_done, reopen, list_tasks, mark_done_many,
+                                        delete_many, search_tasks, task_stats, check_stats, rebuild_stats)
+from todo_app.database.db import set_db_path, initialize_database, close_connection, get_connection
+from todo_app.models.reminder_model import Reminder
+from todo_app.models.task_model import Task
+from todo_app.models.user_model import User
+from todo_app.tests.helpers import capture_queries
+from todo_app.utils import dates
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        self.test_db = 'test_todo.db'
+        set_db_path(self.test_db)
+        initialize_database()
+        self.user = User.create_user('owner', 'x')
+        self.other = User.create_user('other', 'x')
+        auth.current_user = self.user
+        self.today = date(2030, 6, 15)
+        dates.reset_today(self.today)
+
+    def tearDown(self):
+        dates.reset_today()
+        auth.current_user = None
+        close_connection()
+        if os.path.exists(self.test_db):
+            os.remove(self.test_db)
+
+    def day(self, offset):
+        return str(self.today + timedelta(days=offset))
+
+    def add(self, title, priority='medium', offset=None):
+        add_task(title, priority=priority, due_date=self.day(offset) if offset is not None else None)
+        return next(task.id for task in list_tasks(show_completed=True) if task.title == title)
+
+    def assertCountersMatchScan(self):
+        self.assertEqual(check_stats(), [])
+        self.assertEqual({**task_stats().to_dict(), 'source': None}, {**task_stats(scan=True).to_dict(), 'source': None})
+
+    def test_counts_by_status_priority_and_due_date(self):
+        self.add('Late', 'high', -3)
+        self.add('Also late', 'low', -1)
+        self.add('Today', 'high', 0)
+        self.add('Tomorrow', 'medium', 1)
+        self.add('Later', 'medium', 10)
+        mark_done(self.add('Done', 'low', -5))
+        self.add('Undated')
+        auth.current_user = self.other
+        self.add('Not mine', 'high', -3)
+        auth.current_user = self.user
+        stats = task_stats().to_dict()
+        self.assertEqual(stats['total'], 7)
+        self.assertEqual((stats['pending'], stats['completed']), (6, 1))
+        self.assertEqual(stats['by_priority']['pending'], {'high': 2, 'medium': 3, 'low': 1})
+        self.assertEqual(stats['by_priority']['completed'], {'high': 0, 'medium': 0, 'low': 1})
+        self.assertEqual((stats['overdue'], stats['due_today'], stats['due_tomorrow']), (2, 1, 1))
+        self.assertAlmostEqual(stats['completion_rate'], 1 / 7, places=4)
+        self.assertEqual(stats['source'], 'counters')
+        self.assertCountersMatchScan()
+
+    def test_counters_follow_every_write(self):
+        ids = [self.add(f'Task {n}', ('low', 'medium', 'high')[n % 3], n - 2) for n in range(6)]
+        edit_task(ids[0], priority='high', due_date=self.day(5))
+        edit_task(ids[1], title='Renamed')  # touches no counted column
+        mark_done(ids[2])
+        reopen(ids[2])
+        mark_done(ids[3])
+        delete_task(ids[4])
+        self.assertCountersMatchScan()
+        mark_done_many(ids=ids)
+        self.assertEqual(task_stats().count(status='pending'), 0)
+        delete_many(ids=ids)
+        self.assertCountersMatchScan()
+        self.assertEqual(task_stats().total, 0)
+        Task.bulk_create(self.user.id, [(f'Bulk {n}', None, 'low', self.day(-1), 'pending') for n in range(50)])
+        self.assertEqual(task_stats().overdue, 50)
+        self.assertCountersMatchScan()
+        # Emptied due dates are dropped rather than left at zero
+        delete_many(ids=[task.id for task in list_tasks()])
+        self.assertEqual(get_connection().execute("SELECT COUNT(*) FROM task_due_counts WHERE user_id = ?", (self.user.id,)).fetchone()[0], 0)
+
+    def test_bulk_create_applies_each_batch_like_the_triggers(self):
+        self.add('Existing', 'high', 3)
+        rows = [(f'Bulk {n}', 'imported' if n % 2 else None, ('low', 'medium', 'high', None)[n % 4],
+                 self.day(n % 5 - 2) if n % 3 else None, 'completed' if n % 7 == 0 else 'pending') for n in range(250)]
+        self.assertEqual(Task.bulk_create(self.user.id, rows, batch_size=40), 250)
+        self.assertCountersMatchScan()
+        self.assertEqual(Reminder.summary(self.user.id)[0], self.day(-2))
+        self.assertEqual(len(search_tasks('imported', limit=500)), 125)
+        self.assertEqual(get_connection().execute("SELECT COUNT(*) FROM bulk_load").fetchone()[0], 0)
+        # Single inserts go through the triggers again
+        self.add('Afterwards', 'low', -4)
+        self.assertCountersMatchScan()
+        self.assertEqual(Reminder.summary(self.user.id)[0], self.day(-4))
+        self.assertEqual([task.title for task in search_tasks('afterwards')], ['Afterwards'])
+
+    def test_stats_read_is_constant_size(self):
+        Task.bulk_create(self.user.id, [(f'Bulk {n}', None, 'medium', self.day(n % 3 - 1), 'pending') for n in range(500)])
+        queries = capture_queries(task_stats)
+        self.assertEqual(len(queries), 2, queries)
+        self.assertTrue(all('FROM tasks' not in query for query in queries))
+
+    def test_check_finds_and_rebuild_repairs_drift(self):
+        self.add('Late', 'high', -3)
+        self.add('Later', 'low', 4)
+        conn = get_connection()
+        conn.execute("UPDATE task_counters SET count = count + 5 WHERE user_id = ? AND priority = 'high'", (self.user.id,))
+        conn.execute("DELETE FROM task_due_counts WHERE user_id = ?", (self.user.id,))
+        conn.commit()
+        mismatches = check_stats()
+        self.assertIn(('task_counters', ('pending', 'high'), 6, 1), mismatches)
+        self.assertEqual(len(mismatches), 3)
+        self.assertEqual(task_stats(scan=True).overdue, 1)
+        self.assertEqual(rebuild_stats(), "Counters rebuilt")
+        self.assertCountersMatchScan()
+
+    def test_requires_login(self):
+        with auth.request_scope(None):
+            self.assertEqual(task_stats(), "User not logged in")
+            self.assertEqual(check_stats(), "User not logged in")
+            self.assertEqual(rebuild_stats(), "User not logged in")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
 import unittest
 import os
+from datetime import date, timedelta
 from todo_app.controllers.auth import signup, login
-from todo_app.controllers.tasks import add_task, edit_task, delete_task, list_tasks, view_task, mark_done, reopen
-from todo_app.database.db import set_db_path, initialize_database
+from todo_app.controllers.tasks import add_task, edit_task, delete_task, list_tasks, iter_tasks, list_tasks_page, search_tasks, view_task, mark_done, reopen, mark_done_many, reopen_many, delete_many
+from todo_app.database.db import set_db_path, initialize_database, close_connection
+from todo_app.models.task_model import Task
 
 class TestTasks(unittest.TestCase):
     def setUp(self):
@@ -13,6 +15,7 @@ class TestTasks(unittest.TestCase):
         login('testuser', 'password')
 
     def tearDown(self):
+        close_connection()
         if os.path.exists(self.test_db):
             os.remove(self.test_db)
 
@@ -20,6 +23,9 @@ class TestTasks(unittest.TestCase):
         result = add_task('Test Task', 'Description', 'high', '2023-12-31')
         self.assertEqual(result, "Task added successfully")
 
+    def test_add_task_rejects_unpadded_dates(self):
+        self.assertEqual(add_task('Task', due_date='2024-1-5'), "Invalid date format. Use YYYY-MM-DD")
+
     def test_edit_task(self):
         add_task('Test Task', 'Description')
         tasks = list_tasks()
@@ -67,5 +73,155 @@ class TestTasks(unittest.TestCase):
         task = view_task(task_id)
         self.assertEqual(task.status, 'pending')
 
+    def test_list_overdue_and_due_soon(self):
+        today = date.today()
+        add_task('Overdue', due_date=str(today - timedelta(days=3)))
+        add_task('Tomorrow', due_date=str(today + timedelta(days=1)))
+        add_task('Later', due_date=str(today + timedelta(days=10)))
+        add_task('No date')
+        overdue = list_tasks(show_pending=False, show_overdue=True)
+        self.assertEqual([t.title for t in overdue], ['Overdue'])
+        due_soon = list_tasks(show_pending=False, show_due_soon=True, sort_by='due_date')
+        self.assertEqual([t.title for t in due_soon], ['Overdue', 'Tomorrow'])
+
+    def test_list_completed_only(self):
+        add_task('Open')
+        add_task('Closed')
+        closed_id = [t.id for t in list_tasks() if t.title == 'Closed'][0]
+        mark_done(closed_id)
+        completed = list_tasks(show_pending=False, show_completed=True)
+        self.assertEqual([t.title for t in completed], ['Closed'])
+        self.assertEqual(len(list_tasks(show_completed=True)), 2)
+
+    def test_list_sorted_by_priority_rank(self):
+        add_task('Low', priority='low')
+        add_task('High', priority='high')
+        add_task('Medium', priority='medium')
+        tasks = list_tasks(sort_by='priority', order='DESC')
+        self.assertEqual([t.title for t in tasks], ['High', 'Medium', 'Low'])
+
+    def test_list_sorted_by_due_date_puts_undated_last(self):
+        add_task('Undated')
+        add_task('Dated', due_date='2030-01-01')
+        tasks = list_tasks(sort_by='due_date')
+        self.assertEqual([t.title for t in tasks], ['Dated', 'Undated'])
+
+    def test_list_tasks_page_walks_every_sort_key(self):
+        for i, (priority, due) in enumerate([('low', '2030-01-02'), ('high', None), ('medium', '2030-01-01'),
+                                             ('high', '2030-01-01'), ('medium', None)]):
+            add_task(f'Task {i}', priority=priority, due_date=due)
+        for sort_by in ['created_at', 'updated_at', 'due_date', 'priority']:
+            for order in ['ASC', 'DESC']:
+                expected = [t.id for t in list_tasks(sort_by=sort_by, order=order)]
+                seen = []
+                cursor = None
+                while True:
+                    page = list_tasks_page(sort_by=sort_by, order=order, limit=2, after=cursor)
+                    seen.extend(t.id for t in page.tasks)
+                    cursor = page.next_cursor
+                    if not cursor:
+                        break
+                self.assertEqual(seen, expected, (sort_by, order))
+
+    def test_list_tasks_page_rejects_foreign_cursor(self):
+        add_task('Task 1')
+        add_task('Task 2')
+        cursor = list_tasks_page(limit=1).next_cursor
+        self.assertEqual(list_tasks_page(limit=1, after=cursor, sort_by='priority'), "Cursor does not match the requested sort")
+        self.assertEqual(list_tasks_page(limit=1, after='garbage!'), "Invalid cursor")
+
+    def test_iter_tasks_matches_list_tasks(self):
+        for i in range(5):
+            add_task(f'Task {i}', priority=['low', 'medium', 'high'][i % 3])
+        streamed = iter_tasks(sort_by='priority')
+        self.assertNotIsInstance(streamed, list)
+        self.assertEqual([t.id for t in streamed], [t.id for t in list_tasks(sort_by='priority')])
+
+    def test_bulk_done_by_ids_and_ranges(self):
+        for i in range(6):
+            add_task(f'Task {i}')
+        ids = [t.id for t in list_tasks()]
+        result = mark_done_many(ids=[ids[0]], ranges=[(ids[2], ids[4])])
+        self.assertEqual(result, "4 tasks marked as done")
+        self.assertEqual([t.id for t in list_tasks()], [ids[1], ids[5]])
+        self.assertEqual(mark_done_many(ids=[ids[0]]), "0 tasks marked as done")
+        self.assertEqual(reopen_many(ranges=[(ids[0], ids[5])]), "4 tasks reopened")
+
+    def test_bulk_done_by_filter(self):
+        add_task('Old low', priority='low', due_date='2020-01-01')
+        add_task('Old high', priority='high', due_date='2020-01-01')
+        add_task('Future low', priority='low', due_date='2999-01-01')
+        result = mark_done_many(priority='low', show_overdue=True)
+        self.assertEqual(result, "1 task marked as done")
+        self.assertEqual(sorted(t.title for t in list_tasks()), ['Future low', 'Old high'])
+
+    def test_bulk_requires_a_selection(self):
+        add_task('Task')
+        self.assertEqual(delete_many(), "No tasks selected")
+        self.assertEqual(len(list_tasks()), 1)
+
+    def test_bulk_delete_is_scoped_to_owner(self):
+        add_task('Mine')
+        signup('other', 'password')
+        login('other', 'password')
+        add_task('Theirs')
+        theirs = list_tasks()[0].id
+        login('testuser', 'password')
+        mine = list_tasks()[0].id
+        self.assertEqual(delete_many(ranges=[(min(mine, theirs), max(mine, theirs))]), "1 task deleted")
+        login('other', 'password')
+        self.assertEqual([t.title for t in list_tasks()], ['Theirs'])
+
+    def test_search_ranks_title_matches_first(self):
+        add_task('Pay rent', 'Transfer before the 1st')
+        add_task('Call landlord', 'Ask about rent increase')
+        add_task('Buy milk')
+        self.assertEqual([t.title for t in search_tasks('rent')], ['Pay rent', 'Call landlord'])
+
+    def test_search_prefix_and_filters(self):
+        add_task('Quarterly report', priority='high')
+        add_task('Report expenses', priority='low')
+        mark_done(list_tasks()[0].id)
+        self.assertEqual(len(search_tasks('rep*')), 2)
+        self.assertEqual(search_tasks('rep'), [])
+        self.assertEqual([t.title for t in search_tasks('report', priority='low')], ['Report expenses'])
+        self.assertEqual([t.title for t in search_tasks('report', show_completed=True)], ['Quarterly report'])
+        self.assertEqual(len(search_tasks('report', limit=1)), 1)
+
+    def test_search_follows_edits_and_deletes(self):
+        add_task('Draft slides')
+        task_id = list_tasks()[0].id
+        edit_task(task_id, title='Final slides', description='Send to Ana')
+        self.assertEqual(search_tasks('draft'), [])
+        self.assertEqual(search_tasks('ana')[0].id, task_id)
+        delete_task(task_id)
+        self.assertEqual(search_tasks('slides'), [])
+
+    def test_search_text_is_not_query_syntax(self):
+        add_task('Fix "quotes" AND (parens)')
+        self.assertEqual(len(search_tasks('"quotes" AND (parens')), 1)
+        self.assertEqual(search_tasks('!!'), "Search query must contain a word")
+
+    def test_search_is_scoped_to_owner(self):
+        add_task('Shared word')
+        signup('other', 'password')
+        login('other', 'password')
+        self.assertEqual(search_tasks('shared'), [])
+
+class TestTaskRecord(unittest.TestCase):
+    def test_due_and_created_are_parsed_lazily(self):
+        task = Task(1, 1, 'Task', None, 'medium', '2024-02-29', 'pending', '2024-02-01 09:30:00.123456', None)
+        self.assertEqual(task.due, date(2024, 2, 29))
+        self.assertEqual(task.created.minute, 30)
+        self.assertIs(task.due, task.due)
+
+    def test_missing_or_malformed_dates_are_none(self):
+        self.assertIsNone(Task(1, 1, 'Task', None, 'medium', None, 'pending', None, None).due)
+        self.assertIsNone(Task(1, 1, 'Task', None, 'medium', 'soon', 'pending', 'yesterday', None).created)
+
+    def test_tasks_have_no_instance_dict(self):
+        with self.assertRaises(AttributeError):
+            Task(1, 1, 'Task', None, 'medium', None, 'pending', None, None).extra = 1
+
 if __name__ == '__main__':
     unittest.main()
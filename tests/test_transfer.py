@@ -0,0 +1,78 @@
+import unittest
+import os
+import json
+from todo_app.controllers.auth import signup, login
+from todo_app.controllers.tasks import list_tasks
+from todo_app.controllers.transfer import import_tasks, export_tasks
+from todo_app.database.db import set_db_path, initialize_database, close_connection
+from todo_app.utils.validation import validate_task_rows
+
+class TestTransfer(unittest.TestCase):
+    def setUp(self):
+        self.test_db = 'test_todo.db'
+        self.data_file = 'test_tasks.csv'
+        self.export_file = 'test_export.jsonl'
+        set_db_path(self.test_db)
+        initialize_database()
+        signup('testuser', 'password')
+        login('testuser', 'password')
+
+    def tearDown(self):
+        close_connection()
+        for path in [self.test_db, self.data_file, self.export_file]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_validate_task_rows_reports_each_bad_row(self):
+        rows = [
+            {'title': 'Good', 'priority': 'high', 'due_date': '2030-01-01'},
+            {'title': '', 'priority': 'low'},
+            {'title': 'Bad priority', 'priority': 'urgent'},
+            {'title': 'Bad date', 'due_date': '2030-13-01'},
+            None,
+        ]
+        valid, errors = validate_task_rows(rows)
+        self.assertEqual(valid, [('Good', None, 'high', '2030-01-01', 'pending')])
+        self.assertEqual([line for line, _ in errors], [2, 3, 4, 5])
+
+    def test_import_csv_skips_invalid_rows(self):
+        with open(self.data_file, 'w', newline='') as f:
+            f.write("title,description,priority,due_date,status\n")
+            f.write("Write report,Quarterly,high,2030-01-01,pending\n")
+            f.write("Broken,,urgent,,\n")
+            f.write("Old task,,low,,completed\n")
+        imported, errors = import_tasks(self.data_file, batch_size=2)
+        self.assertEqual(imported, 2)
+        self.assertEqual(errors, [(2, "Invalid priority: urgent")])
+        titles = sorted(t.title for t in list_tasks(show_completed=True))
+        self.assertEqual(titles, ['Old task', 'Write report'])
+
+    def test_import_jsonl_reports_non_string_fields(self):
+        rows = [
+            {'title': 'Good', 'priority': 'low'},
+            {'title': 7},
+            {'title': 'Numeric priority', 'priority': 5},
+            {'title': 'Numeric date', 'due_date': 20240101},
+            {'title': 'List description', 'description': ['a']},
+            {'title': 'Null fields', 'priority': None, 'due_date': None},
+        ]
+        with open(self.export_file, 'w') as f:
+            f.write('\n'.join(json.dumps(row) for row in rows) + '\n')
+        imported, errors = import_tasks(self.export_file)
+        self.assertEqual(imported, 2)
+        self.assertEqual(errors, [(2, "Invalid title"), (3, "Invalid priority"), (4, "Invalid due_date"),
+                                  (5, "Invalid description")])
+
+    def test_export_jsonl_round_trips(self):
+        with open(self.data_file, 'w', newline='') as f:
+            f.write("title,priority\nA,low\nB,high\n")
+        import_tasks(self.data_file)
+        self.assertEqual(export_tasks(self.export_file), "Exported 2 tasks")
+        with open(self.export_file) as f:
+            exported = [json.loads(line) for line in f]
+        self.assertEqual([(t['title'], t['priority']) for t in exported], [('A', 'low'), ('B', 'high')])
+        imported, errors = import_tasks(self.export_file)
+        self.assertEqual((imported, errors), (2, []))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import calendar
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+OVERDUE = 'overdue'
+DUE_TODAY = 'today'
+DUE_SOON = 'soon'
+
+# One "today" per command, so every task in a listing is judged against the same date
+_today = None
+
+def today():
+    global _today
+    if _today is None:
+        _today = date.today()
+    return _today
+
+def reset_today(value=None):
+    # Called when a new command starts; tests may pin a date
+    global _today
+    _today = value
+
+@lru_cache(maxsize=4096)
+def parse_date(value):
+    # Strict YYYY-MM-DD (so stored dates also order correctly as text); None for anything else
+    if not isinstance(value, str) or len(value) != 10 or value[4] != '-' or value[7] != '-':
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+def add_months(day, months):
+    # Same day of the month, clamped to the month's last day (Jan 31 + 1 month is Feb 28/29)
+    index = day.month - 1 + months
+    year, month = day.year + index // 12, index % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+def parse_timestamp(value):
+    # Timestamps come back from SQLite as text; objects built in Python already hold datetimes
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=4096)
+def _classify(due_date, day):
+    due = parse_date(due_date)
+    if due is None:
+        return None
+    if due < day:
+        return OVERDUE
+    if due == day:
+        return DUE_TODAY
+    if due == day + timedelta(days=1):
+        return DUE_SOON
+    return None
+
+def classify_due(due_date, day=None):
+    # OVERDUE, DUE_TODAY, DUE_SOON (tomorrow) or None; one cache hit per distinct date
+    return _classify(due_date, day or today())
@@ -1,22 +1,64 @@
-from datetime import datetime, date
-from colorama import Fore, init
+import json
+import re
+import sys
+from operator import attrgetter
+from .dates import classify_due, OVERDUE, DUE_TODAY
 
-init()
+# Characters buffered before a write to the output stream
+WRITE_BUFFER_SIZE = 64 * 1024
 
-def format_task(task):
-    today = date.today()
-    color = Fore.YELLOW  # default pending
+FORMATS = ('cards', 'table', 'json', 'jsonl', 'tsv')
+# Formats meant for other programs; nothing else should be written to stdout alongside them
+MACHINE_FORMATS = ('json', 'jsonl', 'tsv')
+COLUMNS = ('id', 'title', 'description', 'priority', 'due_date', 'status', 'created_at', 'updated_at')
+TABLE_COLUMNS = ('id', 'title', 'priority', 'due_date', 'status')
+# Longer table cells are cut to this many characters
+MAX_CELL_WIDTH = 40
+
+PLAIN = {'pending': '', 'completed': '', OVERDUE: '', DUE_TODAY: '', 'reset': ''}
+# TSV escapes, as in PostgreSQL's text COPY format; only free-text columns can need them
+TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+TSV_SPECIAL = re.compile(r'[\\\t\n\r]')
+TEXT_COLUMNS = ('title', 'description')
+
+_encoder = json.JSONEncoder(default=str)
+
+def palette(stream=None):
+    # ANSI colors for a terminal; plain text (and no colorama) when the output is piped or redirected
+    stream = stream or sys.stdout
+    isatty = getattr(stream, 'isatty', None)
+    if not (isatty and isatty()):
+        return PLAIN
+    from colorama import Fore, just_fix_windows_console
+    just_fix_windows_console()
+    return {'pending': Fore.YELLOW, 'completed': Fore.GREEN, OVERDUE: Fore.RED, DUE_TODAY: Fore.BLUE, 'reset': Fore.RESET}
+
+def parse_columns(text):
+    columns = [column.strip() for column in text.split(',') if column.strip()]
+    unknown = [column for column in columns if column not in COLUMNS]
+    if unknown or not columns:
+        raise ValueError(f"Invalid columns: {', '.join(unknown) or text!r} (choose from {', '.join(COLUMNS)})")
+    return columns
+
+def task_to_dict(task, columns=COLUMNS):
+    return {column: getattr(task, column) for column in columns}
+
+def _getter(columns):
+    # Returns a tuple of the columns' values for a task, whatever their number
+    if len(columns) == 1:
+        column = columns[0]
+        return lambda task: (getattr(task, column),)
+    return attrgetter(*columns)
+
+def format_task(task, colors=None):
+    colors = colors or palette()
+    color = colors['pending']
     if task.status == 'completed':
-        color = Fore.GREEN
+        color = colors['completed']
     elif task.due_date:
-        try:
-            due = datetime.strptime(task.due_date, '%Y-%m-%d').date()
-            if due < today:
-                color = Fore.RED
-            elif due == today:
-                color = Fore.BLUE
-        except ValueError:
-            pass
+        state = classify_due(task.due_date)
+        if state in (OVERDUE, DUE_TODAY):
+            color = colors[state]
     card = f"""{color}---------------------------
 Task ID: {task.id}
 Title: {task.title}
@@ -26,8 +68,142 @@ Due Date: {task.due_date or 'N/A'}
 Status: {task.status.title()}
 Created At: {task.created_at}
 Updated At: {task.updated_at}
----------------------------{Fore.RESET}"""
+---------------------------{colors['reset']}"""
     return card
 
+def format_stats(stats):
+    pending = stats.count(status='pending')
+    completed = stats.count(status='completed')
+    lines = [f"Tasks: {stats.total} ({pending} pending, {completed} completed, {stats.completion_rate:.0%} complete)"]
+    for status, total in (('Pending', pending), ('Completed', completed)):
+        if total:
+            by_priority = ', '.join(f"{priority} {stats.count(status.lower(), priority)}" for priority in ('high', 'medium', 'low'))
+            lines.append(f"{status} by priority: {by_priority}")
+    lines.append(f"Overdue: {stats.overdue}  Due today: {stats.due_today}  Due tomorrow: {stats.due_tomorrow}")
+    return '\n'.join(lines)
+
+def format_recurrence(template):
+    until = f" until {template.end_date}" if template.end_date else ''
+    upcoming = f"next {template.next_date}" if template.next_date else "ended"
+    return f"{template.id}: {template.title} [{template.priority}] {template.rule} from {template.start_date}{until}, {upcoming}"
+
 def format_task_list(tasks):
     return '\n\n'.join(format_task(task) for task in tasks)
+
+def _card_chunks(tasks, columns, stream):
+    colors = palette(stream)
+    separator = ''
+    for task in tasks:
+        yield separator + format_task(task, colors)
+        separator = '\n\n'
+    if separator:
+        yield '\n'
+
+def _json_chunks(tasks, columns, stream):
+    encode = _encoder.encode
+    values = _getter(columns)
+    separator = '['
+    for task in tasks:
+        yield separator + encode(dict(zip(columns, values(task))))
+        separator = ',\n'
+    yield ']\n' if separator != '[' else '[]\n'
+
+def _jsonl_chunks(tasks, columns, stream):
+    encode = _encoder.encode
+    values = _getter(columns)
+    for task in tasks:
+        yield encode(dict(zip(columns, values(task)))) + '\n'
+
+def _cell(value):
+    return '' if value is None else str(value)
+
+def _tsv_cell(value):
+    if value is None:
+        return ''
+    value = str(value)
+    return value.translate(TSV_ESCAPES) if TSV_SPECIAL.search(value) else value
+
+def _tsv_chunks(tasks, columns, stream):
+    yield '\t'.join(columns) + '\n'
+    values = _getter(columns)
+    cells = [_tsv_cell if column in TEXT_COLUMNS else _cell for column in columns]
+    for task in tasks:
+        yield '\t'.join([cell(value) for cell, value in zip(cells, values(task))]) + '\n'
+
+def _table_chunks(tasks, columns, stream):
+    # Widths need every row, so cells are built and measured in one pass and written afterwards
+    widths = [len(column) for column in columns]
+    values = _getter(columns)
+    text = [column in TEXT_COLUMNS for column in columns]
+    rows = []
+    for task in tasks:
+        row = []
+        for i, value in enumerate(values(task)):
+            if value is None:
+                row.append('')
+                continue
+            cell = str(value)
+            if text[i]:
+                if len(cell) > MAX_CELL_WIDTH:
+                    cell = cell[:MAX_CELL_WIDTH - 1] + '…'
+                if not cell.isprintable():
+                    cell = ' '.join(cell.split())
+            if len(cell) > widths[i]:
+                widths[i] = len(cell)
+            row.append(cell)
+        rows.append(row)
+    if not rows:
+        return
+    yield '  '.join(column.upper().ljust(width) for column, width in zip(columns, widths)).rstrip() + '\n'
+    yield '  '.join('-' * width for width in widths) + '\n'
+    for row in rows:
+        yield '  '.join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() + '\n'
+
+WRITERS = {
+    'cards': _card_chunks,
+    'table': _table_chunks,
+    'json': _json_chunks,
+    'jsonl': _jsonl_chunks,
+    'tsv': _tsv_chunks,
+}
+
+def write_tasks(tasks, fmt='cards', columns=None, stream=None):
+    # Renders tasks as they arrive and returns how many there were; the first chunk is flushed
+    # immediately, the rest in WRITE_BUFFER_SIZE blocks. columns does not apply to cards.
+    stream = stream or sys.stdout
+    columns = columns or (TABLE_COLUMNS if fmt == 'table' else COLUMNS)
+    count = 0
+
+    def counted():
+        nonlocal count
+        for task in tasks:
+            count += 1
+            yield task
+
+    buffer = []
+    buffered = 0
+    first = True
+    for chunk in WRITERS[fmt](counted(), columns, stream):
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if first or buffered >= WRITE_BUFFER_SIZE:
+            stream.write(''.join(buffer))
+            stream.flush()
+            buffer = []
+            buffered = 0
+            first = False
+    stream.write(''.join(buffer))
+    stream.flush()
+    return count
+
+def write_task(task, fmt='cards', columns=None, stream=None):
+    # A single task: json gives an object rather than a one-element array
+    if fmt == 'json':
+        stream = stream or sys.stdout
+        stream.write(_encoder.encode(task_to_dict(task, columns or COLUMNS)) + '\n')
+        stream.flush()
+        return 1
+    return write_tasks([task], fmt, columns, stream)
+
+def write_task_list(tasks, stream=None):
+    return write_tasks(tasks, 'cards', stream=stream)
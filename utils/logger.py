@@ -1,8 +1,16 @@
-import logging
+_verbose = False
+_configured = False
 
 def setup_logger(verbose=False):
-    level = logging.INFO if verbose else logging.ERROR
-    logging.basicConfig(filename='app.log', level=level, format='%(asctime)s - %(levelname)s - %(message)s')
+    # logging is only imported and configured once something is actually logged
+    global _verbose
+    _verbose = verbose
 
 def get_logger():
+    global _configured
+    import logging
+    if not _configured:
+        level = logging.INFO if _verbose else logging.ERROR
+        logging.basicConfig(filename='app.log', level=level, format='%(asctime)s - %(levelname)s - %(message)s')
+        _configured = True
     return logging.getLogger(__name__)
@@ -0,0 +1,29 @@
+# Controllers report the outcome of a call as a message string. This is the one place that says
+# which messages are failures; the HTTP server maps them to a status and `batch` to ok/error.
+
+# Failures named by the whole message, and their HTTP status
+ERROR_STATUS = {
+    "User not logged in": 401,
+    "Access denied": 403,
+    "Task not found": 404,
+    "Recurring task not found": 404,
+}
+# Failures in the caller's input (400), by prefix: validation messages from controllers and models
+BAD_REQUEST_PREFIXES = ("Invalid", "Nothing to update", "No tasks selected", "Limit must", "Batch size must",
+                        "Unsupported format", "Search query", "Cursor does not match", "Pagination is not supported")
+# Unexpected errors (500), by prefix
+SERVER_ERROR_PREFIXES = ("Error:",)
+
+def message_status(message):
+    # HTTP status for a controller message; 200 for anything that is not a failure
+    for failure, status in ERROR_STATUS.items():
+        if message.startswith(failure):
+            return status
+    if message.startswith(SERVER_ERROR_PREFIXES):
+        return 500
+    if message.startswith(BAD_REQUEST_PREFIXES):
+        return 400
+    return 200
+
+def is_failure(message):
+    return message_status(message) >= 400
@@ -1,25 +1,21 @@
-from datetime import datetime, date
-from colorama import Fore, init
+from .dates import classify_due, OVERDUE, DUE_TODAY
+from .formatter import palette
 
 def check_reminders(tasks):
     overdue = []
     due_today = []
-    today = date.today()
     for task in tasks:
         if task.due_date and task.status == 'pending':
-            try:
-                due = datetime.strptime(task.due_date, '%Y-%m-%d').date()
-                if due < today:
-                    overdue.append(task)
-                elif due == today:
-                    due_today.append(task)
-            except ValueError:
-                pass  # invalid date, skip
+            state = classify_due(task.due_date)
+            if state == OVERDUE:
+                overdue.append(task)
+            elif state == DUE_TODAY:
+                due_today.append(task)
     return {'overdue': overdue, 'due_today': due_today}
 
 def display_notifications(notifications):
-    init()
+    colors = palette()
     for task in notifications['overdue']:
-        print(f"{Fore.RED}🔔 Task Overdue: {task.title}{Fore.RESET}")
+        print(f"{colors[OVERDUE]}🔔 Task Overdue: {task.title}{colors['reset']}")
     for task in notifications['due_today']:
-        print(f"{Fore.BLUE}🔔 Task Due Today: {task.title}{Fore.RESET}")
+        print(f"{colors[DUE_TODAY]}🔔 Task Due Today: {task.title}{colors['reset']}")
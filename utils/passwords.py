@@ -0,0 +1,35 @@
+import os
+
+# bcrypt password hashes. New hashes use the configured work factor (each step doubles the cost);
+# hashes made with a different factor are replaced on the user's next successful login.
+DEFAULT_ROUNDS = 12
+ROUNDS = int(os.environ.get('TODO_BCRYPT_ROUNDS', DEFAULT_ROUNDS))
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+def _check_rounds(rounds):
+    if not MIN_ROUNDS <= rounds <= MAX_ROUNDS:
+        raise ValueError(f"bcrypt rounds must be between {MIN_ROUNDS} and {MAX_ROUNDS}")
+    return rounds
+
+def hash_password(password, rounds=None):
+    import bcrypt
+    rounds = _check_rounds(ROUNDS if rounds is None else rounds)
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def verify_password(password, password_hash):
+    import bcrypt
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    except ValueError:
+        return False  # Not a bcrypt hash
+
+def hash_rounds(password_hash):
+    # The work factor recorded in a "$2b$12$..." hash, or None if it is not one
+    parts = password_hash.split('$')
+    if len(parts) != 4 or parts[0] or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+def needs_rehash(password_hash, rounds=None):
+    return hash_rounds(password_hash) != (ROUNDS if rounds is None else rounds)
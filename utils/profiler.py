@@ -0,0 +1,285 @@
+import functools
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+DEFAULT_OUTPUT = 'profile.jsonl'
+# The progress handler fires every this many SQLite VM instructions
+PROGRESS_INTERVAL = 1000
+
+_state = threading.local()
+_profiler = None
+
+def settings(profile=None, cprofile=None):
+    # (JSON lines path, cProfile path) from the command line, falling back to TODO_PROFILE and
+    # TODO_CPROFILE; TODO_PROFILE=1 means the default file
+    profile = profile or os.environ.get('TODO_PROFILE') or None
+    if profile in ('1', 'true', 'yes'):
+        profile = DEFAULT_OUTPUT
+    elif profile in ('0', 'false', 'no'):
+        profile = None
+    return profile, cprofile or os.environ.get('TODO_CPROFILE') or None
+
+def _current():
+    return getattr(_state, 'command', None)
+
+class QueryRecord:
+    __slots__ = ('sql', 'started', 'ms', 'rows')
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.started = time.perf_counter()
+        self.ms = 0.0
+        self.rows = 0
+
+class TracedCursor(sqlite3.Cursor):
+    # Times execute and fetch calls and counts the rows they return, per statement
+    _record = None
+
+    def _begin(self, sql):
+        command = _current()
+        self._record = QueryRecord(' '.join(sql.split()))
+        if command is not None:
+            command.queries.append(self._record)
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._record is not None:
+                self._record.ms += (time.perf_counter() - start) * 1000
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql)
+        return self._timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._begin(sql)
+        return self._timed(super().executemany, sql, seq_of_parameters)
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is not None and self._record is not None:
+            self._record.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, self.arraysize if size is None else size)
+        if self._record is not None:
+            self._record.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        if self._record is not None:
+            self._record.rows += len(rows)
+        return rows
+
+    def __next__(self):
+        row = self._timed(super().__next__)
+        self._record.rows += 1
+        return row
+
+class TracedConnection(sqlite3.Connection):
+    # Installed as database.db.connection_factory while profiling. The trace callback also sees
+    # statements run by triggers and executescript, the progress handler approximates VM work.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.set_trace_callback(self._on_statement)
+        self.set_progress_handler(self._on_progress, PROGRESS_INTERVAL)
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    # The C shortcuts create a plain cursor, so route them through cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def _on_statement(self, sql):
+        command = _current()
+        if command is not None:
+            command.statements += 1
+
+    def _on_progress(self):
+        command = _current()
+        if command is not None:
+            command.vm_steps += PROGRESS_INTERVAL
+        return 0
+
+class CommandRecord:
+    def __init__(self, name, options):
+        self.name = name
+        self.options = options
+        self.started = time.perf_counter()
+        self.timestamp = datetime.now().isoformat()
+        self.queries = []
+        self.controllers = []
+        self.depth = 0
+        self.statements = 0
+        self.vm_steps = 0
+
+    def lines(self):
+        wall_ms = (time.perf_counter() - self.started) * 1000
+        for query in self.queries:
+            yield {'type': 'query', 'command': self.name, 'sql': query.sql, 'ms': round(query.ms, 4), 'rows': query.rows}
+        for name, depth, ms in self.controllers:
+            yield {'type': 'controller', 'command': self.name, 'name': name, 'depth': depth, 'ms': round(ms, 4)}
+        yield {
+            'type': 'command',
+            'command': self.name,
+            'options': self.options,
+            'timestamp': self.timestamp,
+            'ms': round(wall_ms, 4),
+            'queries': len(self.queries),
+            'statements': self.statements,
+            'query_ms': round(sum(query.ms for query in self.queries), 4),
+            'rows': sum(query.rows for query in self.queries),
+            'vm_steps': self.vm_steps,
+            'controller_ms': round(sum(ms for _, depth, ms in self.controllers if depth == 0), 4),
+        }
+
+class Profiler:
+    def __init__(self, output=None, cprofile_path=None):
+        self.output = output
+        self.cprofile_path = cprofile_path
+        self.cprofile = None
+        self.originals = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.cprofile_path:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def finish(self):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.cprofile_path)
+            self.cprofile = None
+
+    def record(self, command):
+        if not self.output:
+            return
+        data = ''.join(json.dumps(line, default=str) + '\n' for line in command.lines())
+        with self.lock:
+            if self.output == '-':
+                sys.stderr.write(data)
+            else:
+                with open(self.output, 'a') as f:
+                    f.write(data)
+
+    def run_command(self, name, options, fn, *args, **kwargs):
+        outer = _current()
+        command = CommandRecord(name, options)
+        _state.command = command
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _state.command = outer
+            self.record(command)
+
+def _timed_controller(name, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        command = _current()
+        if command is None:
+            return fn(*args, **kwargs)
+        depth = command.depth
+        command.depth += 1
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            command.depth = depth
+            command.controllers.append((name, depth, (time.perf_counter() - start) * 1000))
+    return wrapper
+
+def instrument(module):
+    # Wraps the module's public functions so calls made during a command are timed; returns the
+    # originals for disable()
+    prefix = module.__name__.rsplit('.', 1)[-1]
+    originals = []
+    for attr, value in list(vars(module).items()):
+        if (callable(value) and not isinstance(value, type) and not attr.startswith('_')
+                and getattr(value, '__module__', None) == module.__name__):
+            originals.append((module, attr, value))
+            setattr(module, attr, _timed_controller(f'{prefix}.{attr}', value))
+    return originals
+
+def enable(output=None, cprofile_path=None):
+    # Switches database connections to the traced factory, times the controllers and turns each
+    # cli.handle_command call into a "command" record
+    global _profiler
+    from .. import cli
+    from ..controllers import auth, tasks, transfer
+    from ..database import db
+    if _profiler is not None:
+        return _profiler
+    _profiler = Profiler(output, cprofile_path)
+    _profiler.originals = [(db, 'connection_factory', db.connection_factory), (cli, 'handle_command', cli.handle_command)]
+    db.connection_factory = TracedConnection
+    db.close_connection()
+    for module in (auth, tasks, transfer):
+        _profiler.originals.extend(instrument(module))
+    handle_command = cli.handle_command
+
+    @functools.wraps(handle_command)
+    def profiled_handle_command(args, *rest, **kwargs):
+        options = {key: value for key, value in vars(args).items() if key not in ('command', 'profile', 'cprofile')}
+        return _profiler.run_command(args.command, options, handle_command, args, *rest, **kwargs)
+    cli.handle_command = profiled_handle_command
+    _profiler.start()
+    return _profiler
+
+def finish():
+    if _profiler is not None:
+        _profiler.finish()
+
+def disable():
+    # Undoes enable(); existing traced connections are closed
+    global _profiler
+    if _profiler is None:
+        return
+    from ..database import db
+    _profiler.finish()
+    for module, attr, value in reversed(_profiler.originals):
+        setattr(module, attr, value)
+    _profiler = None
+    db.close_connection()
+
+def summarize(path):
+    # Per-command averages and the slowest statements from a JSON lines profile
+    commands = {}
+    queries = {}
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            if record['type'] == 'command':
+                totals = commands.setdefault(record['command'], [0, 0.0, 0, 0.0])
+                totals[0] += 1
+                totals[1] += record['ms']
+                totals[2] += record['queries']
+                totals[3] += record['query_ms']
+            elif record['type'] == 'query':
+                totals = queries.setdefault(record['sql'], [0, 0.0, 0])
+                totals[0] += 1
+                totals[1] += record['ms']
+                totals[2] += record['rows']
+    print(f"{'command':<12}{'runs':>6}{'avg ms':>10}{'avg queries':>13}{'avg query ms':>14}")
+    for name, (runs, ms, count, query_ms) in sorted(commands.items(), key=lambda item: -item[1][1]):
+        print(f"{str(name):<12}{runs:>6}{ms / runs:>10.2f}{count / runs:>13.1f}{query_ms / runs:>14.2f}")
+    print(f"\n{'calls':>6}{'total ms':>10}{'rows':>8}  statement")
+    for sql, (calls, ms, rows) in sorted(queries.items(), key=lambda item: -item[1][1])[:10]:
+        print(f"{calls:>6}{ms:>10.2f}{rows:>8}  {sql[:100]}")
+
+if __name__ == '__main__':
+    summarize(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_OUTPUT)
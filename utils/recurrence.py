@@ -0,0 +1,55 @@
+from datetime import timedelta
+from . import dates
+
+# daily/weekly/monthly repeat every `every` days/weeks/months; interval repeats every `every` days
+FREQUENCIES = ('daily', 'weekly', 'monthly', 'interval')
+
+def describe(frequency, every):
+    unit = {'daily': 'day', 'weekly': 'week', 'monthly': 'month', 'interval': 'day'}[frequency]
+    if every == 1:
+        return frequency if frequency != 'interval' else 'daily'
+    return f"every {every} {unit}s"
+
+def occurrence(start, frequency, every, n):
+    # The nth occurrence (0 is start). Monthly ones count from start, so a rule starting on the
+    # 31st comes back to the 31st after a short month.
+    if frequency == 'monthly':
+        return dates.add_months(start, n * every)
+    return start + timedelta(days=n * every * (7 if frequency == 'weekly' else 1))
+
+def index_on_or_after(start, frequency, every, day):
+    # Index of the first occurrence on or after day, by arithmetic rather than by stepping
+    if day <= start:
+        return 0
+    if frequency == 'monthly':
+        n = ((day.year - start.year) * 12 + day.month - start.month) // every
+        while occurrence(start, frequency, every, n) < day:
+            n += 1
+        return n
+    step = every * (7 if frequency == 'weekly' else 1)
+    return -(-(day - start).days // step)
+
+def window(start, frequency, every, end, next_date, through, today):
+    # Occurrences to create when a view reaches through: those from next_date to through, except
+    # that occurrences before today collapse into the latest one, so a rule nobody looked at for a
+    # year yields one overdue task rather than a year of them. Returns (due dates, new next_date);
+    # the work depends on the window, not on how long the rule has existed.
+    due = []
+    first = next_date
+    if next_date < today:
+        # The latest missed occurrence is the last one before today that the rule still covers
+        n = index_on_or_after(start, frequency, every, today if end is None else min(today, end + timedelta(days=1)))
+        if n > 0:
+            missed = occurrence(start, frequency, every, n - 1)
+            if next_date <= missed <= through and (end is None or missed <= end):
+                due.append(missed)
+        first = today
+    n = index_on_or_after(start, frequency, every, first)
+    while True:
+        day = occurrence(start, frequency, every, n)
+        if day > through or (end is not None and day > end):
+            break
+        due.append(day)
+        n += 1
+    following = occurrence(start, frequency, every, index_on_or_after(start, frequency, every, through + timedelta(days=1)))
+    return due, (None if end is not None and following > end else following)
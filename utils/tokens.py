@@ -0,0 +1,77 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import tempfile
+import time
+
+# Signed session tokens: base64url(JSON claims) + "." + base64url(HMAC-SHA256 of the claims part).
+# The key comes from TODO_SECRET_KEY, or a random key file kept next to the database.
+SECRET_FILE = '.todo_secret'
+DEFAULT_TTL = int(os.environ.get('TODO_SESSION_TTL', 7 * 24 * 3600))
+
+_secrets = {}
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+def get_secret(directory=''):
+    env_secret = os.environ.get('TODO_SECRET_KEY')
+    if env_secret:
+        return env_secret.encode('utf-8')
+    path = os.path.join(directory, SECRET_FILE)
+    secret = _secrets.get(path)
+    if secret is None:
+        try:
+            with open(path, 'rb') as f:
+                secret = f.read()
+        except FileNotFoundError:
+            secret = _create_secret(path)
+        _secrets[path] = secret
+    return secret
+
+def _create_secret(path):
+    # The key is written to a private temporary file and linked into place, so no process ever
+    # reads a half-written key. When another process links its key first, that key is used.
+    secret = secrets.token_bytes(32)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=SECRET_FILE)  # mode 0600
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(secret)
+        os.link(tmp_path, path)
+    except FileExistsError:
+        with open(path, 'rb') as f:
+            secret = f.read()
+    finally:
+        os.unlink(tmp_path)
+    return secret
+
+def new_session_id():
+    return secrets.token_hex(16)
+
+def create_token(secret, user_id, username, session_id, ttl=DEFAULT_TTL, now=None):
+    now = int(now if now is not None else time.time())
+    claims = {'uid': user_id, 'usr': username, 'sid': session_id, 'iat': now, 'exp': now + ttl}
+    body = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+    signature = _b64encode(hmac.new(secret, body.encode('ascii'), hashlib.sha256).digest())
+    return f"{body}.{signature}"
+
+def verify_token(secret, token, now=None):
+    # Returns the claims of a well-formed, correctly signed, unexpired token, otherwise None
+    try:
+        body, signature = token.strip().split('.')
+        expected = _b64encode(hmac.new(secret, body.encode('ascii'), hashlib.sha256).digest())
+        if not hmac.compare_digest(signature, expected):
+            return None
+        claims = json.loads(_b64decode(body))
+    except (ValueError, UnicodeError):
+        return None
+    now = now if now is not None else time.time()
+    if not isinstance(claims, dict) or claims.get('exp', 0) <= now:
+        return None
+    return claims
@@ -1,13 +1,75 @@
-from datetime import datetime
+from .dates import parse_date
 
 def validate_date(date_str):
-    try:
-        return datetime.strptime(date_str, '%Y-%m-%d').date()
-    except ValueError:
-        return None
+    return parse_date(date_str)
+
+def is_valid_date(date_str):
+    return parse_date(date_str) is not None
 
 def validate_priority(priority):
     return priority.lower() in ['low', 'medium', 'high']
 
 def validate_status(status):
     return status.lower() in ['pending', 'completed']
+
+TASK_FIELDS = ('title', 'description', 'priority', 'due_date', 'status')
+
+def validate_task_rows(rows, start_line=1):
+    # One pass over a batch of imported rows; date strings are parsed once per distinct value (parse_date is cached).
+    # Returns (valid, errors) with valid rows as (title, description, priority, due_date, status)
+    # tuples and errors as (line, message) pairs.
+    priorities = {'low', 'medium', 'high'}
+    statuses = {'pending', 'completed'}
+    valid = []
+    errors = []
+    for line, row in enumerate(rows, start_line):
+        if not isinstance(row, dict):
+            errors.append((line, "Malformed row"))
+            continue
+        # JSONL values can be any JSON type; only strings (or a missing value) are accepted
+        wrong_type = next((field for field in TASK_FIELDS
+                           if row.get(field) is not None and not isinstance(row.get(field), str)), None)
+        if wrong_type:
+            errors.append((line, f"Invalid {wrong_type}"))
+            continue
+        title = (row.get('title') or '').strip()
+        priority = row.get('priority') or 'medium'
+        if priority not in priorities:
+            priority = priority.strip().lower() or 'medium'
+        status = row.get('status') or 'pending'
+        if status not in statuses:
+            status = status.strip().lower() or 'pending'
+        due_date = (row.get('due_date') or '').strip() or None
+        if not title:
+            errors.append((line, "Missing title"))
+            continue
+        if priority not in priorities:
+            errors.append((line, f"Invalid priority: {priority}"))
+            continue
+        if status not in statuses:
+            errors.append((line, f"Invalid status: {status}"))
+            continue
+        if due_date is not None and not is_valid_date(due_date):
+            errors.append((line, f"Invalid due date: {due_date}"))
+            continue
+        valid.append((title, row.get('description') or None, priority, due_date, status))
+    return valid, errors
+
+def parse_id_spec(tokens):
+    # "7", "10-500" and "1,2,3" forms; returns (ids, ranges) or raises ValueError
+    ids = []
+    ranges = []
+    for token in tokens:
+        for part in token.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            if '-' in part:
+                low, _, high = part.partition('-')
+                low, high = int(low), int(high)
+                if low > high:
+                    raise ValueError(f"Invalid range: {part}")
+                ranges.append((low, high))
+            else:
+                ids.append(int(part))
+    return ids, ranges